@@ -0,0 +1,294 @@
+"""Multi-configuration atlas generation of Tanabe-Sugano diagrams."""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from tanabesugano import __version__
+from tanabesugano.batch import ELECTRON_CONFIG_SOLVERS
+from tanabesugano.cmd import CMDmain
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Sequence
+
+
+ATLAS_STATE_FILE = "atlas.json"
+
+
+@dataclass(frozen=True)
+class AtlasEntry:
+    """Parameters of a single diagram of the atlas.
+
+    Attributes
+    ----------
+    d_count : int
+        Electron configuration (d2-d8)
+    Dq : float
+        Maximum Oh crystal field splitting of the diagram in Dq
+    B : float
+        Racah parameter B in wavenumbers
+    C : float
+        Racah parameter C in wavenumbers
+    nroots : int
+        Number of roots to calculate the TS-diagram
+    cut : float
+        Crystal field splitting of the term symbol cut in 10Dq
+
+    """
+
+    d_count: int
+    Dq: float = 4000.0
+    B: float = 860.0
+    C: float = 3850.0
+    nroots: int = 500
+    cut: float = 24000.0
+
+    @property
+    def key(self) -> str:
+        """Return the unique name of the entry used for bookkeeping.
+
+        All parameters are part of the name with their full precision, so that
+        entries that differ in any of them are kept apart.
+        """
+        return (
+            f"d{self.d_count}_Dq_{float(self.Dq)!r}_B_{float(self.B)!r}_"
+            f"C_{float(self.C)!r}_n_{self.nroots}_cut_{float(self.cut)!r}"
+        )
+
+    @property
+    def digest(self) -> str:
+        """Return the hash of the input parameters and the package version."""
+        payload = json.dumps(
+            {"version": __version__, **asdict(self)},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def default_entries(
+    d_counts: Iterable[int] | None = None,
+    variants: Sequence[tuple[float, float]] | None = None,
+    Dq: float = 4000.0,
+    nroots: int = 500,
+    cut: float = 24000.0,
+) -> list[AtlasEntry]:
+    """Create the atlas entries for a set of electron configurations.
+
+    Parameters
+    ----------
+    d_counts : Iterable[int] | None, optional
+        Electron configurations to include, by default d2-d8
+    variants : Sequence[tuple[float, float]] | None, optional
+        Additional (B, C) pairs computed for every configuration. The default
+        Racah parameters of the corresponding solver class are always included.
+    Dq : float, optional
+        Maximum Oh crystal field splitting in Dq, by default 4000.0
+    nroots : int, optional
+        Number of roots to calculate the TS-diagram, by default 500
+    cut : float, optional
+        Crystal field splitting of the term symbol cut in 10Dq, by default 24000.0
+
+    Returns
+    -------
+    list[AtlasEntry]
+        One entry per configuration and (B, C) pair.
+
+    """
+    if d_counts is None:
+        d_counts = ELECTRON_CONFIG_SOLVERS.keys()
+    entries = []
+    for d_count in d_counts:
+        solver_class = ELECTRON_CONFIG_SOLVERS.get(d_count)
+        if solver_class is None:
+            msg = "The number of unpaired electrons should be between 2 and 8."
+            raise ValueError(msg)
+        parameters = inspect.signature(solver_class).parameters
+        pairs = [(parameters["B"].default, parameters["C"].default)]
+        pairs.extend(pair for pair in variants or () if pair not in pairs)
+        entries.extend(
+            AtlasEntry(
+                d_count=int(d_count),
+                Dq=Dq,
+                B=float(B),
+                C=float(C),
+                nroots=nroots,
+                cut=cut,
+            )
+            for B, C in pairs
+        )
+    return entries
+
+
+def _file_digest(path: Path) -> str:
+    """Return the hash of the content of a written file."""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _compute_entry(entry: AtlasEntry, directory: Path) -> list[str]:
+    """Compute a single diagram and write the TS, DD and cut files.
+
+    Module-level function, so that it can be pickled by the process pool.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    tmm = CMDmain(
+        Dq=entry.Dq,
+        B=entry.B,
+        C=entry.C,
+        nroots=entry.nroots,
+        d_count=entry.d_count,
+    )
+    tmm.calculation()
+    tmm.savetxt(directory=directory)
+    cut = tmm.ci_cut(dq_ci=entry.cut, directory=directory)
+    return [f"{tmm.title_TS}.csv", f"{tmm.title_DD}.csv", cut.name]
+
+
+class Atlas:
+    """Generate the TS and DD files of many configurations in one process pool.
+
+    The diagrams are written to `directory/d<n>/`. The parameter hash of every
+    computed entry and the hashes of its files are stored in
+    `directory/atlas.json` as soon as the files are written, so that a later run
+    only recomputes entries whose input parameters have changed or whose files
+    are missing or have been overwritten, even after an interrupted or failed
+    run.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[AtlasEntry] | None = None,
+        directory: str | Path = "ts-diagrams",
+        processes: int | None = None,
+        force: bool = False,
+    ) -> None:
+        """Initialize the atlas.
+
+        Parameters
+        ----------
+        entries : Iterable[AtlasEntry] | None, optional
+            Diagrams to generate, by default `default_entries()`
+        directory : str | Path, optional
+            Root output directory, by default "ts-diagrams"
+        processes : int | None, optional
+            Number of worker processes, by default the number of CPUs
+        force : bool, optional
+            Recompute all entries regardless of their hash, by default False
+
+        """
+        self.entries = list(default_entries() if entries is None else entries)
+        self.directory = Path(directory)
+        self.processes = processes
+        self.force = force
+        self.state_file = self.directory / ATLAS_STATE_FILE
+
+    def load_state(self) -> dict[str, dict]:
+        """Return the bookkeeping of the previous run, if any."""
+        if not self.state_file.is_file():
+            return {}
+        return json.loads(self.state_file.read_text())
+
+    def save_state(self, state: dict[str, dict]) -> None:
+        """Write the bookkeeping atomically, so that it is never left partial."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = self.state_file.with_suffix(".json.tmp")
+        temporary.write_text(json.dumps(state, indent=2, sort_keys=True))
+        temporary.replace(self.state_file)
+
+    def is_current(self, entry: AtlasEntry, state: dict[str, dict]) -> bool:
+        """Check whether the files of an entry are up to date.
+
+        The file names do not contain every parameter, e.g. not `nroots`, so
+        another entry may have overwritten them; the content of every file is
+        therefore compared with the hash recorded for the entry.
+        """
+        record = state.get(entry.key)
+        if record is None or record.get("digest") != entry.digest:
+            return False
+        files = record.get("files")
+        if not isinstance(files, dict) or not files:
+            return False
+        return all(
+            (self.directory / name).is_file()
+            and _file_digest(self.directory / name) == digest
+            for name, digest in files.items()
+        )
+
+    def record(
+        self,
+        state: dict[str, dict],
+        entry: AtlasEntry,
+        files: list[str],
+    ) -> None:
+        """Record the written files of an entry in the bookkeeping.
+
+        Records of other entries that claim one of these files are dropped,
+        because their content has just been overwritten.
+        """
+        paths = {f"d{entry.d_count}/{name}" for name in files}
+        for key, record in list(state.items()):
+            if key != entry.key and paths & set(record.get("files", ())):
+                del state[key]
+        state[entry.key] = {
+            "digest": entry.digest,
+            "files": {path: _file_digest(self.directory / path) for path in paths},
+        }
+
+    def pending(self) -> list[AtlasEntry]:
+        """Return the entries that have to be (re-)computed."""
+        if self.force:
+            return list(self.entries)
+        state = self.load_state()
+        return [entry for entry in self.entries if not self.is_current(entry, state)]
+
+    def run(self) -> list[AtlasEntry]:
+        """Compute all pending entries in parallel.
+
+        Returns
+        -------
+        list[AtlasEntry]
+            The entries that have been recomputed; unchanged ones are skipped.
+
+        Raises
+        ------
+        Exception
+            The first error of a failed entry, after the bookkeeping of all
+            other entries has been written.
+
+        """
+        todo = self.pending()
+        if not todo:
+            return []
+
+        state = self.load_state()
+        error = None
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            futures = {
+                executor.submit(
+                    _compute_entry,
+                    entry,
+                    self.directory / f"d{entry.d_count}",
+                ): entry
+                for entry in todo
+            }
+            # Record every entry as soon as its files are written
+            for future in as_completed(futures):
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                self.record(state, futures[future], future.result())
+                self.save_state(state)
+
+        if error is not None:
+            raise error
+        return todo
@@ -0,0 +1,382 @@
+"""Compute backends for the assembly and diagonalization of batched blocks.
+
+Every block of the ligand field Hamiltonian is a linear combination of
+coefficient matrices, so a stack of blocks is assembled from the parameters by
+one contraction and diagonalized by one batched eigenvalue solver. A `Backend`
+implements both kernels:
+
+- "numpy" (default) uses `numpy.linalg.eigvalsh` on the whole stack,
+- "scipy" loops `scipy.linalg.eigh` over the stack, which allows to choose the
+  LAPACK driver, e.g. "scipy:evr", and to compute only the lowest eigenvalues,
+- "numba" compiles both kernels with a parallel loop over the stack and is only
+  available if numba is installed.
+
+`get_backend` resolves the backend of an explicit argument, of `set_backend` or
+of the `TANABESUGANO_BACKEND` environment variable, in this order, and falls
+back to "numpy", so that the default results do not depend on the host. "auto"
+is opt-in: it benchmarks the available backends once on typical block stacks,
+which also compiles numba if installed, and keeps the fastest. Further backends
+are added with `register_backend`.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import time
+import warnings
+
+from abc import ABC
+from abc import abstractmethod
+from functools import cache
+from typing import TYPE_CHECKING
+from typing import ClassVar
+
+import numpy as np
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from tanabesugano.matrices import Float64Array
+
+
+# Environment variable with the backend, e.g. "numpy" or "scipy:evr"
+ENVIRONMENT = "TANABESUGANO_BACKEND"
+# Backend that benchmarks the available backends at first use
+AUTO = "auto"
+# Stacks of the benchmark: a vectorized batch and the blocks of a single point
+_BENCHMARK_SHAPES = ((256, 10, 10), (3, 10, 10))
+_BENCHMARK_REPEATS = 3
+_BENCHMARK_CALLS = 32
+
+_BACKENDS: dict[str, type[Backend]] = {}
+_selected: str | Backend | None = None
+
+
+class Backend(ABC):
+    """Assembly and diagonalization of stacks of symmetric blocks.
+
+    Subclasses implement `eigvalsh`, optionally override `assemble`, and are
+    made available by name with `register_backend`.
+    """
+
+    name: ClassVar[str] = ""
+
+    @classmethod
+    def available(cls) -> bool:
+        """Return whether the dependencies of the backend are installed."""
+        return True
+
+    def assemble(
+        self,
+        parameters: Float64Array,
+        coefficients: Float64Array,
+    ) -> Float64Array:
+        """Assemble a stack of blocks from their linear coefficients.
+
+        Args:
+            parameters (Float64Array): Parameters of shape `(*shape, p)`, e.g.
+                `Dq`, `B` and `C`.
+            coefficients (Float64Array): Coefficient matrices of shape
+                `(p, k, k)`.
+
+        Returns:
+            Float64Array: Blocks of shape `(*shape, k, k)`.
+
+        """
+        return np.tensordot(parameters, coefficients, axes=1)
+
+    @abstractmethod
+    def eigvalsh(
+        self,
+        matrices: Float64Array,
+        subset: int | None = None,
+    ) -> Float64Array:
+        """Return the ascending eigenvalues of a stack of symmetric matrices.
+
+        Args:
+            matrices (Float64Array): Stack of shape `(*shape, k, k)` in double
+                or single precision.
+            subset (int | None): Number of lowest eigenvalues to return, by
+                default all.
+
+        Returns:
+            Float64Array: Eigenvalues of shape `(*shape, min(subset, k))` in the
+                precision of the matrices.
+
+        """
+
+    def __repr__(self) -> str:
+        """Return the name of the backend."""
+        return f"{type(self).__name__}()"
+
+
+class NumpyBackend(Backend):
+    """Batched `numpy.linalg.eigvalsh`, available everywhere."""
+
+    name = "numpy"
+
+    def eigvalsh(
+        self,
+        matrices: Float64Array,
+        subset: int | None = None,
+    ) -> Float64Array:
+        """Diagonalize the whole stack with one call of LAPACK `syevd`."""
+        return np.linalg.eigvalsh(matrices)[..., :subset]
+
+
+class ScipyBackend(Backend):
+    """`scipy.linalg.eigh` per block with a selectable LAPACK driver.
+
+    Only the lowest `subset` eigenvalues are computed with the drivers "evr"
+    (the default for subsets) and "evx"; "ev" and "evd" compute all of them.
+    """
+
+    name = "scipy"
+
+    def __init__(self, driver: str | None = None) -> None:
+        """Import SciPy and set the driver.
+
+        Args:
+            driver (str | None): LAPACK driver of `scipy.linalg.eigh`, one of
+                "ev", "evd", "evr" and "evx", by default the choice of SciPy.
+
+        """
+        import scipy.linalg  # noqa: PLC0415
+
+        self._eigh = scipy.linalg.eigh
+        self.driver = driver
+
+    @classmethod
+    def available(cls) -> bool:
+        """Return whether SciPy is installed."""
+        return importlib.util.find_spec("scipy") is not None
+
+    def eigvalsh(
+        self,
+        matrices: Float64Array,
+        subset: int | None = None,
+    ) -> Float64Array:
+        """Diagonalize the blocks of the stack one after the other."""
+        size = matrices.shape[-1]
+        count = size if subset is None else min(subset, size)
+        options = {"eigvals_only": True, "check_finite": False, "driver": self.driver}
+        if count < size and self.driver not in {"ev", "evd"}:
+            options["subset_by_index"] = (0, count - 1)
+        stack = matrices.reshape(-1, size, size)
+        values = np.empty((stack.shape[0], count), dtype=matrices.dtype)
+        for number, matrix in enumerate(stack):
+            values[number] = self._eigh(matrix, **options)[:count]
+        return values.reshape(*matrices.shape[:-2], count)
+
+    def __repr__(self) -> str:
+        """Return the name and the driver of the backend."""
+        return f"{type(self).__name__}(driver={self.driver!r})"
+
+
+@cache
+def _numba_kernels() -> tuple:
+    """Compile the kernels of the numba backend once per process."""
+    import numba  # noqa: PLC0415
+
+    @numba.njit(parallel=True)
+    def assemble(parameters: np.ndarray, coefficients: np.ndarray) -> np.ndarray:
+        blocks = np.zeros((parameters.shape[0], coefficients.shape[1]))
+        for number in numba.prange(parameters.shape[0]):
+            for index in range(parameters.shape[1]):
+                value = parameters[number, index]
+                if value != 0.0:
+                    blocks[number] += value * coefficients[index]
+        return blocks
+
+    @numba.njit(parallel=True)
+    def eigvalsh(stack: np.ndarray) -> np.ndarray:
+        values = np.empty(stack.shape[:2], dtype=stack.dtype)
+        for number in numba.prange(stack.shape[0]):
+            values[number] = np.linalg.eigvalsh(stack[number])
+        return values
+
+    return assemble, eigvalsh
+
+
+class NumbaBackend(Backend):
+    """Kernels compiled by numba with a parallel loop over the stack."""
+
+    name = "numba"
+
+    def __init__(self) -> None:
+        """Compile the kernels, which takes a few seconds at the first use."""
+        self._assemble, self._eigvalsh = _numba_kernels()
+
+    @classmethod
+    def available(cls) -> bool:
+        """Return whether numba is installed."""
+        return importlib.util.find_spec("numba") is not None
+
+    def assemble(
+        self,
+        parameters: Float64Array,
+        coefficients: Float64Array,
+    ) -> Float64Array:
+        """Assemble the blocks in a parallel loop over the parameter sets."""
+        count, size = coefficients.shape[0], coefficients.shape[-1]
+        blocks = self._assemble(
+            np.ascontiguousarray(parameters, dtype=np.float64).reshape(-1, count),
+            np.ascontiguousarray(coefficients, dtype=np.float64).reshape(count, -1),
+        )
+        return blocks.reshape(*np.shape(parameters)[:-1], size, size)
+
+    def eigvalsh(
+        self,
+        matrices: Float64Array,
+        subset: int | None = None,
+    ) -> Float64Array:
+        """Diagonalize the blocks in a parallel loop over the stack."""
+        size = matrices.shape[-1]
+        stack = np.ascontiguousarray(matrices).reshape(-1, size, size)
+        values = self._eigvalsh(stack)[:, :subset]
+        return values.reshape(*matrices.shape[:-2], values.shape[-1])
+
+
+def register_backend(backend: type[Backend]) -> type[Backend]:
+    """Make a backend available by its name, usable as class decorator.
+
+    Args:
+        backend (type[Backend]): Subclass of `Backend` with a unique `name`.
+
+    Raises:
+        ValueError: If the name is empty or reserved.
+
+    Returns:
+        type[Backend]: The registered backend.
+
+    """
+    if not backend.name or backend.name == AUTO:
+        msg = f"The backend {backend.__name__} needs a name other than '{AUTO}'!"
+        raise ValueError(msg)
+    _BACKENDS[backend.name] = backend
+    _instance.cache_clear()
+    _fastest.cache_clear()
+    return backend
+
+
+def available_backends() -> list[str]:
+    """Return the names of the registered backends that are installed."""
+    return [name for name, backend in _BACKENDS.items() if backend.available()]
+
+
+@cache
+def _instance(spec: str) -> Backend:
+    """Create the backend of a specification "name" or "name:option"."""
+    if spec == AUTO:
+        return _fastest()
+    name, _, option = spec.partition(":")
+    backend = _BACKENDS.get(name)
+    if backend is None:
+        msg = f"Unknown backend '{name}', use any of {[AUTO, *_BACKENDS]}!"
+        raise ValueError(msg)
+    if not backend.available():
+        msg = f"The backend '{name}' is not installed!"
+        raise ImportError(msg)
+    try:
+        return backend(option) if option else backend()
+    except TypeError as error:
+        msg = f"The backend '{name}' does not take the option '{option}'!"
+        raise ValueError(msg) from error
+
+
+def benchmark_backends(names: Iterable[str] | None = None) -> dict[str, float]:
+    """Time the diagonalization of typical block stacks per backend.
+
+    Every backend diagonalizes a batch of 256 blocks of 10 x 10 once and the
+    three blocks of a single point several times, after a warm-up call that
+    also compiles JIT kernels. Backends that fail are left out with a
+    `RuntimeWarning` that names the error.
+
+    Args:
+        names (Iterable[str] | None): Backends to time, by default all
+            available ones.
+
+    Returns:
+        dict[str, float]: Best time in seconds of every backend.
+
+    """
+    rng = np.random.default_rng(0)
+    stacks = []
+    for shape in _BENCHMARK_SHAPES:
+        stack = rng.standard_normal(shape)
+        stacks.append(stack + stack.swapaxes(-1, -2))
+    batch, point = stacks
+
+    timings = {}
+    for name in available_backends() if names is None else names:
+        try:
+            backend = _instance(name)
+            backend.eigvalsh(point)
+            best = np.inf
+            for _ in range(_BENCHMARK_REPEATS):
+                start = time.perf_counter()
+                backend.eigvalsh(batch)
+                for _ in range(_BENCHMARK_CALLS):
+                    backend.eigvalsh(point)
+                best = min(best, time.perf_counter() - start)
+        except (ImportError, RuntimeError, TypeError, ValueError) as error:
+            msg = f"The backend '{name}' is left out of the benchmark: {error!r}"
+            warnings.warn(msg, RuntimeWarning, stacklevel=2)
+            continue
+        timings[name] = best
+    return timings
+
+
+@cache
+def _fastest() -> Backend:
+    """Benchmark the available backends once and return the fastest."""
+    timings = benchmark_backends()
+    if not timings:
+        return _instance(NumpyBackend.name)
+    return _instance(min(timings, key=timings.get))
+
+
+for _backend in (NumpyBackend, ScipyBackend, NumbaBackend):
+    register_backend(_backend)
+
+
+def set_backend(backend: str | Backend | None) -> None:
+    """Select the backend of all solvers of the process.
+
+    Args:
+        backend (str | Backend | None): Backend instance or specification, e.g.
+            "numpy", "scipy:evr" or "auto"; None falls back to the environment
+            variable `TANABESUGANO_BACKEND`.
+
+    """
+    global _selected  # noqa: PLW0603
+    if isinstance(backend, str):
+        _instance(backend)
+    _selected = backend
+
+
+def get_backend(backend: str | Backend | None = None) -> Backend:
+    """Resolve a backend.
+
+    Args:
+        backend (str | Backend | None): Backend instance or specification, by
+            default the one of `set_backend`, else of the environment variable
+            `TANABESUGANO_BACKEND`, else "numpy".
+
+    Raises:
+        ValueError: If the backend is unknown or does not take the option.
+        ImportError: If the backend is not installed.
+
+    Returns:
+        Backend: The backend, created once per specification.
+
+    """
+    if backend is None:
+        backend = _selected
+    if backend is None:
+        backend = os.environ.get(ENVIRONMENT) or NumpyBackend.name
+    if isinstance(backend, Backend):
+        return backend
+    return _instance(backend.strip().lower())
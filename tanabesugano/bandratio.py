@@ -0,0 +1,227 @@
+"""Assignment of Dq/B and B from the ratio of two band energies.
+
+At fixed C/B all energies scale with B, so the ratio of two band energies only
+depends on Dq/B. `band_ratio_table` solves this ratio once on a fine Dq/B grid
+and splits the curve at its extrema into monotone segments. A measured pair of
+bands is then assigned by a binary search of its ratio in every segment, which
+gives Dq/B, and B follows from the energy of the lower band in units of B.
+The tables are cached per configuration, C/B and bands, so batches of spectra
+are assigned with a few vectorized searches.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from tanabesugano.batch import split_states
+from tanabesugano.reusable import block_layout
+from tanabesugano.reusable import solve_selected
+
+
+if TYPE_CHECKING:
+    from tanabesugano.matrices import Float64Array
+
+
+# Racah B used for the table, the ratios only depend on Dq/B and C/B
+_B = 1000.0
+
+# Lowest two spin-allowed bands of the (weak-field) ground term, low-spin for d6
+BANDS = {
+    2: ("3_T_2", "3_T_1_1"),
+    3: ("4_T_2", "4_T_1_0"),
+    6: ("1_T_1_0", "1_T_2_0"),
+    7: ("4_T_2", "4_T_1_1"),
+    8: ("3_T_2", "3_T_1_0"),
+}
+
+
+@dataclass(frozen=True)
+class Segment:
+    """Part of the ratio curve with increasing ratio.
+
+    Attributes:
+        ratio (Float64Array): Band ratios, strictly increasing.
+        dq_b (Float64Array): Dq/B at the ratios.
+        lower (Float64Array): Energy of the lower band in units of B.
+
+    """
+
+    ratio: Float64Array
+    dq_b: Float64Array
+    lower: Float64Array
+
+
+@dataclass(frozen=True)
+class Assignment:
+    """Solutions of measured band pairs, one column per monotone segment.
+
+    Segments that do not contain a measured ratio hold NaN.
+
+    Attributes:
+        dq_b (Float64Array): Dq/B of shape `(n, n_segments)`.
+        B (Float64Array): Racah B in wavenumbers.
+        Dq (Float64Array): Crystal field splitting in wavenumbers.
+
+    """
+
+    dq_b: Float64Array
+    B: Float64Array
+    Dq: Float64Array
+
+    @property
+    def count(self) -> np.ndarray:
+        """Number of solutions of every measured band pair."""
+        return np.sum(~np.isnan(self.dq_b), axis=-1)
+
+
+@dataclass(frozen=True)
+class BandRatioTable:
+    """Monotone segments of the band ratio versus Dq/B of a configuration.
+
+    Attributes:
+        d_count (int): Electron configuration (d2-d8).
+        c_b (float): Fixed C/B ratio.
+        bands (tuple[str, str]): Columns of the lower and the upper band.
+        dq_b (Float64Array): Dq/B grid of the table.
+        ratio (Float64Array): Ratio upper / lower on the grid.
+        segments (tuple[Segment, ...]): Monotone parts of the curve.
+
+    """
+
+    d_count: int
+    c_b: float
+    bands: tuple[str, str]
+    dq_b: Float64Array
+    ratio: Float64Array
+    segments: tuple[Segment, ...]
+
+    def assign(
+        self,
+        lower: float | Float64Array,
+        upper: float | Float64Array,
+    ) -> Assignment:
+        """Assign measured band energies to Dq/B and B.
+
+        Args:
+            lower (float | Float64Array): Energies of the lower band in
+                wavenumbers, scalar or array.
+            upper (float | Float64Array): Energies of the upper band.
+
+        Returns:
+            Assignment: Solutions of shape `(n, n_segments)` for the `n`
+                flattened, broadcast band pairs.
+
+        """
+        lower, upper = (
+            np.ravel(value).astype(np.float64)
+            for value in np.broadcast_arrays(lower, upper)
+        )
+        ratio = upper / lower
+        dq_b = np.full((ratio.size, len(self.segments)), np.nan)
+        energy = np.full_like(dq_b, np.nan)
+        for number, segment in enumerate(self.segments):
+            index = np.searchsorted(segment.ratio, ratio)
+            inside = (index > 0) & (index < segment.ratio.size)
+            index = np.clip(index, 1, segment.ratio.size - 1)
+            left, right = index - 1, index
+            fraction = (ratio - segment.ratio[left]) / (
+                segment.ratio[right] - segment.ratio[left]
+            )
+            for values, target in ((segment.dq_b, dq_b), (segment.lower, energy)):
+                interpolated = values[left] + fraction * (values[right] - values[left])
+                target[:, number] = np.where(inside, interpolated, np.nan)
+        B = lower[:, None] / energy
+        return Assignment(dq_b=dq_b, B=B, Dq=dq_b * B)
+
+
+def _segments(
+    dq_b: Float64Array,
+    ratio: Float64Array,
+    lower: Float64Array,
+) -> tuple[Segment, ...]:
+    """Split a curve at its extrema into segments of increasing ratio."""
+    valid = np.isfinite(ratio) & (lower > 0.0)
+    slope = np.sign(np.diff(ratio))
+    # Steps without a finite, strictly monotone ratio end a segment
+    slope[~(valid[:-1] & valid[1:])] = 0.0
+    segments = []
+    start = 0
+    for stop in range(1, slope.size + 1):
+        if stop < slope.size and slope[stop] == slope[start]:
+            continue
+        if slope[start] != 0.0:
+            part = slice(start, stop + 1)
+            order = slice(None, None, int(slope[start]))
+            segments.append(
+                Segment(
+                    ratio=ratio[part][order].copy(),
+                    dq_b=dq_b[part][order].copy(),
+                    lower=lower[part][order].copy(),
+                ),
+            )
+        start = stop
+    return tuple(segments)
+
+
+@cache
+def band_ratio_table(
+    d_count: int,
+    c_b: float = 4.5,
+    *,
+    bands: tuple[str, str] | None = None,
+    dq_b: tuple[float, float] = (0.05, 5.0),
+    points: int = 4001,
+) -> BandRatioTable:
+    """Precompute the band ratio curve of a configuration.
+
+    Args:
+        d_count (int): Electron configuration (d2-d8).
+        c_b (float): Fixed C/B ratio. Defaults to 4.5.
+        bands (tuple[str, str] | None): Columns of the lower and the upper
+            band, as produced by `split_states`. Defaults to the two lowest
+            spin-allowed bands of `BANDS`.
+        dq_b (tuple[float, float]): Range of Dq/B. Defaults to (0.05, 5.0).
+        points (int): Number of grid points. Defaults to 4001.
+
+    Raises:
+        ValueError: If no default bands exist for the configuration or a band
+            is not a column of the configuration.
+
+    Returns:
+        BandRatioTable: Cached table of the ratio upper / lower.
+
+    """
+    if bands is None:
+        if d_count not in BANDS:
+            msg = f"No default bands for d{d_count}, the bands have to be given!"
+            raise ValueError(msg)
+        bands = BANDS[d_count]
+    names = {
+        (key if c.shape[-1] == 1 else f"{key}_{i}"): key
+        for key, c in block_layout(d_count)
+        for i in range(c.shape[-1])
+    }
+    unknown = [band for band in bands if band not in names]
+    if unknown:
+        msg = f"Unknown bands {unknown} for d{d_count}, use any of {list(names)}!"
+        raise ValueError(msg)
+
+    # Only the blocks of the two bands (and of the ground state) are solved
+    x = np.linspace(*dq_b, points)
+    terms = [names[band] for band in bands]
+    columns = split_states(solve_selected(d_count, x * _B, _B, c_b * _B, terms=terms))
+    lower, upper = (columns[band] / _B for band in bands)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = upper / lower
+    return BandRatioTable(
+        d_count=d_count,
+        c_b=c_b,
+        bands=tuple(bands),
+        dq_b=x,
+        ratio=ratio,
+        segments=_segments(x, ratio, lower),
+    )
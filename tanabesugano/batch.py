@@ -2,6 +2,14 @@
 
 from __future__ import annotations
 
+import contextlib
+import os
+import tempfile
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 import numpy as np
@@ -9,11 +17,25 @@ import numpy as np
 from tanabesugano import matrices
 from tanabesugano import tools
 from tanabesugano.constants import PARAMETER_RANGE_LENGTH
+from tanabesugano.constants import WAVENUMBER_TO_EV
 from tanabesugano.constants import ElectronConfiguration
+from tanabesugano.grids import parameter_grid
+from tanabesugano.progress import SERIAL_CHUNK
+from tanabesugano.progress import ProgressTracker
 
 
 if TYPE_CHECKING:
     from collections.abc import Callable
+    from collections.abc import Iterable
+
+    from numpy.typing import ArrayLike
+    from numpy.typing import DTypeLike
+
+    from tanabesugano.matrices import Float64Array
+    from tanabesugano.memory import MemoryEstimate
+    from tanabesugano.memory import MemoryReport
+    from tanabesugano.memory import SweepPlan
+    from tanabesugano.progress import ProgressCallback
 
 
 # Mapping from electron configuration to solver class
@@ -28,6 +50,409 @@ ELECTRON_CONFIG_SOLVERS: dict[int, Callable] = {
 }
 
 
+def solve_batch(
+    d_count: int,
+    Dq: float | Float64Array,
+    B: float | Float64Array,
+    C: float | Float64Array,
+    dtype: DTypeLike = np.float64,
+    *,
+    terms: Iterable[str] | None = None,
+    spin: int | Iterable[int] | None = None,
+    lowest_k: int | None = None,
+) -> dict[str, Float64Array]:
+    """Solve all (or the selected) states for many parameter sets at once.
+
+    Parameters
+    ----------
+    d_count : int
+        Electron configuration (d2-d8)
+    Dq : float | Float64Array
+        Oh crystal field splitting, scalar or array
+    B : float | Float64Array
+        Racah B parameter, scalar or array
+    C : float | Float64Array
+        Racah C parameter, scalar or array
+    dtype : DTypeLike, optional
+        Precision of the eigenvalues, np.float64 or np.float32, by default
+        np.float64
+    terms : Iterable[str] | None, optional
+        Term symbols to solve, e.g. ["4_T_2", "4_T_1"], by default all
+    spin : int | Iterable[int] | None, optional
+        Spin multiplicities to solve, e.g. 4 for quartets, by default all
+    lowest_k : int | None, optional
+        Number of lowest levels to keep per state, by default all
+
+    Returns
+    -------
+    dict[str, Float64Array]
+        Atomic term symbols as keys and arrays of shape `(*shape, k)` as values,
+        where `shape` is the broadcast shape of the parameters.
+
+    Raises
+    ------
+    ValueError
+        If `d_count` is not a valid electron configuration
+
+    """
+    solver_class = ELECTRON_CONFIG_SOLVERS.get(d_count)
+    if solver_class is None:
+        msg = "The number of unpaired electrons should be between 2 and 8."
+        raise ValueError(msg)
+    if terms is None and spin is None and lowest_k is None:
+        return solver_class(Dq=Dq, B=B, C=C, dtype=dtype).solver()
+
+    # Only the blocks of the selected states and of the ground states are solved
+    from tanabesugano.reusable import solve_selected  # noqa: PLC0415
+
+    return solve_selected(
+        d_count,
+        Dq,
+        B,
+        C,
+        terms=terms,
+        spin=spin,
+        lowest_k=lowest_k,
+        dtype=dtype,
+    )
+
+
+def solve_threaded(
+    d_count: int,
+    Dq: float | Float64Array,
+    B: float | Float64Array,
+    C: float | Float64Array,
+    *,
+    workers: int | None = None,
+    chunksize: int = 1024,
+    dtype: DTypeLike = np.float64,
+    progress: ProgressCallback | None = None,
+    out: np.ndarray | None = None,
+    **selection: object,
+) -> dict[str, Float64Array]:
+    """Solve many parameter sets in chunks across a thread pool.
+
+    Each chunk is solved with `solve_batch`. The stacked diagonalizations run in
+    LAPACK without the GIL, and under free-threaded CPython the remaining Python
+    code scales as well, without pickling or copying data between processes.
+
+    Parameters
+    ----------
+    d_count : int
+        Electron configuration (d2-d8)
+    Dq : float | Float64Array
+        Oh crystal field splitting, scalar or array
+    B : float | Float64Array
+        Racah B parameter, scalar or array
+    C : float | Float64Array
+        Racah C parameter, scalar or array
+    workers : int | None, optional
+        Number of threads, by default the default of `ThreadPoolExecutor`
+    chunksize : int, optional
+        Number of points per chunk, by default 1024
+    dtype : DTypeLike, optional
+        Precision of the eigenvalues, by default np.float64
+    progress : ProgressCallback | None, optional
+        Called with a `Progress` after every finished chunk, by default None
+    out : np.ndarray | None, optional
+        Energy matrix of shape `(n, size)` of `ReusableSolver`, e.g. a memmap,
+        into which every chunk is written as soon as it is solved instead of
+        concatenating all chunks at the end, by default None
+    **selection : object
+        `terms`, `spin` and `lowest_k` filters passed on to `solve_batch`
+
+    Returns
+    -------
+    dict[str, Float64Array]
+        Atomic term symbols as keys and arrays of shape `(n, k)` as values for
+        the `n` flattened, broadcast parameter sets, views into `out` if given.
+
+    """
+    Dq, B, C = (np.ravel(value) for value in np.broadcast_arrays(Dq, B, C))
+    starts = range(0, Dq.size, chunksize)
+    tracker = ProgressTracker(progress, total=Dq.size, chunks=len(starts))
+    parts = []
+    widths: dict[str, int] = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for start, part in zip(
+            starts,
+            executor.map(
+                lambda start: solve_batch(
+                    d_count,
+                    Dq[start : start + chunksize],
+                    B[start : start + chunksize],
+                    C[start : start + chunksize],
+                    dtype=dtype,
+                    **selection,
+                ),
+                starts,
+            ),
+            strict=True,
+        ):
+            rows = next(iter(part.values())).shape[0]
+            if out is None:
+                parts.append(part)
+            else:
+                out[start : start + rows] = np.concatenate(list(part.values()), axis=1)
+                widths = {key: value.shape[-1] for key, value in part.items()}
+            tracker.advance(rows)
+    if widths:
+        stops = np.cumsum(list(widths.values()))
+        return {
+            key: out[:, stop - width : stop]
+            for (key, width), stop in zip(widths.items(), stops, strict=True)
+        }
+    if not parts:
+        return solve_batch(d_count, Dq, B, C, dtype=dtype, **selection)
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def _solve_rows(
+    path: Path,
+    start: int,
+    d_count: int,
+    parameters: tuple[Float64Array, Float64Array, Float64Array],
+    selection: dict,
+) -> int:
+    """Solve a chunk into the rows of the shared energy matrix at `path`.
+
+    Module-level function, so that it can be pickled by the process pool. Only
+    the number of written rows is sent back to the parent.
+    """
+    values = np.lib.format.open_memmap(path, mode="r+")
+    states = solve_batch(d_count, *parameters, dtype=values.dtype, **selection)
+    stop = start + parameters[0].size
+    values[start:stop] = np.concatenate(list(states.values()), axis=1)
+    values.flush()
+    return stop - start
+
+
+def solve_shared(
+    d_count: int,
+    Dq: float | Float64Array,
+    B: float | Float64Array,
+    C: float | Float64Array,
+    *,
+    processes: int | None = None,
+    chunksize: int = 1024,
+    dtype: DTypeLike = np.float64,
+    path: str | Path | None = None,
+    progress: ProgressCallback | None = None,
+    **selection: object,
+) -> np.memmap:
+    """Solve many parameter sets in worker processes into a shared matrix.
+
+    The parent allocates one memory-mapped energy matrix, the workers write
+    their chunks directly into its rows and only return the number of solved
+    points, so no states are pickled back to the parent.
+
+    Parameters
+    ----------
+    d_count : int
+        Electron configuration (d2-d8)
+    Dq : float | Float64Array
+        Oh crystal field splitting, scalar or array
+    B : float | Float64Array
+        Racah B parameter, scalar or array
+    C : float | Float64Array
+        Racah C parameter, scalar or array
+    processes : int | None, optional
+        Number of worker processes, by default the number of CPUs
+    chunksize : int, optional
+        Number of points per chunk, by default 1024
+    dtype : DTypeLike, optional
+        Precision of the energy matrix, by default np.float64
+    path : str | Path | None, optional
+        `.npy` file that keeps the energy matrix, by default an anonymous
+        temporary file that is removed once the workers are done
+    progress : ProgressCallback | None, optional
+        Called with a `Progress` whenever a worker finished a chunk, by default
+        None
+    **selection : object
+        `terms`, `spin` and `lowest_k` filters passed on to `solve_batch`
+
+    Returns
+    -------
+    np.memmap
+        Energy matrix of shape `(n, k)` for the `n` flattened, broadcast
+        parameter sets with the columns of `ReusableSolver(d_count).columns`.
+
+    """
+    from tanabesugano.reusable import ReusableSolver  # noqa: PLC0415
+
+    Dq, B, C = (np.ravel(value) for value in np.broadcast_arrays(Dq, B, C))
+    size = ReusableSolver(d_count, **selection).size
+    temporary = path is None
+    if temporary:
+        handle, path = tempfile.mkstemp(suffix=".npy")
+        os.close(handle)
+    path = Path(path)
+    values = np.lib.format.open_memmap(
+        path,
+        mode="w+",
+        dtype=np.dtype(dtype),
+        shape=(Dq.size, size),
+    )
+    values.flush()
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [
+                executor.submit(
+                    _solve_rows,
+                    path,
+                    start,
+                    d_count,
+                    (
+                        Dq[start : start + chunksize],
+                        B[start : start + chunksize],
+                        C[start : start + chunksize],
+                    ),
+                    selection,
+                )
+                for start in range(0, Dq.size, chunksize)
+            ]
+            tracker = ProgressTracker(progress, total=Dq.size, chunks=len(futures))
+            for future in as_completed(futures):
+                tracker.advance(future.result())
+    finally:
+        if temporary:
+            # The mapping of the parent stays valid after the file is removed
+            with contextlib.suppress(OSError):
+                path.unlink()
+    return values
+
+
+def split_states(states: dict[str, Float64Array]) -> dict[str, Float64Array]:
+    """Split multi-valued states into single columns like `CMDmain`.
+
+    A state `3_T_1` with two eigenvalues becomes `3_T_1_0` and `3_T_1_1`; states
+    with a single eigenvalue keep their name.
+
+    Parameters
+    ----------
+    states : dict[str, Float64Array]
+        Scalar or batched result of a `solver()` call
+
+    Returns
+    -------
+    dict[str, Float64Array]
+        One entry of shape `shape` per column.
+
+    """
+    columns = {}
+    for key, value in states.items():
+        if value.shape[-1] > 1:
+            for i in range(value.shape[-1]):
+                columns[f"{key}_{i}"] = value[..., i]
+        else:
+            columns[key] = value[..., 0]
+    return columns
+
+
+def cut_table(states: dict[str, Float64Array]) -> list[dict]:
+    """Return the term symbol table of a single point sorted by energy.
+
+    Parameters
+    ----------
+    states : dict[str, Float64Array]
+        Result of a `solver()` call for one point, values of shape `(1, k)` or
+        `(k,)`
+
+    Returns
+    -------
+    list[dict]
+        One row per eigenvalue with the keys `state`, `cm` and `eV`, like the
+        table of `CMDmain.ts_print`.
+
+    """
+    rows = [
+        {
+            "state": key,
+            "cm": round(energy),
+            "eV": round(energy * WAVENUMBER_TO_EV, 4),
+        }
+        for key, value in states.items()
+        for energy in np.ravel(value).tolist()
+    ]
+    return sorted(rows, key=lambda row: row["eV"])
+
+
+def read_parameter(
+    params: dict,
+    name: str,
+    default: float | None = None,
+    *,
+    integer: bool = False,
+) -> float:
+    """Read a finite numeric parameter of a request record.
+
+    Parameters
+    ----------
+    params : dict
+        Parameters of the request, e.g. a parsed JSON object or a query string
+    name : str
+        Name of the parameter
+    default : float | None, optional
+        Value of a missing parameter, by default None, i.e., it is required
+    integer : bool, optional
+        Require an integral value, by default False
+
+    Returns
+    -------
+    float
+        Value of the parameter.
+
+    Raises
+    ------
+    ValueError
+        If the parameter is missing, not a finite number or not integral.
+
+    """
+    value = params.get(name, default)
+    if value is None:
+        msg = f"Missing parameter `{name}`!"
+        raise ValueError(msg)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        msg = f"Parameter `{name}` has to be a number!"
+        raise ValueError(msg) from None
+    # JSON allows NaN and Infinity, which would fail a whole batch
+    if not np.isfinite(number):
+        msg = f"Parameter `{name}` has to be a finite number!"
+        raise ValueError(msg)
+    if integer and not number.is_integer():
+        msg = f"Parameter `{name}` has to be an integer!"
+        raise ValueError(msg)
+    return number
+
+
+def read_d_count(params: dict) -> int:
+    """Read the electron configuration `d` of a request record.
+
+    Parameters
+    ----------
+    params : dict
+        Parameters of the request
+
+    Returns
+    -------
+    int
+        Electron configuration (d2-d8).
+
+    Raises
+    ------
+    ValueError
+        If `d` is missing, not integral or not a supported configuration.
+
+    """
+    d_count = int(read_parameter(params, "d", integer=True))
+    if d_count not in ELECTRON_CONFIG_SOLVERS:
+        msg = "The number of unpaired electrons should be between 2 and 8."
+        raise ValueError(msg)
+    return d_count
+
+
 def _validate_parameter_range(
     param: list[float],
     param_name: str,
@@ -55,11 +480,33 @@ def _validate_parameter_range(
         raise KeyError(msg)
 
 
+def _allocate(
+    shape: tuple[int, int],
+    dtype: np.dtype,
+    plan: SweepPlan | None,
+) -> np.ndarray:
+    """Allocate the energy matrix in RAM or, if planned, in a temporary memmap."""
+    if plan is None or plan.storage == "memory":
+        return np.empty(shape, dtype=dtype)
+    handle, path = tempfile.mkstemp(suffix=".npy")
+    os.close(handle)
+    values = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+    # The mapping stays valid after the file is removed
+    with contextlib.suppress(OSError):
+        Path(path).unlink()
+    return values
+
+
 class Batch:
     """Batch calculation of Tanabe-Sugano diagrams across parameter ranges.
 
     This class performs calculations across ranges of crystal field splitting (Dq),
     Racah parameters (B, C) to generate comprehensive Tanabe-Sugano diagram data.
+    By default the full Cartesian product of the three ranges is calculated;
+    explicit points, correlated B/C pairs and quasi-random samples of the
+    parameter box need far fewer solves. The parameter sets to solve are the
+    rows of `points`, while `Dq`, `B` and `C` hold the distinct values of every
+    parameter in ascending order.
     """
 
     def __init__(
@@ -69,6 +516,22 @@ class Batch:
         C: list[float] | None = None,
         d_count: int = 5,
         slater: bool = False,
+        *,
+        dtype: DTypeLike = np.float64,
+        workers: int | None = None,
+        processes: int | None = None,
+        terms: Iterable[str] | None = None,
+        spin: int | Iterable[int] | None = None,
+        lowest_k: int | None = None,
+        points: ArrayLike | None = None,
+        spacing: dict[str, str] | None = None,
+        ratio: float | None = None,
+        sampling: str | None = None,
+        samples: int = 256,
+        seed: int | None = None,
+        progress: ProgressCallback | None = None,
+        memory_budget: int | str | None = None,
+        track_memory: bool = False,
     ) -> None:
         """Initialize batch calculation parameters.
 
@@ -87,8 +550,55 @@ class Batch:
             Electron configuration (d2-d8), by default 5
         slater : bool, optional
             Transform from Racah to Slater-Condon parameters, by default False
+        dtype : DTypeLike, optional
+            Precision of the stored states, np.float32 halves the memory of large
+            sweeps, by default np.float64
+        workers : int | None, optional
+            Number of threads for a chunked, vectorized calculation, by default
+            None for a serial calculation point by point
+        processes : int | None, optional
+            Number of worker processes that write into a shared energy matrix,
+            by default None; takes precedence over `workers`
+        terms : Iterable[str] | None, optional
+            Term symbols to calculate, by default all
+        spin : int | Iterable[int] | None, optional
+            Spin multiplicities to calculate, by default all
+        lowest_k : int | None, optional
+            Number of lowest levels to keep per state, by default all
+        points : ArrayLike | None, optional
+            Explicit parameter sets of shape `(n, 3)` with the columns Dq, B and
+            C, e.g. of measured complexes; the ranges are ignored, by default None
+        spacing : dict[str, str] | None, optional
+            "linear" or "log" spacing per axis, e.g. `{"Dq": "log"}`, by default
+            all linear; unknown axes and `C` together with `ratio` raise a
+            `ValueError`
+        ratio : float | None, optional
+            Fixed C/B ratio; C follows B and its range is ignored, by default None
+        sampling : str | None, optional
+            "sobol" or "lhs" to sample `samples` points of the box spanned by the
+            start and stop values of the ranges instead of the full product,
+            by default None
+        samples : int, optional
+            Number of sampled points, by default 256
+        seed : int | None, optional
+            Seed of the Latin hypercube sampling, by default None
+        progress : ProgressCallback | None, optional
+            Called with a `Progress` after every solved chunk of the serial,
+            threaded and process-parallel calculation and of `reduce`, e.g. a
+            `ProgressBar`, by default None
+        memory_budget : int | str | None, optional
+            Memory budget of `calculation` in bytes or as string, e.g. "2GB";
+            the chunk size and an in-RAM or memory-mapped energy matrix are
+            chosen by `plan_sweep`, and a sweep that cannot fit raises a
+            `MemoryError` before anything is solved, by default None
+        track_memory : bool, optional
+            Measure the peak memory of `calculation` with `tracemalloc` and the
+            resident set size into `self.memory`; with a memory budget alone only
+            the resident set size is sampled, by default False
 
         """
+        from tanabesugano.memory import parse_size  # noqa: PLC0415
+
         if Dq is None:
             Dq = [4000.0, 4500.0, 10]
         if B is None:
@@ -101,15 +611,36 @@ class Batch:
         _validate_parameter_range(B, "B")
         _validate_parameter_range(C, "C")
 
-        self.Dq = np.linspace(Dq[0], Dq[1], int(Dq[2]))  # Oh-crystalfield-splitting
-        self.B = np.linspace(B[0], B[1], int(B[2]))  # Racah-B-parameter
-        self.C = np.linspace(C[0], C[1], int(C[2]))  # Racah-C-parameter
-
+        grid = parameter_grid(
+            {"Dq": Dq, "B": B, "C": C},
+            points=points,
+            spacing=spacing,
+            ratio=ratio,
+            sampling=sampling,
+            samples=samples,
+            seed=seed,
+        )
         if slater:
             # Transformin Racah to Slater-Condon
-            self.B, self.C = tools.racah(B, C)
+            grid[:, 1], grid[:, 2] = tools.racah(grid[:, 1], grid[:, 2])
+
+        # One row of Dq, B and C per parameter set to solve
+        self.points = grid
+        # Distinct values of every parameter, i.e., the axes of a range grid
+        self.Dq, self.B, self.C = (np.unique(column) for column in grid.T)
 
         self.d_count = d_count
+        self.dtype = np.dtype(dtype)
+        self.workers = workers
+        self.processes = processes
+        self.progress = progress
+        self.memory_budget = (
+            None if memory_budget is None else parse_size(memory_budget)
+        )
+        self.track_memory = track_memory
+        self.plan: SweepPlan | None = None
+        self.memory: MemoryReport | None = None
+        self.selection = {"terms": terms, "spin": spin, "lowest_k": lowest_k}
         if self.d_count in {
             ElectronConfiguration.D4,
             ElectronConfiguration.D5,
@@ -121,28 +652,170 @@ class Batch:
         if self.d_count in {ElectronConfiguration.D2, ElectronConfiguration.D8}:
             self._size = 10
         self.result: list[dict] = []
+        self.values = np.empty((0, 0), dtype=self.dtype)
+
+    def estimate_memory(self) -> MemoryEstimate:
+        """Predict the memory of `calculation` before solving anything.
+
+        Returns
+        -------
+        MemoryEstimate
+            Energy matrix, result dictionaries and chunk workspace in bytes
+
+        """
+        from tanabesugano.memory import estimate_memory  # noqa: PLC0415
+
+        return estimate_memory(
+            self.d_count,
+            len(self.points),
+            dtype=self.dtype,
+            chunksize=self._chunksize(),
+            workers=self.processes or self.workers or 1,
+            **self.selection,
+        )
+
+    def _chunksize(self) -> int:
+        """Return the number of points per chunk of the configured calculation."""
+        if self.processes is not None:
+            chunksize = max(1, -(-len(self.points) // self.processes))
+            return min(chunksize, self.plan.chunksize) if self.plan else chunksize
+        if self.workers is not None:
+            # The default chunk size of `solve_threaded`
+            return self.plan.chunksize if self.plan else 1024
+        # The serial calculation solves point by point
+        return 1
 
     def calculation(self) -> None:
         """Fill self.result with iTS states of over-iterated energy range."""
-        # Get the solver class for this electron configuration
-        solver_class = ELECTRON_CONFIG_SOLVERS.get(self.d_count)
-        if solver_class is None:
+        from tanabesugano.memory import MemoryMonitor  # noqa: PLC0415
+        from tanabesugano.memory import plan_sweep  # noqa: PLC0415
+
+        if self.d_count not in ELECTRON_CONFIG_SOLVERS:
             msg = "not a correct value!"
             raise ValueError(msg)
 
-        for _Dq in self.Dq:
-            for _B in self.B:
-                for _C in self.C:
-                    states = solver_class(Dq=_Dq, B=_B, C=_C).solver()
-                    self.result.append(
-                        {
-                            "d_count": self.d_count,
-                            "Dq": _Dq,
-                            "B": _B,
-                            "C": _C,
-                            "states": states,
-                        },
-                    )
+        estimate = self.estimate_memory()
+        if self.memory_budget is not None:
+            self.plan = plan_sweep(
+                self.d_count,
+                len(self.points),
+                self.memory_budget,
+                dtype=self.dtype,
+                workers=estimate.workers,
+                **self.selection,
+            )
+            estimate = self.estimate_memory()
+        if self.memory_budget is None and not self.track_memory:
+            self._calculate()
+            return
+        # Tracing slows down the serial calculation, a budget alone only samples
+        # the resident set size
+        with MemoryMonitor(trace=self.track_memory, estimate=estimate) as monitor:
+            self._calculate()
+        self.memory = monitor.report
+
+    def _calculate(self) -> None:
+        """Solve all points into self.values and build self.result."""
+        from tanabesugano.reusable import ReusableSolver  # noqa: PLC0415
+
+        # All states are written into one preallocated array, the states of
+        # every result are views into its rows
+        solver = ReusableSolver(self.d_count, dtype=self.dtype, **self.selection)
+        Dq, B, C = self.points.T
+        shape = (Dq.size, solver.size)
+        if self.processes is not None:
+            self.values = solve_shared(
+                self.d_count,
+                Dq,
+                B,
+                C,
+                processes=self.processes,
+                chunksize=self._chunksize(),
+                dtype=self.dtype,
+                progress=self.progress,
+                **self.selection,
+            )
+        elif self.workers is None:
+            self.values = _allocate(shape, self.dtype, self.plan)
+            starts = range(0, Dq.size, SERIAL_CHUNK)
+            tracker = ProgressTracker(self.progress, total=Dq.size, chunks=len(starts))
+            for start in starts:
+                stop = min(start + SERIAL_CHUNK, Dq.size)
+                for i in range(start, stop):
+                    solver.update(Dq[i], B[i], C[i])
+                    solver.solve(out=self.values[i])
+                tracker.advance(stop - start)
+        elif self.plan is not None:
+            # Every chunk is written into the planned storage when solved
+            self.values = _allocate(shape, self.dtype, self.plan)
+            solve_threaded(
+                self.d_count,
+                Dq,
+                B,
+                C,
+                workers=self.workers,
+                chunksize=self._chunksize(),
+                **self.selection,
+                dtype=self.dtype,
+                progress=self.progress,
+                out=self.values,
+            )
+        else:
+            states = solve_threaded(
+                self.d_count,
+                Dq,
+                B,
+                C,
+                workers=self.workers,
+                **self.selection,
+                dtype=self.dtype,
+                progress=self.progress,
+            )
+            self.values = np.concatenate(list(states.values()), axis=1)
+
+        # Plain views, the rows of a memmap would each carry the memmap attributes
+        rows = np.asarray(self.values)
+        for _Dq, _B, _C, row in zip(Dq, B, C, rows, strict=True):
+            self.result.append(
+                {
+                    "d_count": self.d_count,
+                    "Dq": _Dq,
+                    "B": _B,
+                    "C": _C,
+                    "states": solver.states(row),
+                },
+            )
+
+    def reduce(self, reducers: Iterable, chunksize: int = 4096) -> list[dict]:
+        """Aggregate the batch with reducers instead of storing every point.
+
+        Parameters
+        ----------
+        reducers : Iterable
+            Reducers of `tanabesugano.reducers`, e.g. `Envelope("B")`
+        chunksize : int, optional
+            Number of points solved at once, by default 4096
+
+        Returns
+        -------
+        list[dict]
+            The `result()` of every reducer; `self.result` stays empty.
+
+        """
+        from tanabesugano.reducers import reduce_sweep  # noqa: PLC0415
+
+        return reduce_sweep(
+            self.d_count,
+            (
+                self.points[start : start + chunksize]
+                for start in range(0, len(self.points), chunksize)
+            ),
+            reducers,
+            dtype=self.dtype,
+            progress=self.progress,
+            total=len(self.points),
+            **self.selection,
+        )
 
     @property
     def return_result(self) -> list[dict]:
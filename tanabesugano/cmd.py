@@ -4,8 +4,10 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -24,7 +26,23 @@ from tanabesugano import tools
 
 # Import the solver mapping from batch module
 from tanabesugano.batch import ELECTRON_CONFIG_SOLVERS
+from tanabesugano.batch import solve_threaded
+from tanabesugano.batch import split_states
+from tanabesugano.constants import WAVENUMBER_TO_EV
 from tanabesugano.constants import ElectronConfiguration
+from tanabesugano.downsample import downsample_frame
+from tanabesugano.progress import SERIAL_CHUNK
+from tanabesugano.progress import ProgressBar
+from tanabesugano.progress import ProgressTracker
+from tanabesugano.reusable import ReusableSolver
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from numpy.typing import DTypeLike
+
+    from tanabesugano.progress import ProgressCallback
 
 
 class CMDmain:
@@ -42,6 +60,13 @@ class CMDmain:
         nroots: int = 100,
         d_count: int = 5,
         slater: bool = False,
+        *,
+        dtype: DTypeLike = np.float64,
+        workers: int | None = None,
+        terms: Iterable[str] | None = None,
+        spin: int | Iterable[int] | None = None,
+        lowest_k: int | None = None,
+        progress: ProgressCallback | None = None,
     ) -> None:
         """CMD Interface for Tanabe-Sugano-Diagram.
 
@@ -59,9 +84,28 @@ class CMDmain:
             Electron count, by default 5
         slater : bool, optional
              Transforming from Racah to Slater-Condon, by default False
+        dtype : DTypeLike, optional
+            Precision of the calculated states and of the exported data,
+            by default np.float64
+        workers : int | None, optional
+            Number of threads for a chunked, vectorized calculation, by default
+            None for a serial calculation point by point
+        terms : Iterable[str] | None, optional
+            Term symbols to calculate, by default all
+        spin : int | Iterable[int] | None, optional
+            Spin multiplicities to calculate, by default all
+        lowest_k : int | None, optional
+            Number of lowest levels to keep per state, by default all
+        progress : ProgressCallback | None, optional
+            Called with a `Progress` after every solved chunk of roots, e.g. a
+            `ProgressBar`, by default None
 
         """
         self.Dq = Dq
+        self.progress = progress
+        self.dtype = np.dtype(dtype)
+        self.workers = workers
+        self.selection = {"terms": terms, "spin": spin, "lowest_k": lowest_k}
         self.B = B
         self.C = C
 
@@ -136,45 +180,96 @@ class CMDmain:
         plt.ylabel(arg1)
         plt.xlabel(arg2)
 
-    def savetxt(self) -> None:
+    def savetxt(self, directory: str | Path = ".") -> None:
         """Save Tanabe-Sugano and DD excitation data to CSV files.
 
         Creates two CSV files:
         - TS diagram data (E/B vs Delta/B)
         - DD excitations data (dd-state-energy vs 10Dq)
 
+        Parameters
+        ----------
+        directory : str | Path, optional
+            Output directory for the CSV files, by default the current directory
+
         """
-        pd.concat(
+        directory = Path(directory)
+        self.ts_frame().to_csv(directory / f"{self.title_TS}.csv", index=False)
+        self.dd_frame().to_csv(directory / f"{self.title_DD}.csv", index=False)
+
+    def ts_frame(self) -> pd.DataFrame:
+        """Return the TS diagram data (E/B vs Delta/B) as saved by `savetxt`."""
+        return pd.concat(
             [
                 self.df["delta_B"],
                 self.df.drop(["Energy", "delta_B", "10Dq"], axis=1) / self.B,
             ],
             axis=1,
-        ).to_csv(Path(f"{self.title_TS}.csv"), index=False)
+        )
 
-        pd.concat(
+    def dd_frame(self) -> pd.DataFrame:
+        """Return the DD excitations data (dd-state-energy vs 10Dq)."""
+        return pd.concat(
             [self.df["10Dq"], self.df.drop(["Energy", "delta_B", "10Dq"], axis=1)],
             axis=1,
-        ).to_csv(Path(f"{self.title_DD}.csv"), index=False)
+        )
 
     def calculation(self) -> None:
         """Fill self.result with iTS states of over-iterated energy range."""
-        # Get the solver class for this electron configuration
-        solver_class = ELECTRON_CONFIG_SOLVERS.get(self.d_count)
-        if solver_class is None:
+        if self.d_count not in ELECTRON_CONFIG_SOLVERS:
             msg = "The number of unpaired electrons should be between 2 and 8."
             raise ValueError(msg)
 
-        result = []
-        for dq in self.df["Energy"]:
-            states = solver_class(Dq=dq, B=self.B, C=self.C).solver()
-            result.append(self.subsplit_states(states))
+        if self.workers is not None:
+            self.assign_states(
+                solve_threaded(
+                    self.d_count,
+                    self.df["Energy"].to_numpy(),
+                    self.B,
+                    self.C,
+                    workers=self.workers,
+                    chunksize=max(1, -(-self.nroot // self.workers)),
+                    dtype=self.dtype,
+                    progress=self.progress,
+                    **self.selection,
+                ),
+            )
+            return
+
+        # One solver with preallocated buffers for all points of the diagram
+        solver = ReusableSolver(self.d_count, dtype=self.dtype, **self.selection)
+        self.result = np.zeros((solver.size, self.nroot), dtype=self.dtype)
+        energy = self.df["Energy"].to_numpy()
+        starts = range(0, self.nroot, SERIAL_CHUNK)
+        tracker = ProgressTracker(self.progress, total=self.nroot, chunks=len(starts))
+        for start in starts:
+            stop = min(start + SERIAL_CHUNK, self.nroot)
+            rows = self.result.T[start:stop]
+            for dq, row in zip(energy[start:stop], rows, strict=True):
+                solver.update(dq, self.B, self.C)
+                solver.solve(out=row)
+            tracker.advance(stop - start)
+        self.df = pd.concat(
+            [self.df, pd.DataFrame(self.result.T, columns=solver.columns)],
+            axis=1,
+        )
 
-        # Transform list of dictionaries to dictionary of arrays
-        result = {
-            key: np.array([d[key] for d in result]).flatten() for key in result[0]
-        }
-        self.df = pd.concat([self.df, pd.DataFrame(result)], axis=1)
+    def assign_states(self, states: dict[str, np.ndarray]) -> None:
+        """Fill the diagram with states that have been solved elsewhere.
+
+        Parameters
+        ----------
+        states : dict[str, np.ndarray]
+            Batched states of shape `(nroots, k)` for the energies of `self.df`,
+            e.g. of `solve_batch`
+
+        """
+        columns = split_states(states)
+        self.result = np.array(list(columns.values()), dtype=self.dtype)
+        self.df = pd.concat(
+            [self.df, pd.DataFrame(dict(zip(columns, self.result, strict=True)))],
+            axis=1,
+        )
 
     @staticmethod
     def subsplit_states(states: dict) -> dict:
@@ -188,7 +283,11 @@ class CMDmain:
                 rearranged_states[key] = value
         return rearranged_states
 
-    def ci_cut(self, dq_ci: float | None = None) -> None:
+    def ci_cut(
+        self,
+        dq_ci: float | None = None,
+        directory: str | Path = ".",
+    ) -> Path:
         """Extract atomic-termsymbols for specific dq by oxidation state."""
         # Get the solver class for this electron configuration
         solver_class = ELECTRON_CONFIG_SOLVERS.get(self.d_count)
@@ -197,9 +296,14 @@ class CMDmain:
             raise ValueError(msg)
 
         states = solver_class(Dq=dq_ci / 10.0, B=self.B, C=self.C).solver()
-        self.ts_print(states, dq_ci=dq_ci)
+        return self.ts_print(states, dq_ci=dq_ci, directory=directory)
 
-    def ts_print(self, states: dict, dq_ci: float | None = None) -> None:
+    def ts_print(
+        self,
+        states: dict,
+        dq_ci: float | None = None,
+        directory: str | Path = ".",
+    ) -> Path:
         """Print the atomic-termsymbols.
 
         Print the atomic-termsymbols for a specific dq depending on the oxidation state
@@ -211,6 +315,13 @@ class CMDmain:
             List of atomic-termsymbols for a specific oxidation state
         dq_ci : float, optional
             Specific crystalfield-splitting in Dq, by default None
+        directory : str | Path, optional
+            Output directory for the txt-file, by default the current directory
+
+        Returns
+        -------
+        Path
+            Path of the saved txt-file.
 
         """
         count = 0
@@ -220,7 +331,7 @@ class CMDmain:
             for energy in energies:
                 cut["state"][count] = irreducible
                 cut["cm"][count] = np.round(energy, 0).astype(int)
-                cut["eV"][count] = np.round(energy * 0.00012, 4)
+                cut["eV"][count] = np.round(energy * WAVENUMBER_TO_EV, 4)
 
                 count += 1
 
@@ -239,8 +350,9 @@ class CMDmain:
             f"_C_{int(self.C)}.csv"
         )
 
+        path = Path(directory) / title
         np.savetxt(
-            title,
+            path,
             results.T,
             delimiter=",",
             header="state,cm,eV",
@@ -248,9 +360,19 @@ class CMDmain:
             # Remove # for comments
             comments="",
         )
+        return path
 
-    def interactive_plot(self) -> None:
-        """Interactive plot for the tanabe-sugano-diagram."""
+    def interactive_plot(self, points: int | None = None) -> None:
+        """Interactive plot for the tanabe-sugano-diagram.
+
+        Parameters
+        ----------
+        points : int | None, optional
+            Target number of points per state. The traces are downsampled in a
+            shape-preserving way, keeping all crossing points, which reduces the
+            size of the html-files. By default None, i.e., all points are used.
+
+        """
         if px is None:
             msg = (
                 "Plotly is not installed. "
@@ -270,12 +392,17 @@ class CMDmain:
             px.colors.qualitative.Light24[int(i[0]) - 1] for i in _col
         ]
 
-        _df = self.df.copy()
+        if points is None:
+            _df = self.df.copy()
+            _traces = {"y": _col}
+        else:
+            _df = downsample_frame(self.df, x="10Dq", columns=_col, points=points)
+            _traces = {"y": "value", "color": "variable"}
 
         fig_1 = px.line(
             _df,
             x="10Dq",
-            y=_col,
+            **_traces,
             title="Energy-Correlation-Diagram",
             labels={
                 "variable": "State",
@@ -296,13 +423,16 @@ class CMDmain:
         fig_1.write_html(Path(f"{self.title_DD}.html"))
 
         # Apply / self.B to every column except for _col
-        _df[_col] = _df[_col].div(self.B, axis=0)
+        if points is None:
+            _df[_col] = _df[_col].div(self.B, axis=0)
+        else:
+            _df["value"] = _df["value"] / self.B
 
         # Plot the tanabe-sugano-diagram
         fig_2 = px.line(
             _df,
             x="delta_B",
-            y=_col,
+            **_traces,
             title="Tanabe-Sugano-Diagram",
             labels={
                 "variable": "State",
@@ -323,6 +453,225 @@ class CMDmain:
         fig_2.write_html(Path(f"{self.title_TS}.html"))
 
 
+def _add_atlas_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the `atlas` subcommand."""
+    parser = subparsers.add_parser(
+        "atlas",
+        help="Compute the TS- and DD-diagrams of several configurations at once",
+        description="Compute the TS- and DD-diagrams of several configurations "
+        "in one process pool. Unchanged diagrams are skipped.",
+    )
+    parser.add_argument(
+        "-d",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Electron configurations to compute (default d2-d8)",
+    )
+    parser.add_argument(
+        "-Dq",
+        type=float,
+        default=40000.0,
+        help="Maximum 10Dq crystal field splitting (default 10Dq = 40000 cm-)",
+    )
+    parser.add_argument(
+        "-cut",
+        type=float,
+        default=24000.0,
+        help="10Dq crystal field splitting of the cut (default 10Dq = 24000 cm-)",
+    )
+    parser.add_argument(
+        "-variant",
+        type=float,
+        nargs=2,
+        action="append",
+        default=None,
+        metavar=("B", "C"),
+        help="Additional Racah Parameter pair B C for every configuration "
+        "(can be repeated)",
+    )
+    parser.add_argument(
+        "-n",
+        type=int,
+        default=500,
+        help="Number of roots (default nroots = 500)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="ts-diagrams",
+        help="Output directory (default = ts-diagrams)",
+    )
+    parser.add_argument(
+        "-j",
+        "--processes",
+        type=int,
+        default=None,
+        help="Number of worker processes (default = number of CPUs)",
+    )
+    parser.add_argument(
+        "-force",
+        action="store_true",
+        default=False,
+        help="Recompute all diagrams, even if unchanged (default = off)",
+    )
+    parser.add_argument(
+        "-binary",
+        default=None,
+        help="Additionally export all diagrams as float32 blobs with a "
+        "binary-manifest.json into this directory (default = off)",
+    )
+    parser.add_argument(
+        "-quantize",
+        action="store_true",
+        default=False,
+        help="Quantize the binary export to 16-bit integers (default = off)",
+    )
+    parser.add_argument(
+        "-points",
+        type=int,
+        default=None,
+        help="Downsample every state of the binary export to about this number "
+        "of points (default = off)",
+    )
+
+
+def _run_atlas(args: argparse.Namespace) -> None:
+    """Run the `atlas` subcommand."""
+    from tanabesugano.atlas import Atlas  # noqa: PLC0415
+    from tanabesugano.atlas import default_entries  # noqa: PLC0415
+
+    entries = default_entries(
+        d_counts=args.d,
+        variants=[tuple(pair) for pair in args.variant or ()],
+        Dq=args.Dq / 10.0,
+        nroots=args.n,
+        cut=args.cut,
+    )
+    atlas = Atlas(
+        entries,
+        directory=args.output,
+        processes=args.processes,
+        force=args.force,
+    )
+    computed = atlas.run()
+    print(  # noqa: T201
+        f"Computed {len(computed)} of {len(entries)} diagrams in {atlas.directory}",
+    )
+    if args.binary is not None:
+        from tanabesugano.export import export_directory  # noqa: PLC0415
+
+        export_directory(
+            atlas.directory,
+            args.binary,
+            quantize=args.quantize,
+            points=args.points,
+        )
+
+
+def _add_serve_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the `serve` subcommand."""
+    parser = subparsers.add_parser(
+        "serve",
+        help="Serve point solves, diagrams and cuts over HTTP",
+        description="Serve point solves, diagrams and cuts over a local HTTP "
+        "service. Concurrent requests are coalesced into batched solves.",
+    )
+    parser.add_argument(
+        "-host",
+        default="127.0.0.1",
+        help="Interface to bind to (default = 127.0.0.1)",
+    )
+    parser.add_argument(
+        "-port",
+        type=int,
+        default=8000,
+        help="Port to bind to (default = 8000)",
+    )
+    parser.add_argument(
+        "-window",
+        type=float,
+        default=2.0,
+        help="Coalescing window in milliseconds (default = 2 ms)",
+    )
+    parser.add_argument(
+        "-max-batch",
+        type=int,
+        default=4096,
+        help="Number of points that triggers an immediate solve (default = 4096)",
+    )
+    parser.add_argument(
+        "-concurrency",
+        type=int,
+        default=4,
+        help="Number of batched solves running at the same time (default = 4)",
+    )
+    parser.add_argument(
+        "-max-pending",
+        type=int,
+        default=1024,
+        help="Number of requests in flight before new ones are rejected "
+        "(default = 1024)",
+    )
+
+
+def _run_serve(args: argparse.Namespace) -> None:
+    """Run the `serve` subcommand."""
+    import asyncio  # noqa: PLC0415
+
+    from tanabesugano.service import SolverService  # noqa: PLC0415
+
+    service = SolverService(
+        host=args.host,
+        port=args.port,
+        window=args.window / 1000.0,
+        max_batch=args.max_batch,
+        max_concurrency=args.concurrency,
+        max_pending=args.max_pending,
+    )
+    print(f"Serving on http://{args.host}:{args.port}")  # noqa: T201
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(service.serve_forever())
+
+
+def _add_stream_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the `stream` subcommand."""
+    parser = subparsers.add_parser(
+        "stream",
+        help="Solve JSON-lines parameter records in one process",
+        description="Read point, cut and diagram records as JSON lines and "
+        "write the results as JSON lines in input order.",
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        type=argparse.FileType("r"),
+        default="-",
+        help="JSON-lines input file (default = stdin)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=argparse.FileType("w"),
+        default="-",
+        help="JSON-lines output file (default = stdout)",
+    )
+    parser.add_argument(
+        "-chunk",
+        type=int,
+        default=4096,
+        help="Number of points solved per vectorized chunk (default = 4096)",
+    )
+
+
+def _run_stream(args: argparse.Namespace) -> None:
+    """Run the `stream` subcommand."""
+    from tanabesugano.stream import run_stream  # noqa: PLC0415
+
+    run_stream(args.input, args.output, chunk_size=args.chunk)
+    args.output.flush()
+
+
 def cmd_line() -> None:
     """Command line interface for tanabe-sugano."""
     description = (
@@ -406,9 +755,62 @@ def cmd_line() -> None:
         default=False,
         help="Save TS-diagram and dd energies (default = off)",
     )
+    parser.add_argument(
+        "-points",
+        type=int,
+        default=None,
+        help="Downsample every state of the html-files to about this number of "
+        "points (default = off)",
+    )
+    parser.add_argument(
+        "-terms",
+        nargs="+",
+        default=None,
+        help="Only calculate these states, e.g. 4_T_2 4_T_1 (default = all)",
+    )
+    parser.add_argument(
+        "-spin",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Only calculate states of these spin multiplicities (default = all)",
+    )
+    parser.add_argument(
+        "-lowest",
+        type=int,
+        default=None,
+        help="Only keep the lowest levels of every state (default = all)",
+    )
+    parser.add_argument(
+        "-threads",
+        type=int,
+        default=None,
+        help="Solve the roots in chunks on this number of threads (default = off)",
+    )
+    parser.add_argument(
+        "-progress",
+        action="store_true",
+        default=False,
+        help="Show a progress bar of the calculation (default = off)",
+    )
+
+    subparsers = parser.add_subparsers(dest="command")
+    _add_atlas_parser(subparsers)
+    _add_serve_parser(subparsers)
+    _add_stream_parser(subparsers)
 
     args = parser.parse_args()
 
+    if args.command == "atlas":
+        _run_atlas(args)
+        return
+    if args.command == "serve":
+        _run_serve(args)
+        return
+    if args.command == "stream":
+        _run_stream(args)
+        return
+
     tmm = CMDmain(
         Dq=args.Dq / 10.0,
         B=args.B[0] * args.B[1],
@@ -416,6 +818,11 @@ def cmd_line() -> None:
         nroots=args.n,
         d_count=args.d,
         slater=args.slater,
+        workers=args.threads,
+        terms=args.terms,
+        spin=args.spin,
+        lowest_k=args.lowest,
+        progress=ProgressBar(f"d{args.d}") if args.progress else None,
     )
     tmm.calculation()
 
@@ -426,4 +833,4 @@ def cmd_line() -> None:
     if args.cut is not None:
         tmm.ci_cut(dq_ci=args.cut)
     if args.html:
-        tmm.interactive_plot()
+        tmm.interactive_plot(points=args.points)
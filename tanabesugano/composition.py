@@ -0,0 +1,129 @@
+"""Strong-field configuration composition of the states.
+
+The matrices of the solver classes are written in the strong-field basis, in
+which the ligand field only enters the diagonal: a basis function of the
+configuration t2g^m eg^n of a dN ion carries `(6N - 10m) Dq`. The configuration
+of every row of a block is therefore known from the coefficients of
+`block_layout`, and the squared eigenvector components summed per configuration
+give the t2g^m eg^n character of every level.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from numpy.linalg import eigh
+
+from tanabesugano.batch import ELECTRON_CONFIG_SOLVERS
+from tanabesugano.reusable import block_layout
+from tanabesugano.reusable import select_terms
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from tanabesugano.matrices import Float64Array
+
+
+@dataclass(frozen=True)
+class Composition:
+    """Energies and configuration weights of the levels of many parameter sets.
+
+    Attributes:
+        columns (list[str]): Level names, as produced by `split_states`.
+        basis (list[str]): Strong-field configurations, e.g. `"t2g^3 eg^1"`.
+        energies (Float64Array): Energies of shape `(N, n_states)` relative to the
+            ground state.
+        weights (np.ndarray): Float32 weights of shape `(N, n_states, n_basis)`,
+            which sum to one for every level.
+
+    """
+
+    columns: list[str]
+    basis: list[str]
+    energies: Float64Array
+    weights: np.ndarray
+
+    @property
+    def leading(self) -> np.ndarray:
+        """Index into `basis` of the dominant configuration of every level."""
+        return np.argmax(self.weights, axis=-1)
+
+
+def basis_occupations(d_count: int, key: str) -> np.ndarray:
+    """Return the t2g occupation of every basis function of a state.
+
+    Args:
+        d_count (int): Electron configuration (d2-d8).
+        key (str): Term symbol of the state, e.g. "3_T_1".
+
+    Returns:
+        np.ndarray: Occupation `m` of t2g^m eg^(N-m) per row of the block.
+
+    """
+    coefficients = dict(block_layout(d_count))[key]
+    return np.rint((6 * d_count - np.diagonal(coefficients[0])) / 10).astype(int)
+
+
+def configuration_label(d_count: int, m: int) -> str:
+    """Return the label of the configuration t2g^m eg^(N-m)."""
+    parts = [f"t2g^{m}" if m else "", f"eg^{d_count - m}" if d_count - m else ""]
+    return " ".join(part for part in parts if part)
+
+
+def configuration_weights(
+    d_count: int,
+    Dq: float | Float64Array,
+    B: float | Float64Array,
+    C: float | Float64Array,
+    *,
+    terms: Iterable[str] | None = None,
+    spin: int | Iterable[int] | None = None,
+) -> Composition:
+    """Solve the states with eigenvectors and return their configuration weights.
+
+    Args:
+        d_count (int): Electron configuration (d2-d8).
+        Dq (float | Float64Array): Oh crystal field splitting, scalar or array.
+        B (float | Float64Array): Racah B parameter, scalar or array.
+        C (float | Float64Array): Racah C parameter, scalar or array.
+        terms (Iterable[str] | None): Term symbols to keep. Defaults to all.
+        spin (int | Iterable[int] | None): Spin multiplicities to keep.
+
+    Returns:
+        Composition: Energies and weights of the `N` flattened, broadcast
+            parameter sets.
+
+    """
+    keys = select_terms(d_count, terms=terms, spin=spin)
+    ground_terms = ELECTRON_CONFIG_SOLVERS[d_count].ground_terms
+    layout = dict(block_layout(d_count))
+    parameters = np.stack(np.broadcast_arrays(Dq, B, C), axis=-1).reshape(-1, 3)
+
+    occupations = {key: basis_occupations(d_count, key) for key in keys}
+    levels = sorted(set(np.concatenate(list(occupations.values())).tolist()))[::-1]
+    basis = [configuration_label(d_count, m) for m in levels]
+
+    values, weights = {}, []
+    for key in dict.fromkeys([*keys, *ground_terms]):
+        energies, vectors = eigh(np.tensordot(parameters, layout[key], axes=1))
+        values[key] = energies
+        if key in occupations:
+            # Indicator of the configuration of every row of the block
+            indicator = occupations[key][:, None] == np.array(levels)[None, :]
+            weights.append(np.einsum("nik,ic->nkc", vectors**2, indicator))
+    ground = np.min([values[key][:, :1] for key in ground_terms], axis=0)
+
+    columns = []
+    for key in keys:
+        size = values[key].shape[-1]
+        columns.extend([f"{key}_{i}" for i in range(size)] if size > 1 else [key])
+    return Composition(
+        columns=columns,
+        basis=basis,
+        energies=np.concatenate([values[key] - ground for key in keys], axis=1),
+        weights=np.concatenate(weights, axis=1).astype(np.float32),
+    )
@@ -21,8 +21,12 @@ class ElectronConfiguration(IntEnum):
     D8 = 8
 
 
+# Unit conversions
+WAVENUMBER_TO_EV = 0.00012  # Approximate conversion of wavenumbers (cm-1) to eV
+
 # Numerical tolerances
 ENERGY_TOLERANCE = 1e-4  # Threshold for energy level corrections in wavenumbers
+DEGENERACY_TOLERANCE = 1e-5  # Relative level spacing refined in float64 for float32
 
 # Array dimensions
 PARAMETER_RANGE_LENGTH = 3  # Expected format: (start, stop, steps)
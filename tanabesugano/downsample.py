@@ -0,0 +1,155 @@
+"""Shape-preserving level-of-detail downsampling of diagram traces.
+
+The traces of a diagram are reduced with the largest-triangle-three-buckets
+(LTTB) algorithm, which keeps the points that contribute most to the visual
+shape of a line. Points next to a crossing of two traces are always kept, so
+that the order of the states stays correct after downsampling.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from tanabesugano.matrices import Float64Array
+
+
+# LTTB always keeps the first and the last point
+_MIN_POINTS = 3
+# Relative difference below which two traces are considered degenerate
+_DEGENERACY_TOLERANCE = 1e-9
+
+
+def lttb_indices(x: Float64Array, Y: Float64Array, points: int) -> np.ndarray:
+    """Select the largest-triangle-three-buckets indices of several traces.
+
+    All traces share the same x-axis and are processed simultaneously, so that
+    the loop only runs over the buckets.
+
+    Args:
+        x (Float64Array): 1-dimensional x-axis of length `n`.
+        Y (Float64Array): 2-dimensional array of shape `(n, traces)`.
+        points (int): Number of points to keep per trace.
+
+    Returns:
+        np.ndarray: Integer array of shape `(points, traces)` with the selected
+            indices of every trace in ascending order.
+
+    """
+    x = np.asarray(x, dtype=np.float64)
+    Y = np.asarray(Y, dtype=np.float64).reshape(len(x), -1)
+    n, traces = Y.shape
+    if points >= n or points < _MIN_POINTS:
+        return np.repeat(np.arange(n)[:, np.newaxis], traces, axis=1)
+
+    # Bucket edges for the n - 2 inner points
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    selected = np.zeros((points, traces), dtype=int)
+    selected[-1] = n - 1
+    columns = np.arange(traces)
+    for bucket in range(points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < points - 1 else n
+        # Average point of the next bucket
+        x_c = x[stop:next_stop].mean()
+        y_c = Y[stop:next_stop].mean(axis=0)
+        # Previously selected point of every trace
+        x_a = x[selected[bucket]]
+        y_a = Y[selected[bucket], columns]
+
+        area = np.abs(
+            (x_a - x_c) * (Y[start:stop] - y_a)
+            - (x_a - x[start:stop, np.newaxis]) * (y_c - y_a),
+        )
+        selected[bucket + 1] = start + np.argmax(area, axis=0)
+    return selected
+
+
+def crossing_mask(Y: Float64Array) -> np.ndarray:
+    """Mark the points next to a crossing of two traces.
+
+    Args:
+        Y (Float64Array): 2-dimensional array of shape `(n, traces)`.
+
+    Returns:
+        np.ndarray: Boolean array of shape `(n, traces)`, which is `True` on both
+            sides of every sign change of the difference to any other trace.
+
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    # Ignore round-off differences between degenerate states
+    tolerance = _DEGENERACY_TOLERANCE * np.max(np.abs(Y), initial=0.0)
+    mask = np.zeros(Y.shape, dtype=bool)
+    for i in range(Y.shape[1]):
+        difference = Y - Y[:, i : i + 1]
+        sign = np.sign(difference) * (np.abs(difference) > tolerance)
+        change = np.any(sign[1:] != sign[:-1], axis=1)
+        mask[1:, i] |= change
+        mask[:-1, i] |= change
+    return mask
+
+
+def trace_indices(
+    x: Float64Array,
+    Y: Float64Array,
+    points: int,
+) -> list[np.ndarray]:
+    """Return the indices to keep for every trace.
+
+    Args:
+        x (Float64Array): 1-dimensional x-axis of length `n`.
+        Y (Float64Array): 2-dimensional array of shape `(n, traces)`.
+        points (int): Target number of points per trace; crossing points are
+            kept in addition.
+
+    Returns:
+        list[np.ndarray]: Sorted indices for every trace.
+
+    """
+    selected = lttb_indices(x, Y, points)
+    crossings = crossing_mask(Y)
+    return [
+        np.union1d(selected[:, i], np.flatnonzero(crossings[:, i]))
+        for i in range(selected.shape[1])
+    ]
+
+
+def downsample_frame(
+    frame: pd.DataFrame,
+    x: str,
+    columns: Sequence[str],
+    points: int,
+) -> pd.DataFrame:
+    """Downsample every trace of a wide frame into a long frame.
+
+    Args:
+        frame (pd.DataFrame): Wide frame with one column per trace.
+        x (str): Name of the x-axis column used for the downsampling.
+        columns (Sequence[str]): Names of the trace columns.
+        points (int): Target number of points per trace.
+
+    Returns:
+        pd.DataFrame: Long frame with the remaining (axis) columns of `frame` and
+            the columns `variable` (trace name) and `value`, ordered by trace.
+
+    """
+    columns = list(columns)
+    axes = frame.drop(columns=columns)
+    Y = frame[columns].to_numpy(dtype=np.float64)
+    parts = []
+    for column, indices in zip(
+        columns,
+        trace_indices(frame[x].to_numpy(), Y, points),
+        strict=True,
+    ):
+        part = axes.iloc[indices].reset_index(drop=True)
+        part["variable"] = column
+        part["value"] = frame[column].to_numpy()[indices]
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
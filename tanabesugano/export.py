@@ -0,0 +1,306 @@
+"""Compact binary export of diagrams for the web viewer.
+
+Every diagram is written as one little-endian blob in which each column (the
+x-axis first, then one column per state) is stored contiguously and starts at a
+4-byte aligned offset. A single `binary-manifest.json` describes all blobs, so
+that the viewer can map every column directly onto a `Float32Array` (or
+`Uint16Array` for quantized exports) without parsing any text. The name keeps
+it apart from the `manifest.json` of the CSV files that the viewer reads.
+
+Downsampled states keep their own rows: such a column additionally stores the
+`uint32` row indices into the x-axis at the offset given by `index`.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import BinaryIO
+
+import numpy as np
+import pandas as pd
+
+from tanabesugano.downsample import trace_indices
+
+
+if TYPE_CHECKING:
+    from tanabesugano.cmd import CMDmain
+
+
+MANIFEST_FILE = "binary-manifest.json"
+MANIFEST_FORMAT = "tanabesugano-binary"
+MANIFEST_VERSION = 1
+
+# Largest value of the unsigned 16-bit integers used for quantized columns
+_QUANTIZE_LEVELS = np.iinfo(np.uint16).max
+# Row indices of downsampled states
+_INDEX_DTYPE = "<u4"
+# Typed arrays require offsets that are multiples of their element size
+_ALIGNMENT = 4
+
+_CSV_PATTERN = re.compile(r"^(?P<kind>TS-diagram|DD-energies)_d(?P<d_count>\d)_")
+_CSV_KINDS = {"TS-diagram": "TS", "DD-energies": "DD"}
+
+
+def _encode_column(
+    values: np.ndarray,
+    quantize: bool,
+) -> tuple[bytes, dict[str, float]]:
+    """Encode a single column and return its bytes and decoding metadata."""
+    if not quantize:
+        return values.astype("<f4").tobytes(), {}
+
+    low = float(np.min(values))
+    span = float(np.max(values)) - low
+    scale = span / _QUANTIZE_LEVELS if span > 0 else 1.0
+    levels = np.rint((values - low) / scale).astype("<u2")
+    return levels.tobytes(), {"zero": low, "scale": scale}
+
+
+def _append(blob: BinaryIO, data: bytes) -> int:
+    """Write aligned data to a blob and return its offset."""
+    offset = blob.tell()
+    blob.write(data + b"\0" * (-len(data) % _ALIGNMENT))
+    return offset
+
+
+class BinaryExporter:
+    """Collect diagrams and write them as binary blobs plus one manifest."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        quantize: bool = False,
+        points: int | None = None,
+    ) -> None:
+        """Initialize the exporter.
+
+        Parameters
+        ----------
+        directory : str | Path
+            Output directory for the blobs and the manifest.
+        quantize : bool, optional
+            Store every column as 16-bit unsigned integers with a per-column
+            linear scale instead of float32, by default False
+        points : int | None, optional
+            Target number of points per state. Every state keeps only its own
+            shape-preserving selection plus its crossing points, which are
+            stored together with their row indices into the full x-axis.
+            By default None, i.e., all rows are kept.
+
+        """
+        self.directory = Path(directory)
+        self.quantize = quantize
+        self.points = points
+        self.diagrams: list[tuple[int, str, str, pd.DataFrame]] = []
+
+    def add_frame(
+        self,
+        d_count: int,
+        kind: str,
+        name: str,
+        frame: pd.DataFrame,
+    ) -> None:
+        """Add a diagram whose first column is the x-axis.
+
+        Parameters
+        ----------
+        d_count : int
+            Electron configuration (d2-d8)
+        kind : str
+            Diagram type, either "TS" or "DD"
+        name : str
+            Name of the diagram, used as file name of the blob
+        frame : pd.DataFrame
+            Diagram data with the x-axis as first column and one column per state
+
+        """
+        self.diagrams.append((int(d_count), kind, name, frame))
+
+    def add_cmd(self, tmm: CMDmain) -> None:
+        """Add the TS- and DD-diagram of a calculated `CMDmain` instance."""
+        self.add_frame(tmm.d_count, "TS", tmm.title_TS, tmm.ts_frame())
+        self.add_frame(tmm.d_count, "DD", tmm.title_DD, tmm.dd_frame())
+
+    def add_csv(self, path: str | Path) -> None:
+        """Add a TS- or DD-diagram that has been saved by `CMDmain.savetxt`."""
+        path = Path(path)
+        match = _CSV_PATTERN.match(path.name)
+        if match is None:
+            msg = f"`{path.name}` is neither a TS-diagram nor a DD-energies file!"
+            raise ValueError(msg)
+        self.add_frame(
+            int(match["d_count"]),
+            _CSV_KINDS[match["kind"]],
+            path.stem,
+            pd.read_csv(path),
+        )
+
+    def _write_blob(self, path: Path, frame: pd.DataFrame) -> tuple[list[dict], int]:
+        """Write a single diagram and return the column layout and row count."""
+        x_axis = frame.iloc[:, 0].to_numpy(dtype=np.float64)
+        states = frame.iloc[:, 1:].to_numpy(dtype=np.float64)
+        if self.points is None:
+            indices = [None] * states.shape[1]
+        else:
+            indices = trace_indices(x_axis, states, self.points)
+        layout = []
+        with path.open("wb") as blob:
+            data, meta = _encode_column(x_axis, self.quantize)
+            layout.append(
+                {"name": str(frame.columns[0]), "offset": _append(blob, data), **meta},
+            )
+            for column, values, index in zip(
+                frame.columns[1:],
+                states.T,
+                indices,
+                strict=True,
+            ):
+                if index is None:
+                    data, meta = _encode_column(values, self.quantize)
+                    rows = len(values)
+                else:
+                    data, meta = _encode_column(values[index], self.quantize)
+                    rows = len(index)
+                    meta["index"] = _append(blob, index.astype(_INDEX_DTYPE).tobytes())
+                layout.append(
+                    {
+                        "name": str(column),
+                        "offset": _append(blob, data),
+                        "rows": rows,
+                        **meta,
+                    },
+                )
+        return layout, len(frame)
+
+    def write(self) -> Path:
+        """Write all collected diagrams and the manifest.
+
+        Returns
+        -------
+        Path
+            Path of the written `binary-manifest.json`.
+
+        """
+        configurations: dict[str, list[dict]] = {}
+        for d_count, kind, name, frame in self.diagrams:
+            folder = f"d{d_count}"
+            (self.directory / folder).mkdir(parents=True, exist_ok=True)
+            relative = f"{folder}/{name}.bin"
+            (x_axis, *columns), rows = self._write_blob(
+                self.directory / relative,
+                frame,
+            )
+            configurations.setdefault(folder, []).append(
+                {
+                    "name": name,
+                    "type": kind,
+                    "path": relative,
+                    "rows": rows,
+                    "bytes": (self.directory / relative).stat().st_size,
+                    "x": x_axis,
+                    "columns": columns,
+                },
+            )
+
+        manifest = {
+            "format": MANIFEST_FORMAT,
+            "version": MANIFEST_VERSION,
+            "endianness": "little",
+            "dtype": "uint16" if self.quantize else "float32",
+            "configurations": dict(sorted(configurations.items())),
+        }
+        path = self.directory / MANIFEST_FILE
+        path.write_text(json.dumps(manifest, indent=2))
+        return path
+
+
+def export_directory(
+    source: str | Path,
+    directory: str | Path,
+    quantize: bool = False,
+    points: int | None = None,
+) -> Path:
+    """Convert all TS- and DD-diagram CSV files below `source` to binary.
+
+    Parameters
+    ----------
+    source : str | Path
+        Directory with the `d<n>/` folders, e.g. as written by `Atlas`
+    directory : str | Path
+        Output directory for the blobs and the manifest
+    quantize : bool, optional
+        Store the columns as quantized 16-bit unsigned integers, by default False
+    points : int | None, optional
+        Target number of points per state, by default None (all rows)
+
+    Returns
+    -------
+    Path
+        Path of the written `binary-manifest.json`.
+
+    """
+    exporter = BinaryExporter(directory, quantize=quantize, points=points)
+    for path in sorted(Path(source).glob("d[0-9]/*.csv")):
+        if _CSV_PATTERN.match(path.name):
+            exporter.add_csv(path)
+    return exporter.write()
+
+
+def read_binary(manifest: str | Path, name: str) -> pd.DataFrame:
+    """Read a diagram back from a binary export.
+
+    Parameters
+    ----------
+    manifest : str | Path
+        Path of the `binary-manifest.json`
+    name : str
+        Name of the diagram
+
+    Returns
+    -------
+    pd.DataFrame
+        Diagram data with the x-axis as first column. Downsampled states are
+        NaN in the rows that they have not kept.
+
+    """
+    manifest = Path(manifest)
+    content = json.loads(manifest.read_text())
+    dtype = "<u2" if content["dtype"] == "uint16" else "<f4"
+    for entries in content["configurations"].values():
+        for entry in entries:
+            if entry["name"] != name:
+                continue
+            buffer = (manifest.parent / entry["path"]).read_bytes()
+            data = {}
+            for column in [entry["x"], *entry["columns"]]:
+                rows = column.get("rows", entry["rows"])
+                values = np.frombuffer(
+                    buffer,
+                    dtype=dtype,
+                    count=rows,
+                    offset=column["offset"],
+                ).astype(np.float64)
+                if "scale" in column:
+                    values = column["zero"] + values * column["scale"]
+                if "index" in column:
+                    index = np.frombuffer(
+                        buffer,
+                        dtype=_INDEX_DTYPE,
+                        count=rows,
+                        offset=column["index"],
+                    )
+                    values = pd.Series(values, index=index).reindex(
+                        range(entry["rows"]),
+                    )
+                data[column["name"]] = np.asarray(values, dtype=np.float64)
+            frame = pd.DataFrame(data)
+            # Drop the rows that no downsampled state has kept
+            return frame.dropna(how="all", subset=frame.columns[1:]).reset_index(
+                drop=True,
+            )
+    msg = f"`{name}` is not part of `{manifest}`!"
+    raise KeyError(msg)
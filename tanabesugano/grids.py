@@ -0,0 +1,278 @@
+"""Parameter grids and quasi-random samples of the (Dq, B, C) space."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+
+    from tanabesugano.matrices import Float64Array
+
+
+SPACINGS = ("linear", "log")
+SAMPLINGS = ("sobol", "lhs")
+
+# Number of bits of the Sobol points
+_SOBOL_BITS = 32
+# Degree, coefficients and initial direction numbers of the primitive
+# polynomials of the dimensions 2-6 (Joe and Kuo, 2008)
+_SOBOL_POLYNOMIALS = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+)
+
+
+def parameter_axis(
+    start: float,
+    stop: float,
+    steps: int,
+    spacing: str = "linear",
+) -> Float64Array:
+    """Return the values of a single parameter axis.
+
+    Parameters
+    ----------
+    start : float
+        First value of the axis
+    stop : float
+        Last value of the axis
+    steps : int
+        Number of values
+    spacing : str, optional
+        "linear" for evenly spaced values or "log" for values evenly spaced on a
+        logarithmic scale, by default "linear"
+
+    Returns
+    -------
+    Float64Array
+        Values of the axis.
+
+    Raises
+    ------
+    ValueError
+        If the spacing is unknown or a log axis does not start above zero
+
+    """
+    if spacing not in SPACINGS:
+        msg = f"Unknown spacing `{spacing}`, use one of {SPACINGS}!"
+        raise ValueError(msg)
+    if spacing == "linear":
+        return np.linspace(start, stop, int(steps))
+    if start <= 0.0 or stop <= 0.0:
+        msg = "A log spaced axis needs positive bounds!"
+        raise ValueError(msg)
+    return np.geomspace(start, stop, int(steps))
+
+
+def sobol(samples: int, dimensions: int = 3) -> Float64Array:
+    """Return the first points of the unscrambled Sobol sequence.
+
+    Parameters
+    ----------
+    samples : int
+        Number of points; powers of two keep the balance properties
+    dimensions : int, optional
+        Number of dimensions (1-6), by default 3
+
+    Returns
+    -------
+    Float64Array
+        Points of shape `(samples, dimensions)` in the unit cube, starting with
+        the origin like `scipy.stats.qmc.Sobol(d, scramble=False)`.
+
+    Raises
+    ------
+    ValueError
+        If the number of dimensions is not supported
+
+    """
+    if not 0 < dimensions <= len(_SOBOL_POLYNOMIALS) + 1:
+        msg = f"Sobol points are available for 1-{len(_SOBOL_POLYNOMIALS) + 1} "
+        msg += "dimensions!"
+        raise ValueError(msg)
+
+    bits = np.arange(1, _SOBOL_BITS + 1)
+    directions = [np.left_shift(1, _SOBOL_BITS - bits)]
+    for degree, coefficients, initial in _SOBOL_POLYNOMIALS[: dimensions - 1]:
+        v = [m << (_SOBOL_BITS - i) for i, m in enumerate(initial, start=1)]
+        for i in range(degree, _SOBOL_BITS):
+            value = v[i - degree] ^ (v[i - degree] >> degree)
+            for k in range(1, degree):
+                value ^= ((coefficients >> (degree - 1 - k)) & 1) * v[i - k]
+            v.append(value)
+        directions.append(np.array(v))
+
+    points = np.zeros((samples, dimensions), dtype=np.uint64)
+    state = np.zeros(dimensions, dtype=np.uint64)
+    for i in range(1, samples):
+        # Index of the rightmost zero bit of i - 1 (Gray code order)
+        bit = ((i - 1) ^ i).bit_length() - 1
+        state ^= np.array([d[bit] for d in directions], dtype=np.uint64)
+        points[i] = state
+    return points / 2.0**_SOBOL_BITS
+
+
+def latin_hypercube(
+    samples: int,
+    dimensions: int = 3,
+    seed: int | None = None,
+) -> Float64Array:
+    """Return a random Latin hypercube sample of the unit cube.
+
+    Every dimension is divided into `samples` equal strata and every stratum
+    holds exactly one point.
+
+    Parameters
+    ----------
+    samples : int
+        Number of points
+    dimensions : int, optional
+        Number of dimensions, by default 3
+    seed : int | None, optional
+        Seed of the random generator, by default None
+
+    Returns
+    -------
+    Float64Array
+        Points of shape `(samples, dimensions)` in the unit cube.
+
+    """
+    rng = np.random.default_rng(seed)
+    strata = np.argsort(rng.random((dimensions, samples)), axis=1).T
+    return (strata + rng.random((samples, dimensions))) / samples
+
+
+def sample_box(
+    bounds: list[tuple[float, float]],
+    samples: int,
+    method: str = "sobol",
+    spacing: list[str] | None = None,
+    seed: int | None = None,
+) -> Float64Array:
+    """Sample a box of parameters with a quasi-random design.
+
+    Parameters
+    ----------
+    bounds : list[tuple[float, float]]
+        Lower and upper bound of every parameter
+    samples : int
+        Number of points
+    method : str, optional
+        "sobol" or "lhs" for a Latin hypercube, by default "sobol"
+    spacing : list[str] | None, optional
+        "linear" or "log" per parameter; log parameters are sampled uniformly
+        on a logarithmic scale, by default all linear
+    seed : int | None, optional
+        Seed of the Latin hypercube, by default None
+
+    Returns
+    -------
+    Float64Array
+        Points of shape `(samples, len(bounds))`.
+
+    Raises
+    ------
+    ValueError
+        If the method or a spacing is unknown
+
+    """
+    if method not in SAMPLINGS:
+        msg = f"Unknown sampling `{method}`, use one of {SAMPLINGS}!"
+        raise ValueError(msg)
+    if spacing is None:
+        spacing = ["linear"] * len(bounds)
+    unit = (
+        sobol(samples, len(bounds))
+        if method == "sobol"
+        else latin_hypercube(samples, len(bounds), seed=seed)
+    )
+    columns = []
+    for bound, scale, column in zip(bounds, spacing, unit.T, strict=True):
+        # The axis of two values only validates the bounds and the spacing
+        low, high = parameter_axis(*bound, 2, scale)
+        if scale == "log":
+            columns.append(np.exp(np.log(low) + column * np.log(high / low)))
+        else:
+            columns.append(low + column * (high - low))
+    return np.column_stack(columns)
+
+
+def parameter_grid(
+    ranges: dict[str, list[float]],
+    *,
+    points: ArrayLike | None = None,
+    spacing: dict[str, str] | None = None,
+    ratio: float | None = None,
+    sampling: str | None = None,
+    samples: int = 256,
+    seed: int | None = None,
+) -> Float64Array:
+    """Return the parameter sets of a batch calculation.
+
+    Parameters
+    ----------
+    ranges : dict[str, list[float]]
+        [start, stop, steps] of `Dq`, `B` and `C`
+    points : ArrayLike | None, optional
+        Explicit parameter sets of shape `(n, 3)`, the ranges are ignored,
+        by default None
+    spacing : dict[str, str] | None, optional
+        "linear" or "log" spacing per parameter, by default all linear
+    ratio : float | None, optional
+        Fixed C/B ratio, the range of `C` is ignored, by default None
+    sampling : str | None, optional
+        "sobol" or "lhs" to sample the box spanned by the start and stop values
+        instead of the full product of the ranges, by default None
+    samples : int, optional
+        Number of sampled points, by default 256
+    seed : int | None, optional
+        Seed of the Latin hypercube sampling, by default None
+
+    Returns
+    -------
+    Float64Array
+        Parameter sets of shape `(n, 3)` with the columns Dq, B and C.
+
+    Raises
+    ------
+    ValueError
+        If `spacing` names an unknown parameter, or `C` together with `ratio`.
+
+    """
+    names = ["Dq", "B"] if ratio is not None else ["Dq", "B", "C"]
+    spacing = spacing or {}
+    unknown = set(spacing) - set(ranges)
+    if unknown:
+        msg = f"Unknown parameters {sorted(unknown)} in `spacing`, use {names}!"
+        raise ValueError(msg)
+    if ratio is not None and "C" in spacing:
+        msg = "`C` follows `B` with a fixed `ratio` and cannot have a spacing!"
+        raise ValueError(msg)
+    if points is not None:
+        return np.array(points, dtype=np.float64).reshape(-1, 3)
+
+    spacing = dict.fromkeys(names, "linear") | spacing
+    if sampling is not None:
+        grid = sample_box(
+            [(ranges[name][0], ranges[name][1]) for name in names],
+            samples,
+            method=sampling,
+            spacing=[spacing[name] for name in names],
+            seed=seed,
+        )
+    else:
+        axes = [parameter_axis(*ranges[name], spacing=spacing[name]) for name in names]
+        grid = np.stack(
+            [axis.ravel() for axis in np.meshgrid(*axes, indexing="ij")],
+            axis=-1,
+        )
+    if ratio is not None:
+        grid = np.column_stack([grid, grid[:, 1] * ratio])
+    return grid
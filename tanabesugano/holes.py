@@ -0,0 +1,139 @@
+"""Electron-hole correspondence between d(n) and d(10-n) configurations.
+
+A configuration with `n` holes in the d-shell has the same interelectronic
+repulsion as the one with `n` electrons, but the opposite sign of the ligand
+field. The Hamiltonian of d(10-n) at `Dq` is therefore the one of d(n) at `-Dq`
+shifted by a constant, which cancels once the energies are referenced to the
+ground state of d(10-n). This pairs d2/d8, d3/d7 and d4/d6, so that both
+halves can be evaluated with the d2-d4 matrices only.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from tanabesugano.batch import ELECTRON_CONFIG_SOLVERS
+from tanabesugano.batch import solve_batch
+
+
+if TYPE_CHECKING:
+    from numpy.typing import DTypeLike
+
+    from tanabesugano.matrices import Float64Array
+
+
+# Hole configuration and the electron configuration it is evaluated with
+HOLE_PARTNERS = {6: 4, 7: 3, 8: 2}
+
+Parameters = tuple[
+    "float | Float64Array",
+    "float | Float64Array",
+    "float | Float64Array",
+]
+
+
+def rereference(
+    states: dict[str, Float64Array],
+    d_count: int,
+) -> dict[str, Float64Array]:
+    """Shift the states to the ground state of a configuration.
+
+    Args:
+        states (dict[str, Float64Array]): States with a common, arbitrary zero.
+        d_count (int): Configuration whose `ground_terms` define the ground state.
+
+    Returns:
+        dict[str, Float64Array]: States relative to the lowest ground-term level.
+
+    """
+    ground = np.min(
+        [states[key][..., :1] for key in ELECTRON_CONFIG_SOLVERS[d_count].ground_terms],
+        axis=0,
+    )
+    return {key: value - ground for key, value in states.items()}
+
+
+def solve_holes(
+    d_count: int,
+    Dq: float | Float64Array,
+    B: float | Float64Array,
+    C: float | Float64Array,
+    dtype: DTypeLike = np.float64,
+) -> dict[str, Float64Array]:
+    """Solve a d6-d8 configuration with the matrices of its d4-d2 partner.
+
+    Args:
+        d_count (int): Hole configuration (d6, d7 or d8).
+        Dq (float | Float64Array): Oh crystal field splitting, scalar or array.
+        B (float | Float64Array): Racah B parameter, scalar or array.
+        C (float | Float64Array): Racah C parameter, scalar or array.
+        dtype (DTypeLike): Precision of the results. Defaults to float64.
+
+    Raises:
+        ValueError: If `d_count` has no electron partner.
+
+    Returns:
+        dict[str, Float64Array]: States like `solve_batch(d_count, Dq, B, C)`.
+
+    """
+    partner = HOLE_PARTNERS.get(d_count)
+    if partner is None:
+        msg = f"Only {sorted(HOLE_PARTNERS)} can be solved as hole configurations."
+        raise ValueError(msg)
+    states = solve_batch(partner, -np.asarray(Dq, dtype=np.float64), B, C)
+    return {
+        key: value.astype(dtype, copy=False)
+        for key, value in rereference(states, d_count).items()
+    }
+
+
+def solve_pair(
+    d_count: int,
+    electrons: Parameters,
+    holes: Parameters,
+    dtype: DTypeLike = np.float64,
+) -> tuple[dict[str, Float64Array], dict[str, Float64Array]]:
+    """Solve d(n) and d(10-n) in one stacked call of the d(n) matrices.
+
+    The d(10-n) points are evaluated at `-Dq`, so the stack simply holds the
+    points of both halves: the call saves no diagonalizations compared with two
+    separate `solve_batch` calls, only the second call itself.
+
+    Args:
+        d_count (int): Electron configuration (d2, d3 or d4).
+        electrons (Parameters): `(Dq, B, C)` of the d(n) points.
+        holes (Parameters): `(Dq, B, C)` of the d(10-n) points.
+        dtype (DTypeLike): Precision of the results. Defaults to float64.
+
+    Raises:
+        ValueError: If `d_count` has no hole partner.
+
+    Returns:
+        tuple[dict[str, Float64Array], dict[str, Float64Array]]: Flattened states
+            of d(n) and of d(10-n), each referenced to its own ground state.
+
+    """
+    partners = {electron: hole for hole, electron in HOLE_PARTNERS.items()}
+    if d_count not in partners:
+        msg = f"Only {sorted(partners)} have a hole partner configuration."
+        raise ValueError(msg)
+
+    first = [np.ravel(value) for value in np.broadcast_arrays(*electrons)]
+    second = [np.ravel(value) for value in np.broadcast_arrays(*holes)]
+    second[0] = -second[0]
+    size = first[0].size
+    states = solve_batch(
+        d_count,
+        *(np.concatenate(pair) for pair in zip(first, second, strict=True)),
+    )
+    particle = {key: value[:size] for key, value in states.items()}
+    hole = rereference(
+        {key: value[size:] for key, value in states.items()},
+        partners[d_count],
+    )
+    return (
+        {key: value.astype(dtype, copy=False) for key, value in particle.items()},
+        {key: value.astype(dtype, copy=False) for key, value in hole.items()},
+    )
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 
 try:
     from typing import TypeAlias
@@ -11,11 +13,16 @@ except ImportError:
 import numpy as np
 
 from numpy._typing._array_like import NDArray
-from numpy.linalg import eigh
 
+from tanabesugano.backends import get_backend
+from tanabesugano.constants import DEGENERACY_TOLERANCE
 from tanabesugano.constants import ENERGY_TOLERANCE
 
 
+if TYPE_CHECKING:
+    from numpy.typing import DTypeLike
+
+
 _sqrt2 = np.sqrt(2.0)
 _sqrt3 = np.sqrt(3.0)
 _sqrt6 = np.sqrt(6.0)
@@ -30,20 +37,57 @@ Float64Array: TypeAlias = NDArray[np.float64]
 
 
 class LigandFieldTheory:
-    """Parent class for ligand field theory configurations."""
+    """Parent class for ligand field theory configurations.
+
+    The parameters can be scalars or arrays of a common (broadcastable) shape. For
+    arrays, all blocks are diagonalized at once and every state of the solver
+    carries the batch shape in front of the eigenvalue axis, e.g. `(N, k)` for
+    `N` parameter sets instead of `(k,)` for a single one.
+
+    With `dtype=np.float32` the matrices are still assembled in double precision,
+    but diagonalized and stored in single precision. Blocks with nearly
+    degenerate eigenvalues are diagonalized again in double precision.
+
+    `ground_terms` lists the states whose lowest level can become the ground
+    state, i.e. the high-spin and, if any, the low-spin ground state.
 
-    def __init__(self, Dq: float, B: float, C: float) -> None:
+    Every call of `solver()` works on arrays it creates itself and only reads the
+    parameters, so separate instances (or repeated calls on one instance) can
+    run concurrently in several threads.
+    """
+
+    ground_terms: tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        Dq: float | Float64Array,
+        B: float | Float64Array,
+        C: float | Float64Array,
+        dtype: DTypeLike = np.float64,
+    ) -> None:
         """Initialize the configuration with given parameters.
 
         Args:
-            Dq (float): Crystal field splitting in wavenumbers (cm-1).
-            B (float): Racah parameter B in wavenumbers (cm-1).
-            C (float): Racah parameter C in wavenumbers (cm-1).
+            Dq (float | Float64Array): Crystal field splitting in wavenumbers (cm-1).
+            B (float | Float64Array): Racah parameter B in wavenumbers (cm-1).
+            C (float | Float64Array): Racah parameter C in wavenumbers (cm-1).
+            dtype (DTypeLike): Precision of the eigenvalues, either `np.float64`
+                (default) or `np.float32`.
+
+        Raises:
+            ValueError: If `dtype` is neither float64 nor float32.
 
         """
-        self.Dq = np.float64(Dq)
-        self.B = np.float64(B)
-        self.C = np.float64(C)
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in {np.dtype(np.float64), np.dtype(np.float32)}:
+            msg = f"Unsupported dtype `{self.dtype}`, use float64 or float32!"
+            raise ValueError(msg)
+        self.Dq = np.asarray(Dq, dtype=np.float64)
+        self.B = np.asarray(B, dtype=np.float64)
+        self.C = np.asarray(C, dtype=np.float64)
+        self.shape = np.broadcast_shapes(self.Dq.shape, self.B.shape, self.C.shape)
+        # If set to a list, every block of the Hamiltonian is recorded as a matrix
+        self.trace: list[Float64Array] | None = None
 
     def eigensolver(self, matrix: Float64Array) -> Float64Array:
         """Solve for the eigenvalues of the given matrix.
@@ -57,7 +101,18 @@ class LigandFieldTheory:
                 field Hamiltonian.
 
         """
-        return eigh(matrix)[0]
+        backend = get_backend()
+        if self.dtype == np.float64:
+            return backend.eigvalsh(matrix)
+
+        values = backend.eigvalsh(matrix.astype(self.dtype))
+        # Refine nearly degenerate blocks in double precision
+        scale = np.max(np.abs(values), axis=-1, initial=1.0)
+        gaps = np.diff(values, axis=-1, append=np.inf)
+        degenerate = np.any(gaps <= DEGENERACY_TOLERANCE * scale[..., None], axis=-1)
+        if np.any(degenerate):
+            values[degenerate] = backend.eigvalsh(matrix[degenerate])
+        return values
 
     def solver(self) -> dict[str, Float64Array]:
         """Solve for all states and return a dictionary of results.
@@ -75,29 +130,88 @@ class LigandFieldTheory:
         diag_elements: list[float],
         off_diag_elements: dict[tuple[int, int], float],
     ) -> Float64Array:
-        """Construct a symmetric matrix from diagonal and off-diagonal elements."""
+        """Construct a symmetric matrix from diagonal and off-diagonal elements.
+
+        Array-valued elements produce a stack of matrices of shape
+        `(*batch_shape, size, size)`.
+        """
         size = len(diag_elements)
-        matrix = np.zeros((size, size))
-        np.fill_diagonal(matrix, diag_elements)
+        batch_shape = np.broadcast_shapes(
+            *(np.shape(value) for value in diag_elements),
+            *(np.shape(value) for value in off_diag_elements.values()),
+        )
+        matrix = np.zeros((*batch_shape, size, size))
+        for i, value in enumerate(diag_elements):
+            matrix[..., i, i] = value
         for (i, j), value in off_diag_elements.items():
-            matrix[i, j] = value
-            matrix[j, i] = value  # Assuming the matrix is symmetric
+            matrix[..., i, j] = value
+            matrix[..., j, i] = value  # Assuming the matrix is symmetric
+        if self.trace is not None:
+            self.trace.append(matrix)
         return matrix
 
+    def single_state(self, energy: float | Float64Array) -> Float64Array:
+        """Return a ligand field independent level as a state with one eigenvalue.
+
+        Args:
+            energy (float | Float64Array): Energy of the level, scalar or batched.
+
+        Returns:
+            Float64Array: Array of shape `(*shape, 1)`.
+
+        """
+        state = np.broadcast_to(
+            np.asarray(energy, dtype=self.dtype),
+            self.shape,
+        )[..., np.newaxis].copy()
+        if self.trace is not None:
+            self.trace.append(state[..., np.newaxis].copy())
+        return state
+
+    @staticmethod
+    def ground_state_shift(
+        state: Float64Array,
+        threshold: float = 0.0,
+    ) -> Float64Array:
+        """Return the lowest level of `state` where it becomes the ground state.
+
+        Args:
+            state (Float64Array): Eigenvalues of a state relative to the current
+                ground state.
+            threshold (float): Level at or below which `state` takes over the
+                ground state. Defaults to 0.0.
+
+        Returns:
+            Float64Array: Shift of shape `(*shape, 1)`, which is the lowest level of
+                `state` where it is at or below `threshold` and zero elsewhere.
+
+        """
+        lowest = state[..., :1]
+        return np.where(lowest <= threshold, lowest, 0.0)
+
 
 class d2(LigandFieldTheory):
     """Class representing the d2 configuration in ligand field theory."""
 
-    def __init__(self, Dq: float = 0.0, B: float = 860.0, C: float = 3801.0) -> None:
+    ground_terms = ("3_T_1",)
+
+    def __init__(
+        self,
+        Dq: float = 0.0,
+        B: float = 860.0,
+        C: float = 3801.0,
+        dtype: DTypeLike = np.float64,
+    ) -> None:
         """Initialize the d2 configuration with given parameters.
 
         Args:
             Dq (float): Crystal field splitting in wavenumbers (cm-1).
             B (float): Racah parameter B in wavenumbers (cm-1).
             C (float): Racah parameter C in wavenumbers (cm-1).
+            dtype (DTypeLike): Precision of the eigenvalues. Defaults to float64.
 
         """
-        super().__init__(Dq, B, C)
+        super().__init__(Dq, B, C, dtype=dtype)
 
     def A_1_1_states(self) -> Float64Array:
         """Calculate the A_1_1 states."""
@@ -139,11 +253,11 @@ class d2(LigandFieldTheory):
 
         """
         # Ligand field independent states
-        GS = self.T_3_1_states()[0]
+        GS = self.T_3_1_states()[..., :1]
 
-        T_1_1 = np.array([+2 * self.Dq + 4 * self.B + 2 * self.C]) - GS
-        T_3_2 = np.array([+2 * self.Dq - 8 * self.B]) - GS
-        A_3_2 = np.array([12 * self.Dq - 8 * self.B]) - GS
+        T_1_1 = self.single_state(+2 * self.Dq + 4 * self.B + 2 * self.C) - GS
+        T_3_2 = self.single_state(+2 * self.Dq - 8 * self.B) - GS
+        A_3_2 = self.single_state(12 * self.Dq - 8 * self.B) - GS
 
         # Ligand field dependent states
         A_1_1 = self.A_1_1_states() - GS
@@ -165,16 +279,25 @@ class d2(LigandFieldTheory):
 class d3(LigandFieldTheory):
     """Class representing the d3 configuration in ligand field theory."""
 
-    def __init__(self, Dq: float = 0.0, B: float = 918.0, C: float = 4133.0) -> None:
+    ground_terms = ("4_A_2",)
+
+    def __init__(
+        self,
+        Dq: float = 0.0,
+        B: float = 918.0,
+        C: float = 4133.0,
+        dtype: DTypeLike = np.float64,
+    ) -> None:
         """Initialize the d3 configuration with given parameters.
 
         Args:
             Dq (float): Crystal field splitting in wavenumbers (cm-1).
             B (float): Racah parameter B in wavenumbers (cm-1).
             C (float): Racah parameter C in wavenumbers (cm-1).
+            dtype (DTypeLike): Precision of the eigenvalues. Defaults to float64.
 
         """
-        super().__init__(Dq, B, C)
+        super().__init__(Dq, B, C, dtype=dtype)
 
     def T_2_2_states(self) -> Float64Array:
         """Calculate the T_2_2 states."""
@@ -259,13 +382,13 @@ class d3(LigandFieldTheory):
 
         """
         # Ligand field independent states
-        GS = np.array([-12 * self.Dq - 15 * self.B])
+        GS = self.single_state(-12 * self.Dq - 15 * self.B)
 
-        A_4_2 = np.array([0], dtype=np.float64)
-        T_4_2 = np.array([-2 * self.Dq - 15 * self.B]) - GS
+        A_4_2 = self.single_state(0.0)
+        T_4_2 = self.single_state(-2 * self.Dq - 15 * self.B) - GS
 
-        A_2_1 = np.array([-2 * self.Dq - 11 * self.B + 3 * self.C]) - GS
-        A_2_2 = np.array([-2 * self.Dq + 9 * self.B + 3 * self.C]) - GS
+        A_2_1 = self.single_state(-2 * self.Dq - 11 * self.B + 3 * self.C) - GS
+        A_2_2 = self.single_state(-2 * self.Dq + 9 * self.B + 3 * self.C) - GS
 
         # Ligand field dependent states
         T_2_2 = self.T_2_2_states() - GS
@@ -288,16 +411,25 @@ class d3(LigandFieldTheory):
 class d4(LigandFieldTheory):
     """Class representing the d4 configuration in ligand field theory."""
 
-    def __init__(self, Dq: float = 0.0, B: float = 965.0, C: float = 4449.0) -> None:
+    ground_terms = ("5_E_1", "3_T_1")
+
+    def __init__(
+        self,
+        Dq: float = 0.0,
+        B: float = 965.0,
+        C: float = 4449.0,
+        dtype: DTypeLike = np.float64,
+    ) -> None:
         """Initialize the d4 configuration with given parameters.
 
         Args:
             Dq (float): Crystal field splitting in wavenumbers (cm-1).
             B (float): Racah parameter B in wavenumbers (cm-1).
             C (float): Racah parameter C in wavenumbers (cm-1).
+            dtype (DTypeLike): Precision of the eigenvalues. Defaults to float64.
 
         """
-        super().__init__(Dq, B, C)
+        super().__init__(Dq, B, C, dtype=dtype)
 
     def T_3_1_states(self) -> Float64Array:
         """Calculate the T_3_1 states."""
@@ -508,12 +640,12 @@ class d4(LigandFieldTheory):
 
         """
         # Ligand field independent states
-        GS = np.array([-6 * self.Dq - 21 * self.B])
+        GS = self.single_state(-6 * self.Dq - 21 * self.B)
 
-        E_5_1 = np.array([0], dtype=np.float64)
-        T_5_2 = np.array([4 * self.Dq - 21 * self.B]) - GS
+        E_5_1 = self.single_state(0.0)
+        T_5_2 = self.single_state(4 * self.Dq - 21 * self.B) - GS
 
-        A_3_1 = np.array([-6 * self.Dq - 12 * self.B + 4 * self.C]) - GS
+        A_3_1 = self.single_state(-6 * self.Dq - 12 * self.B + 4 * self.C) - GS
 
         # Ligand field dependent states
         T_1_2 = self.T_1_2_states() - GS
@@ -526,19 +658,20 @@ class d4(LigandFieldTheory):
         A_3_2 = self.A_3_2_states() - GS
         A_1_2 = self.A_1_2_states() - GS
 
-        if T_3_1[0] <= 0:
-            T_1_2 -= T_3_1[0]
-            A_1_1 -= T_3_1[0]
-            E_1_1 -= T_3_1[0]
-            T_3_2 -= T_3_1[0]
-            T_1_1 -= T_3_1[0]
-            E_3_1 -= T_3_1[0]
-            A_3_2 -= T_3_1[0]
-            A_1_2 -= T_3_1[0]
-            E_5_1 -= T_3_1[0]
-            T_5_2 -= T_3_1[0]
-            A_3_1 -= T_3_1[0]
-            T_3_1 -= T_3_1[0]
+        # Low-spin ground state 3_T_1 for strong ligand fields
+        shift = self.ground_state_shift(T_3_1)
+        T_1_2 -= shift
+        A_1_1 -= shift
+        E_1_1 -= shift
+        T_3_2 -= shift
+        T_1_1 -= shift
+        E_3_1 -= shift
+        A_3_2 -= shift
+        A_1_2 -= shift
+        E_5_1 -= shift
+        T_5_2 -= shift
+        A_3_1 -= shift
+        T_3_1 -= shift
 
         return {
             "3_T_1": T_3_1,
@@ -559,16 +692,25 @@ class d4(LigandFieldTheory):
 class d5(LigandFieldTheory):
     """Class representing the d5 configuration in ligand field theory."""
 
-    def __init__(self, Dq: float = 0.0, B: float = 860.0, C: float = 3850.0) -> None:
+    ground_terms = ("6_A_1", "2_T_2")
+
+    def __init__(
+        self,
+        Dq: float = 0.0,
+        B: float = 860.0,
+        C: float = 3850.0,
+        dtype: DTypeLike = np.float64,
+    ) -> None:
         """Initialize the d5 configuration with given parameters.
 
         Args:
             Dq (float): Crystal field splitting in wavenumbers (cm-1).
             B (float): Racah parameter B in wavenumbers (cm-1).
             C (float): Racah parameter C in wavenumbers (cm-1).
+            dtype (DTypeLike): Precision of the eigenvalues. Defaults to float64.
 
         """
-        super().__init__(Dq, B, C)
+        super().__init__(Dq, B, C, dtype=dtype)
 
     def T_2_2_states(self) -> Float64Array:
         """Calculate the T_2_2 states."""
@@ -796,15 +938,13 @@ class d5(LigandFieldTheory):
 
         """
         # Ligand field independent states
-        GS = -35 * self.B
+        GS = self.single_state(-35 * self.B)
 
-        A_6_1 = np.array(
-            [0.0],
-            dtype=float,
-        )  # Starting value is -35. * B, but has to set to zero per definition
+        # Starting value is -35. * B, but has to set to zero per definition
+        A_6_1 = self.single_state(0.0)
         E_4 = self.E_4_states() - GS
-        A_4_1 = np.array([-25 * self.B + 5 * self.C]) - GS
-        A_4_2 = np.array([-13 * self.B + 7 * self.C]) - GS
+        A_4_1 = self.single_state(-25 * self.B + 5 * self.C) - GS
+        A_4_2 = self.single_state(-13 * self.B + 7 * self.C) - GS
 
         # Ligandfield dependent
         T_2_2 = self.T_2_2_states() - GS
@@ -815,19 +955,20 @@ class d5(LigandFieldTheory):
         T_4_1 = self.T_4_1_states() - GS
         T_4_2 = self.T_4_2_states() - GS
 
-        if T_2_2[0] <= 0:
-            A_6_1 -= T_2_2[0]
-            E_4 -= T_2_2[0]
-            A_4_1 -= T_2_2[0]
-            A_4_2 -= T_2_2[0]
-            T_2_1 -= T_2_2[0]
-            E_2 -= T_2_2[0]
-            A_2_1 -= T_2_2[0]
-            A_2_2 -= T_2_2[0]
-            T_4_1 -= T_2_2[0]
-            T_4_2 -= T_2_2[0]
-            # Finally create new ligand field independent state
-            T_2_2 -= T_2_2[0]
+        # Low-spin ground state 2_T_2 for strong ligand fields
+        shift = self.ground_state_shift(T_2_2)
+        A_6_1 -= shift
+        E_4 -= shift
+        A_4_1 -= shift
+        A_4_2 -= shift
+        T_2_1 -= shift
+        E_2 -= shift
+        A_2_1 -= shift
+        A_2_2 -= shift
+        T_4_1 -= shift
+        T_4_2 -= shift
+        # Finally create new ligand field independent state
+        T_2_2 -= shift
 
         return {
             "2_T_2": T_2_2,
@@ -847,16 +988,25 @@ class d5(LigandFieldTheory):
 class d6(LigandFieldTheory):
     """Class representing the d6 configuration in ligand field theory."""
 
-    def __init__(self, Dq: float = 0.0, B: float = 1065.0, C: float = 5120.0) -> None:
+    ground_terms = ("5_T_2", "1_A_1")
+
+    def __init__(
+        self,
+        Dq: float = 0.0,
+        B: float = 1065.0,
+        C: float = 5120.0,
+        dtype: DTypeLike = np.float64,
+    ) -> None:
         """Initialize the d6 configuration with given parameters.
 
         Args:
             Dq (float): Crystal field splitting in wavenumbers (cm-1).
             B (float): Racah parameter B in wavenumbers (cm-1).
             C (float): Racah parameter C in wavenumbers (cm-1).
+            dtype (DTypeLike): Precision of the eigenvalues. Defaults to float64.
 
         """
-        super().__init__(Dq, B, C)
+        super().__init__(Dq, B, C, dtype=dtype)
 
     def T_3_1_states(self) -> Float64Array:
         """Calculate the T_3_1 states."""
@@ -1066,13 +1216,13 @@ class d6(LigandFieldTheory):
                 eigenvalues as values.
 
         """
-        GS = np.array([-4 * self.Dq - 21 * self.B])
+        GS = self.single_state(-4 * self.Dq - 21 * self.B)
 
-        T_5_2 = np.array([0], dtype=np.float64)
+        T_5_2 = self.single_state(0.0)
 
-        E_5_1 = np.array([6 * self.Dq - 21 * self.B]) - GS
+        E_5_1 = self.single_state(6 * self.Dq - 21 * self.B) - GS
 
-        A_3_1 = np.array([6 * self.Dq - 12 * self.B + 4 * self.C]) - GS
+        A_3_1 = self.single_state(6 * self.Dq - 12 * self.B + 4 * self.C) - GS
 
         # Ligandfield dependent
         T_1_2 = -GS + self.T_1_2_states()
@@ -1085,21 +1235,22 @@ class d6(LigandFieldTheory):
         A_3_2 = -GS + self.A_3_2_states()
         A_1_2 = -GS + self.A_1_2_states()
 
-        if A_1_1[0] <= ENERGY_TOLERANCE:
-            T_1_2 -= A_1_1[0]
+        # Low-spin ground state 1_A_1 for strong ligand fields
+        shift = self.ground_state_shift(A_1_1, ENERGY_TOLERANCE)
+        T_1_2 -= shift
 
-            E_1_1 -= A_1_1[0]
-            T_3_2 -= A_1_1[0]
-            T_1_1 -= A_1_1[0]
-            E_3_1 -= A_1_1[0]
-            A_3_2 -= A_1_1[0]
-            A_1_2 -= A_1_1[0]
-            T_3_1 -= A_1_1[0]
+        E_1_1 -= shift
+        T_3_2 -= shift
+        T_1_1 -= shift
+        E_3_1 -= shift
+        A_3_2 -= shift
+        A_1_2 -= shift
+        T_3_1 -= shift
 
-            E_5_1 -= A_1_1[0]
-            T_5_2 -= A_1_1[0]
-            A_3_1 -= A_1_1[0]
-            A_1_1 -= A_1_1[0]
+        E_5_1 -= shift
+        T_5_2 -= shift
+        A_3_1 -= shift
+        A_1_1 -= shift
 
         return {
             "3_T_1": T_3_1,
@@ -1120,16 +1271,25 @@ class d6(LigandFieldTheory):
 class d7(LigandFieldTheory):
     """Class for d7 configuration."""
 
-    def __init__(self, Dq: float = 0.0, B: float = 971.0, C: float = 4499.0) -> None:
+    ground_terms = ("4_T_1", "2_E")
+
+    def __init__(
+        self,
+        Dq: float = 0.0,
+        B: float = 971.0,
+        C: float = 4499.0,
+        dtype: DTypeLike = np.float64,
+    ) -> None:
         """Initialize the d7 configuration with given parameters.
 
         Args:
             Dq (float): Crystal field splitting in wavenumbers (cm-1).
             B (float): Racah parameter B in wavenumbers (cm-1).
             C (float): Racah parameter C in wavenumbers (cm-1).
+            dtype (DTypeLike): Precision of the eigenvalues. Defaults to float64.
 
         """
-        super().__init__(Dq, B, C)
+        super().__init__(Dq, B, C, dtype=dtype)
 
     def T_2_2_states(self) -> Float64Array:
         """Calculate the T_2_2 states."""
@@ -1221,30 +1381,31 @@ class d7(LigandFieldTheory):
 
         # Ligendfield single dependent states
 
-        GS = T_4_1[0]
+        GS = T_4_1[..., :1].copy()
 
-        T_4_1[0] = np.array([0.0], dtype=float)
-        A_4_2 = np.array([12 * self.Dq - 15 * self.B]) - GS
-        T_4_2 = np.array([2 * self.Dq - 15 * self.B]) - GS
+        T_4_1[..., 0] = 0.0
+        A_4_2 = self.single_state(12 * self.Dq - 15 * self.B) - GS
+        T_4_2 = self.single_state(2 * self.Dq - 15 * self.B) - GS
 
-        A_2_1 = np.array([2 * self.Dq - 11 * self.B + 3 * self.C]) - GS
-        A_2_2 = np.array([2 * self.Dq + 9 * self.B + 3 * self.C]) - GS
+        A_2_1 = self.single_state(2 * self.Dq - 11 * self.B + 3 * self.C) - GS
+        A_2_2 = self.single_state(2 * self.Dq + 9 * self.B + 3 * self.C) - GS
 
         # Ligandfield dependent
         T_2_2 = self.T_2_2_states() - GS
         T_2_1 = self.T_2_1_states() - GS
         E_2 = self.E_2_states() - GS
-        T_4_1[1] -= GS
-
-        if E_2[0] <= 0:
-            A_4_2 -= E_2[0]
-            T_4_2 -= E_2[0]
-            A_2_1 -= E_2[0]
-            A_2_2 -= E_2[0]
-            T_2_2 -= E_2[0]
-            T_2_1 -= E_2[0]
-            T_4_1 -= E_2[0]
-            E_2 -= E_2[0]
+        T_4_1[..., 1:] -= GS
+
+        # Low-spin ground state 2_E for strong ligand fields
+        shift = self.ground_state_shift(E_2)
+        A_4_2 -= shift
+        T_4_2 -= shift
+        A_2_1 -= shift
+        A_2_2 -= shift
+        T_2_2 -= shift
+        T_2_1 -= shift
+        T_4_1 -= shift
+        E_2 -= shift
 
         return {
             "2_T_2": T_2_2,
@@ -1261,16 +1422,25 @@ class d7(LigandFieldTheory):
 class d8(LigandFieldTheory):
     """Class for d8 configuration."""
 
-    def __init__(self, Dq: float = 0.0, B: float = 1030.0, C: float = 4850.0) -> None:
+    ground_terms = ("3_A_2",)
+
+    def __init__(
+        self,
+        Dq: float = 0.0,
+        B: float = 1030.0,
+        C: float = 4850.0,
+        dtype: DTypeLike = np.float64,
+    ) -> None:
         """Initialize the d8 configuration with given parameters.
 
         Args:
             Dq (float): Crystal field splitting in wavenumbers (cm-1).
             B (float): Racah parameter B in wavenumbers (cm-1).
             C (float): Racah parameter C in wavenumbers (cm-1).
+            dtype (DTypeLike): Precision of the eigenvalues. Defaults to float64.
 
         """
-        super().__init__(Dq, B, C)
+        super().__init__(Dq, B, C, dtype=dtype)
 
     def A_1_1_states(self) -> Float64Array:
         """Calculate the A_1_1 states."""
@@ -1315,11 +1485,11 @@ class d8(LigandFieldTheory):
 
         # Ligendfield single depentent states
 
-        GS = np.array([-12 * self.Dq - 8 * self.B])
+        GS = self.single_state(-12 * self.Dq - 8 * self.B)
 
-        T_1_1 = np.array([-2 * self.Dq + 4 * self.B + 2 * self.C]) - GS
-        T_3_2 = np.array([-2 * self.Dq - 8 * self.B]) - GS
-        A_3_2 = np.array([0], dtype=float)
+        T_1_1 = self.single_state(-2 * self.Dq + 4 * self.B + 2 * self.C) - GS
+        T_3_2 = self.single_state(-2 * self.Dq - 8 * self.B) - GS
+        A_3_2 = self.single_state(0.0)
         # Ligandfield dependent
         A_1_1 = self.A_1_1_states() - GS
         E_1 = self.E_1_states() - GS
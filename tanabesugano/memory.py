@@ -0,0 +1,459 @@
+"""Memory estimates, budgets and peak usage of sweeps.
+
+A sweep holds three kinds of memory: the energy matrix of `points x columns`
+values, the per-point result dictionaries of `Batch.result` with views into its
+rows, and the working memory of the chunks being solved. The first two grow
+with the grid, where the dictionaries cost several times the energies
+themselves, the last one with the chunk size and the number of workers.
+`estimate_memory` predicts all three before anything is solved and
+`plan_sweep` fits a sweep into a memory budget by moving the energy matrix to
+a memory-mapped file and shrinking the chunks. `MemoryMonitor` measures the
+actual peak with `tracemalloc` and by sampling the resident set size (RSS).
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+import threading
+import tracemalloc
+
+from dataclasses import dataclass
+from dataclasses import replace
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from tanabesugano.reusable import ReusableSolver
+from tanabesugano.reusable import block_layout
+
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from numpy.typing import DTypeLike
+    from typing_extensions import Self
+
+
+# Largest number of points per chunk chosen by `plan_sweep`
+MAX_CHUNKSIZE = 65536
+# Factors of the units of `parse_size`
+_UNITS = {"": 1, "k": 10**3, "m": 10**6, "g": 10**9, "t": 10**12}
+_SIZE = re.compile(r"^\s*(\d+(?:\.\d*)?)\s*([kmgt]?)(i?)b?\s*$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class MemoryEstimate:
+    """Predicted memory of a sweep in bytes.
+
+    Attributes
+    ----------
+    points : int
+        Number of parameter sets
+    columns : int
+        Number of stored energies per parameter set
+    values : int
+        Energy matrix of shape `(points, columns)`
+    results : int
+        Per-point result dictionaries of `Batch.result`, without the energies
+    workspace : int
+        Working memory of one point of a vectorized chunk
+    chunksize : int
+        Number of points per chunk
+    workers : int
+        Number of chunks solved at the same time
+
+    """
+
+    points: int
+    columns: int
+    values: int
+    results: int
+    workspace: int
+    chunksize: int
+    workers: int
+
+    @property
+    def chunks(self) -> int:
+        """Working memory of all chunks in flight."""
+        return self.workspace * self.chunksize * self.workers
+
+    @property
+    def total(self) -> int:
+        """Memory of the energies, the results and the chunks."""
+        return self.values + self.results + self.chunks
+
+
+@dataclass(frozen=True)
+class SweepPlan:
+    """Chunk size and storage of a sweep that fits into a memory budget.
+
+    Attributes
+    ----------
+    budget : int
+        Memory budget in bytes
+    chunksize : int
+        Number of points per chunk
+    storage : str
+        "memory" for an in-RAM energy matrix, "memmap" for a memory-mapped file
+    estimate : MemoryEstimate
+        Predicted memory with the planned chunk size
+
+    """
+
+    budget: int
+    chunksize: int
+    storage: str
+    estimate: MemoryEstimate
+
+    @property
+    def resident(self) -> int:
+        """Predicted memory held in RAM, a memory-mapped matrix excluded."""
+        if self.storage == "memmap":
+            return self.estimate.total - self.estimate.values
+        return self.estimate.total
+
+
+@dataclass(frozen=True)
+class MemoryReport:
+    """Measured memory of a sweep in bytes.
+
+    Attributes
+    ----------
+    traced : int | None
+        Peak of the memory allocated through Python and numpy during the sweep
+        as traced by `tracemalloc`, None if not traced
+    rss : int | None
+        Largest sampled resident set size of the process, None if unavailable
+    rss_start : int | None
+        Resident set size at the start of the sweep, None if unavailable
+    estimate : MemoryEstimate | None
+        Prediction of the sweep for comparison, None if not given
+
+    """
+
+    traced: int | None
+    rss: int | None
+    rss_start: int | None
+    estimate: MemoryEstimate | None = None
+
+    @property
+    def rss_increase(self) -> int | None:
+        """Growth of the resident set size during the sweep."""
+        if self.rss is None or self.rss_start is None:
+            return None
+        return self.rss - self.rss_start
+
+
+def parse_size(size: int | str) -> int:
+    """Convert a memory size to bytes.
+
+    Parameters
+    ----------
+    size : int | str
+        Number of bytes or a string with a decimal (kB, MB, GB, TB) or binary
+        (KiB, MiB, GiB, TiB) unit, e.g. "512MB" or "2 GiB"
+
+    Returns
+    -------
+    int
+        Number of bytes
+
+    Raises
+    ------
+    ValueError
+        If the size is negative or cannot be parsed
+
+    """
+    if isinstance(size, str):
+        match = _SIZE.match(size)
+        if match is None:
+            msg = f"Cannot parse the memory size '{size}', use e.g. '512MB'!"
+            raise ValueError(msg)
+        number, unit, binary = match.groups()
+        exponent = list(_UNITS).index(unit.lower())
+        factor = 1024**exponent if binary else _UNITS[unit.lower()]
+        size = int(float(number) * factor)
+    if size < 0:
+        msg = f"The memory size has to be non-negative, got {size}!"
+        raise ValueError(msg)
+    return int(size)
+
+
+def _result_bytes(solver: ReusableSolver) -> int:
+    """Size of one `Batch.result` entry without the energies of its row."""
+    row = np.zeros(solver.size, dtype=solver.dtype)
+    states = solver.states(row)
+    parameter = np.float64(0.0)
+    entry = {"d_count": 0, "Dq": parameter, "B": parameter, "C": parameter}
+    entry["states"] = states
+    return (
+        sys.getsizeof(entry)
+        + sys.getsizeof(states)
+        + sum(sys.getsizeof(value) for value in states.values())
+        + 3 * sys.getsizeof(parameter)
+        # Slot of the entry in the result list
+        + 8
+    )
+
+
+def _workspace_bytes(d_count: int, itemsize: int) -> int:
+    """Working memory per point of a vectorized chunk, an upper bound.
+
+    Every block is built as a matrix of float64 and diagonalized into its
+    eigenvalues, which are shifted to the ground state in the target dtype.
+    """
+    sizes = [coefficients.shape[-1] for _, coefficients in block_layout(d_count)]
+    return 8 * (3 + sum(size**2 for size in sizes)) + 2 * itemsize * sum(sizes)
+
+
+def estimate_memory(
+    d_count: int,
+    points: int,
+    *,
+    dtype: DTypeLike = np.float64,
+    chunksize: int = 1024,
+    workers: int = 1,
+    results: bool = True,
+    **selection: object,
+) -> MemoryEstimate:
+    """Predict the memory of a sweep before solving it.
+
+    Parameters
+    ----------
+    d_count : int
+        Electron configuration (d2-d8)
+    points : int
+        Number of parameter sets
+    dtype : DTypeLike, optional
+        Precision of the stored energies, by default np.float64
+    chunksize : int, optional
+        Number of points per vectorized chunk, by default 1024
+    workers : int, optional
+        Number of chunks solved at the same time, by default 1
+    results : bool, optional
+        Whether the per-point result dictionaries of `Batch.result` are built,
+        by default True
+    **selection : object
+        `terms`, `spin` and `lowest_k` filters of the sweep
+
+    Returns
+    -------
+    MemoryEstimate
+        Predicted memory in bytes
+
+    """
+    solver = ReusableSolver(d_count, dtype=dtype, **selection)
+    itemsize = np.dtype(dtype).itemsize
+    return MemoryEstimate(
+        points=points,
+        columns=solver.size,
+        values=points * solver.size * itemsize,
+        results=points * _result_bytes(solver) if results else 0,
+        workspace=_workspace_bytes(d_count, itemsize),
+        chunksize=min(chunksize, max(points, 1)),
+        workers=workers,
+    )
+
+
+def plan_sweep(
+    d_count: int,
+    points: int,
+    budget: int | str,
+    *,
+    dtype: DTypeLike = np.float64,
+    workers: int = 1,
+    results: bool = True,
+    **selection: object,
+) -> SweepPlan:
+    """Choose the chunk size and storage of a sweep within a memory budget.
+
+    The result dictionaries have to stay in RAM. The energy matrix stays in RAM
+    as long as one point per worker still fits next to it, otherwise it moves
+    to a memory-mapped file. The remaining budget is split into the chunks of
+    the workers, capped at `MAX_CHUNKSIZE` points.
+
+    Parameters
+    ----------
+    d_count : int
+        Electron configuration (d2-d8)
+    points : int
+        Number of parameter sets
+    budget : int | str
+        Memory budget in bytes or as string, e.g. "2GB"
+    dtype : DTypeLike, optional
+        Precision of the stored energies, by default np.float64
+    workers : int, optional
+        Number of chunks solved at the same time, by default 1
+    results : bool, optional
+        Whether the per-point result dictionaries are built, by default True
+    **selection : object
+        `terms`, `spin` and `lowest_k` filters of the sweep
+
+    Returns
+    -------
+    SweepPlan
+        Chunk size, storage and the predicted memory of the sweep
+
+    Raises
+    ------
+    MemoryError
+        If the sweep does not fit into the budget even with a memory-mapped
+        energy matrix and one point per chunk
+
+    """
+    budget = parse_size(budget)
+    estimate = estimate_memory(
+        d_count,
+        points,
+        dtype=dtype,
+        chunksize=1,
+        workers=workers,
+        results=results,
+        **selection,
+    )
+    minimum = estimate.results + estimate.chunks
+    if minimum > budget:
+        msg = (
+            f"The sweep of {points} points needs at least {minimum} bytes, more "
+            f"than the budget of {budget} bytes; reduce the grid or aggregate it "
+            "with `Batch.reduce` instead of storing every point!"
+        )
+        raise MemoryError(msg)
+    storage = "memory" if minimum + estimate.values <= budget else "memmap"
+    available = budget - estimate.results
+    if storage == "memory":
+        available -= estimate.values
+    chunksize = min(
+        available // (estimate.workspace * workers),
+        max(points, 1),
+        MAX_CHUNKSIZE,
+    )
+    return SweepPlan(
+        budget=budget,
+        chunksize=int(chunksize),
+        storage=storage,
+        estimate=replace(estimate, chunksize=int(chunksize)),
+    )
+
+
+def current_rss() -> int | None:
+    """Return the resident set size of the process in bytes.
+
+    Reads `/proc/self/statm` where available, otherwise falls back to the peak
+    resident set size of `resource.getrusage`, and returns None on platforms
+    without either.
+    """
+    try:
+        pages = int(Path("/proc/self/statm").read_text(encoding="ascii").split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource  # noqa: PLC0415
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes on Linux and the BSDs
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryMonitor:
+    """Measure the peak memory of a block of code.
+
+    `tracemalloc` traces every allocation of Python objects and numpy arrays,
+    while a background thread samples the resident set size, which includes
+    LAPACK workspaces and memory-mapped pages. Worker processes are not
+    included. Tracing slows down allocation-heavy Python code, therefore it can
+    be switched off to only sample the resident set size.
+
+    Examples
+    --------
+    >>> with MemoryMonitor() as monitor:
+    ...     batch.calculation()
+    >>> monitor.report.traced
+
+    """
+
+    def __init__(
+        self,
+        *,
+        trace: bool = True,
+        interval: float = 0.01,
+        estimate: MemoryEstimate | None = None,
+    ) -> None:
+        """Configure the monitor.
+
+        Parameters
+        ----------
+        trace : bool, optional
+            Trace the allocations with `tracemalloc`, by default True
+        interval : float, optional
+            Seconds between two samples of the resident set size, by default 0.01
+        estimate : MemoryEstimate | None, optional
+            Prediction attached to the report, by default None
+
+        """
+        self.trace = trace
+        self.interval = interval
+        self.estimate = estimate
+        self.report: MemoryReport | None = None
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self._rss: int | None = None
+        self._started = False
+        self._traced_start = 0
+
+    def _sample(self) -> None:
+        """Keep the largest resident set size until stopped."""
+        while not self._stop.wait(self.interval):
+            self._record()
+
+    def _record(self) -> None:
+        """Record the current resident set size."""
+        rss = current_rss()
+        if rss is not None and (self._rss is None or rss > self._rss):
+            self._rss = rss
+
+    def __enter__(self) -> Self:
+        """Start tracing and sampling."""
+        if self.trace:
+            # An outer trace keeps running, only its peak is reset
+            self._started = not tracemalloc.is_tracing()
+            if self._started:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._traced_start = tracemalloc.get_traced_memory()[0]
+        self._rss = None
+        self._record()
+        rss_start = self._rss
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+        self.report = MemoryReport(traced=None, rss=None, rss_start=rss_start)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop tracing and sampling and store the `report`."""
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self._record()
+        traced = None
+        if self.trace:
+            traced = tracemalloc.get_traced_memory()[1] - self._traced_start
+            if self._started:
+                tracemalloc.stop()
+        self.report = MemoryReport(
+            traced=traced,
+            rss=self._rss,
+            rss_start=self.report.rss_start if self.report else None,
+            estimate=self.estimate,
+        )
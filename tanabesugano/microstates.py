@@ -0,0 +1,313 @@
+"""Ligand field Hamiltonian in the full determinant basis with spin-orbit coupling.
+
+The d^n Hamiltonian is built from Slater determinants of the ten d spin
+orbitals `|m, sigma>`, with the octahedral crystal field (`Dq`), the
+interelectronic repulsion (Racah `B` and `C`) and the spin-orbit coupling
+`zeta * l.s`. Every matrix element is linear in these four parameters, so the
+coefficient matrices are built once per configuration and batched solves only
+combine and diagonalize them.
+
+The fourfold axis of the octahedron only couples `m` with `m +- 4`, and the
+spin-orbit coupling conserves `M_L + M_S`, so `2 (M_L + M_S) mod 8` labels
+blocks of about a quarter of the full size. Time reversal maps the block `q`
+onto the block `-q`, which share their eigenvalues and are solved only once.
+
+Without spin-orbit coupling the eigenvalues are the energies of `dN.solver()`,
+each repeated by the degeneracy `(2S + 1) * dim(Gamma)` of its term.
+"""
+
+from __future__ import annotations
+
+from functools import cache
+from itertools import combinations
+from math import factorial
+from math import sqrt
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from tanabesugano.backends import get_backend
+
+
+if TYPE_CHECKING:
+    from numpy.typing import DTypeLike
+
+    from tanabesugano.backends import Backend
+    from tanabesugano.matrices import Float64Array
+
+
+# Magnetic quantum numbers of the d orbitals
+_M = (-2, -1, 0, 1, 2)
+# Number of spin orbitals
+_ORBITALS = 10
+# Number of symmetry blocks, `2 (M_L + M_S)` is conserved modulo 8
+_BLOCKS = 8
+# Octahedral crystal field in units of Dq, `<m|V|m'>` along a fourfold axis
+_CRYSTAL_FIELD = {(2, 2): 1.0, (-2, -2): 1.0, (1, 1): -4.0, (-1, -1): -4.0}
+_CRYSTAL_FIELD |= {(0, 0): 6.0, (2, -2): 5.0, (-2, 2): 5.0}
+# Slater integrals F^0, F^2, F^4 in terms of the Racah parameters B and C (A = 0)
+_SLATER = {0: (0.0, 7.0 / 5.0), 2: (49.0, 7.0), 4: (0.0, 63.0 / 5.0)}
+
+PARAMETERS = ("Dq", "B", "C", "zeta")
+
+
+def wigner_3j(j: tuple[int, int, int], m: tuple[int, int, int]) -> float:
+    """Return the Wigner 3j symbol of integer angular momenta (Racah formula)."""
+    (j1, j2, j3), (m1, m2, m3) = j, m
+    if m1 + m2 + m3 != 0 or not abs(j1 - j2) <= j3 <= j1 + j2:
+        return 0.0
+    if abs(m1) > j1 or abs(m2) > j2 or abs(m3) > j3:
+        return 0.0
+    triangle = (
+        factorial(j1 + j2 - j3)
+        * factorial(j1 - j2 + j3)
+        * factorial(-j1 + j2 + j3)
+        / factorial(j1 + j2 + j3 + 1)
+    )
+    norm = sqrt(
+        triangle
+        * factorial(j1 + m1)
+        * factorial(j1 - m1)
+        * factorial(j2 + m2)
+        * factorial(j2 - m2)
+        * factorial(j3 + m3)
+        * factorial(j3 - m3),
+    )
+    total = 0.0
+    for t in range(
+        max(0, j2 - j3 - m1, j1 - j3 + m2),
+        min(j1 + j2 - j3, j1 - m1, j2 + m2) + 1,
+    ):
+        total += (-1) ** t / (
+            factorial(t)
+            * factorial(j3 - j2 + t + m1)
+            * factorial(j3 - j1 + t - m2)
+            * factorial(j1 + j2 - j3 - t)
+            * factorial(j1 - t - m1)
+            * factorial(j2 - t + m2)
+        )
+    return (-1) ** (j1 - j2 - m3) * norm * total
+
+
+def gaunt(k: int, m1: int, m2: int) -> float:
+    """Return the Gaunt coefficient `c^k(2 m1, 2 m2)` of the d shell."""
+    return (
+        (-1) ** m1
+        * 5.0
+        * wigner_3j((2, k, 2), (0, 0, 0))
+        * wigner_3j((2, k, 2), (-m1, m1 - m2, m2))
+    )
+
+
+def _spin_orbital(index: int) -> tuple[int, int]:
+    """Return `m` and twice the spin projection of a spin orbital."""
+    return _M[index // 2], 1 - 2 * (index % 2)
+
+
+def _one_electron() -> list[tuple[int, int, Float64Array]]:
+    """Return the one-electron terms `(p, q, coefficients)` of `a+_p a_q`."""
+    terms = []
+    for p in range(_ORBITALS):
+        for q in range(_ORBITALS):
+            (mp, sp), (mq, sq) = _spin_orbital(p), _spin_orbital(q)
+            value = np.zeros(len(PARAMETERS))
+            if sp == sq:
+                value[0] = _CRYSTAL_FIELD.get((mp, mq), 0.0)
+                if mp == mq:
+                    # l_z s_z
+                    value[3] = mp * sp / 2.0
+            elif mp == mq + sq:
+                # (l+ s- + l- s+) / 2 between (mq, sq) and (mq + sq, -sq)
+                value[3] = 0.5 * sqrt(6 - mq * mp)
+            if value.any():
+                terms.append((p, q, value))
+    return terms
+
+
+def _two_electron() -> list[tuple[int, int, int, int, Float64Array]]:
+    """Return the terms `(p, q, r, s, coefficients)` of `a+_p a+_q a_s a_r / 2`."""
+    terms = []
+    for p, q, r, s in np.ndindex(_ORBITALS, _ORBITALS, _ORBITALS, _ORBITALS):
+        if p == q or r == s:
+            continue
+        (mp, sp), (mq, sq) = _spin_orbital(p), _spin_orbital(q)
+        (mr, sr), (ms, ss) = _spin_orbital(r), _spin_orbital(s)
+        if sp != sr or sq != ss or mp + mq != mr + ms:
+            continue
+        value = np.zeros(len(PARAMETERS))
+        for k, (b, c) in _SLATER.items():
+            angular = gaunt(k, mp, mr) * gaunt(k, ms, mq)
+            value[1] += 0.5 * angular * b
+            value[2] += 0.5 * angular * c
+        if value.any():
+            terms.append((int(p), int(q), int(r), int(s), value))
+    return terms
+
+
+def _apply(
+    determinant: int,
+    operators: tuple[tuple[int, bool], ...],
+) -> tuple[int, int] | None:
+    """Apply creation (True) and annihilation (False) operators right to left."""
+    sign = 1
+    for orbital, create in reversed(operators):
+        occupied = bool(determinant >> orbital & 1)
+        if occupied == create:
+            return None
+        if (determinant & ((1 << orbital) - 1)).bit_count() % 2:
+            sign = -sign
+        determinant ^= 1 << orbital
+    return determinant, sign
+
+
+@cache
+def determinants(d_count: int) -> tuple[int, ...]:
+    """Return the Slater determinants of a configuration as occupation bitmasks.
+
+    Args:
+        d_count (int): Number of d electrons (1-9).
+
+    Raises:
+        ValueError: If `d_count` is not between 1 and 9.
+
+    Returns:
+        tuple[int, ...]: Bit `2 (m + 2) + s` is set for an occupied orbital `m`
+            with spin up (`s = 0`) or down (`s = 1`).
+
+    """
+    if not 0 < d_count < _ORBITALS:
+        msg = "The number of d electrons should be between 1 and 9."
+        raise ValueError(msg)
+    return tuple(
+        sum(1 << orbital for orbital in occupied)
+        for occupied in combinations(range(_ORBITALS), d_count)
+    )
+
+
+@cache
+def coefficient_matrices(d_count: int) -> Float64Array:
+    """Return the Hamiltonian coefficients of `Dq`, `B`, `C` and `zeta`.
+
+    Args:
+        d_count (int): Number of d electrons (1-9).
+
+    Returns:
+        Float64Array: Read-only array of shape `(4, n, n)` in the basis of
+            `determinants(d_count)`.
+
+    """
+    basis = determinants(d_count)
+    index = {determinant: i for i, determinant in enumerate(basis)}
+    matrices = np.zeros((len(PARAMETERS), len(basis), len(basis)))
+    terms = [((p, True), (q, False), value) for p, q, value in _one_electron()]
+    terms += [
+        ((p, True), (q, True), (s, False), (r, False), value)
+        for p, q, r, s, value in _two_electron()
+    ]
+    for j, determinant in enumerate(basis):
+        for *operators, value in terms:
+            result = _apply(determinant, tuple(operators))
+            if result is not None:
+                matrices[:, index[result[0]], j] += result[1] * value
+    matrices.setflags(write=False)
+    return matrices
+
+
+@cache
+def symmetry_blocks(d_count: int) -> tuple[tuple[int, np.ndarray, int], ...]:
+    """Return the symmetry blocks of the Hamiltonian.
+
+    Args:
+        d_count (int): Number of d electrons (1-9).
+
+    Returns:
+        tuple[tuple[int, np.ndarray, int], ...]: Label `2 (M_L + M_S) mod 8`,
+            determinant indices and multiplicity of every block that has to
+            be solved; blocks related by time reversal are solved once with
+            multiplicity two.
+
+    """
+    labels = np.array(
+        [
+            sum(
+                2 * _spin_orbital(orbital)[0] + _spin_orbital(orbital)[1]
+                for orbital in range(_ORBITALS)
+                if determinant >> orbital & 1
+            )
+            % _BLOCKS
+            for determinant in determinants(d_count)
+        ],
+    )
+    blocks = []
+    for label in range(_BLOCKS):
+        partner = -label % _BLOCKS
+        if partner < label or not np.any(labels == label):
+            continue
+        multiplicity = 1 if partner == label else 2
+        blocks.append((label, np.flatnonzero(labels == label), multiplicity))
+    return tuple(blocks)
+
+
+def hamiltonian(
+    d_count: int,
+    Dq: float | Float64Array,
+    B: float | Float64Array,
+    C: float | Float64Array,
+    zeta: float | Float64Array = 0.0,
+) -> Float64Array:
+    """Return the full Hamiltonian in the determinant basis.
+
+    Args:
+        d_count (int): Number of d electrons (1-9).
+        Dq (float | Float64Array): Oh crystal field splitting, scalar or array.
+        B (float | Float64Array): Racah B parameter, scalar or array.
+        C (float | Float64Array): Racah C parameter, scalar or array.
+        zeta (float | Float64Array): Spin-orbit coupling constant. Defaults to 0.
+
+    Returns:
+        Float64Array: Matrices of shape `(*shape, n, n)`.
+
+    """
+    parameters = np.stack(np.broadcast_arrays(Dq, B, C, zeta), axis=-1)
+    return np.tensordot(parameters, coefficient_matrices(d_count), axes=1)
+
+
+def solve_microstates(
+    d_count: int,
+    Dq: float | Float64Array,
+    B: float | Float64Array,
+    C: float | Float64Array,
+    zeta: float | Float64Array = 0.0,
+    *,
+    dtype: DTypeLike = np.float64,
+    backend: str | Backend | None = None,
+) -> Float64Array:
+    """Solve all levels of many parameter sets block by block.
+
+    Args:
+        d_count (int): Number of d electrons (1-9).
+        Dq (float | Float64Array): Oh crystal field splitting, scalar or array.
+        B (float | Float64Array): Racah B parameter, scalar or array.
+        C (float | Float64Array): Racah C parameter, scalar or array.
+        zeta (float | Float64Array): Spin-orbit coupling constant. Defaults to 0.
+        dtype (DTypeLike): Precision of the results. Defaults to float64.
+        backend (str | Backend | None): Compute backend, by default the one of
+            `get_backend()`.
+
+    Returns:
+        Float64Array: Sorted energies of shape `(*shape, n)` of all `n`
+            microstates relative to the ground state.
+
+    """
+    parameters = np.stack(np.broadcast_arrays(Dq, B, C, zeta), axis=-1).astype(
+        np.float64,
+    )
+    coefficients = coefficient_matrices(d_count)
+    backend = get_backend(backend)
+    levels = []
+    for _, indices, multiplicity in symmetry_blocks(d_count):
+        block = coefficients[:, indices[:, None], indices[None, :]]
+        values = backend.eigvalsh(backend.assemble(parameters, block))
+        levels.extend([values] * multiplicity)
+    energies = np.sort(np.concatenate(levels, axis=-1), axis=-1)
+    return (energies - energies[..., :1]).astype(dtype, copy=False)
@@ -0,0 +1,283 @@
+"""Ground-state phase diagrams in the (Dq/B, C/B) plane.
+
+The energies of a configuration scale with B at fixed Dq/B and C/B, so the
+ground state only depends on these two ratios. For d4-d7 the ground state
+switches between the high-spin and the low-spin term along a curve of this
+plane, where the gap between the lowest levels of the two terms vanishes.
+
+`phase_diagram` solves the gap on a coarse grid, finds the cells with a change
+of the ground state (marching squares) and locates the crossover by bisection
+along the cell edges and along a few additional lines inside the boundary
+cells only. All bisections are vectorized, so every step is one batched solve
+of the two ground-term blocks.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from tanabesugano.batch import ELECTRON_CONFIG_SOLVERS
+from tanabesugano.batch import solve_batch
+
+
+if TYPE_CHECKING:
+    from tanabesugano.matrices import Float64Array
+
+
+# Racah B used for the evaluation, the results only depend on the ratios
+_B = 1000.0
+# Number of crossed edges of a cell with one and with two boundary segments
+_SEGMENT_EDGES = 2
+_SADDLE_EDGES = 4
+
+
+@dataclass
+class PhaseDiagram:
+    """Ground-state labels and crossover curves of a configuration.
+
+    Attributes
+    ----------
+    d_count : int
+        Electron configuration (d2-d8)
+    terms : tuple[str, ...]
+        Possible ground terms; the labels index this tuple
+    dq_b : Float64Array
+        Dq/B values of the coarse grid
+    c_b : Float64Array
+        C/B values of the coarse grid
+    labels : np.ndarray
+        Ground-state label raster of shape `(len(c_b), len(dq_b))`
+    curves : list[Float64Array]
+        Crossover curves as arrays of shape `(m, 2)` of (Dq/B, C/B) points
+    evaluations : int
+        Number of solved parameter sets
+
+    """
+
+    d_count: int
+    terms: tuple[str, ...]
+    dq_b: Float64Array
+    c_b: Float64Array
+    labels: np.ndarray
+    curves: list[Float64Array] = field(default_factory=list)
+    evaluations: int = 0
+
+
+class _Gap:
+    """Energy gap between the two possible ground terms of a configuration."""
+
+    def __init__(self, d_count: int) -> None:
+        self.d_count = d_count
+        self.terms = ELECTRON_CONFIG_SOLVERS[d_count].ground_terms
+        self.evaluations = 0
+
+    def __call__(self, points: Float64Array) -> Float64Array:
+        """Return the gap in units of B, positive if the second term is lower."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.evaluations += points.shape[0]
+        states = solve_batch(
+            self.d_count,
+            points[:, 0] * _B,
+            _B,
+            points[:, 1] * _B,
+            terms=self.terms,
+            lowest_k=1,
+        )
+        first, second = (states[term][:, 0] for term in self.terms)
+        return (first - second) / _B
+
+    def bisect(
+        self,
+        start: Float64Array,
+        stop: Float64Array,
+        tol: float,
+    ) -> Float64Array:
+        """Locate the sign change of the gap on many line segments at once."""
+        if start.shape[0] == 0:
+            return np.empty((0, 2))
+        side = self(start) > 0.0
+        lower = np.zeros(start.shape[0])
+        upper = np.ones(start.shape[0])
+        length = np.linalg.norm(stop - start, axis=1).max()
+        for _ in range(max(1, int(np.ceil(np.log2(length / tol))))):
+            middle = 0.5 * (lower + upper)
+            same = (self(start + (stop - start) * middle[:, None]) > 0.0) == side
+            lower = np.where(same, middle, lower)
+            upper = np.where(same, upper, middle)
+        return start + (stop - start) * (0.5 * (lower + upper))[:, None]
+
+
+def _cell_edges(labels: np.ndarray, j: int, i: int) -> list[tuple]:
+    """Return the crossed edges of a cell (marching squares).
+
+    The edges are ordered bottom, right, top and left, so that for a saddle
+    cell with four crossed edges neighbouring edges cut off one corner each.
+    """
+    return [
+        edge
+        for edge, changed in (
+            (("h", j, i), labels[j, i] != labels[j, i + 1]),
+            (("v", j, i + 1), labels[j, i + 1] != labels[j + 1, i + 1]),
+            (("h", j + 1, i), labels[j + 1, i] != labels[j + 1, i + 1]),
+            (("v", j, i), labels[j, i] != labels[j + 1, i]),
+        )
+        if changed
+    ]
+
+
+def _chain(segments: list[tuple[tuple, tuple, Float64Array]]) -> list[Float64Array]:
+    """Join the cell segments that share a crossed edge into curves."""
+    by_edge: dict[tuple, list[int]] = {}
+    for index, (first, last, _) in enumerate(segments):
+        by_edge.setdefault(first, []).append(index)
+        by_edge.setdefault(last, []).append(index)
+
+    # Open curves start at the border of the grid, closed ones anywhere
+    order = sorted(by_edge, key=lambda edge: len(by_edge[edge]))
+    used: set[int] = set()
+    curves = []
+    for edge in order:
+        for index in by_edge[edge]:
+            if index in used:
+                continue
+            parts, current, segment = [], edge, index
+            while segment is not None:
+                used.add(segment)
+                first, last, points = segments[segment]
+                if first != current:
+                    first, last, points = last, first, points[::-1]
+                parts.append(points if not parts else points[1:])
+                current = last
+                segment = next((i for i in by_edge[current] if i not in used), None)
+            curves.append(np.concatenate(parts))
+    return curves
+
+
+def phase_diagram(
+    d_count: int,
+    dq_b: tuple[float, float] = (0.0, 4.0),
+    c_b: tuple[float, float] = (3.0, 6.0),
+    *,
+    shape: tuple[int, int] = (21, 16),
+    refine: int = 4,
+    tol: float = 1e-9,
+) -> PhaseDiagram:
+    """Calculate the ground-state phase diagram of a configuration.
+
+    Parameters
+    ----------
+    d_count : int
+        Electron configuration (d2-d8); only d4-d7 have two possible ground
+        terms and therefore crossover curves
+    dq_b : tuple[float, float], optional
+        Range of Dq/B, by default (0.0, 4.0)
+    c_b : tuple[float, float], optional
+        Range of C/B, by default (3.0, 6.0)
+    shape : tuple[int, int], optional
+        Number of coarse grid points along Dq/B and C/B, by default (21, 16)
+    refine : int, optional
+        Number of additional bisection lines inside every boundary cell,
+        by default 4
+    tol : float, optional
+        Precision of the crossover points in units of the ratios, by default 1e-9
+
+    Returns
+    -------
+    PhaseDiagram
+        Label raster of the coarse grid and the crossover curves.
+
+    Raises
+    ------
+    ValueError
+        If `d_count` is not a valid electron configuration
+
+    """
+    solver_class = ELECTRON_CONFIG_SOLVERS.get(d_count)
+    if solver_class is None:
+        msg = "The number of unpaired electrons should be between 2 and 8."
+        raise ValueError(msg)
+    x = np.linspace(*dq_b, shape[0])
+    y = np.linspace(*c_b, shape[1])
+    if len(solver_class.ground_terms) == 1:
+        labels = np.zeros((y.size, x.size), dtype=np.int8)
+        return PhaseDiagram(d_count, solver_class.ground_terms, x, y, labels)
+
+    gap = _Gap(d_count)
+    grid = np.stack(np.meshgrid(x, y), axis=-1)
+    labels = (gap(grid.reshape(-1, 2)) > 0.0).astype(np.int8).reshape(grid.shape[:2])
+
+    # Crossover points on the crossed edges of the coarse grid
+    edges = [
+        ("h", j, i) for j, i in zip(*np.nonzero(np.diff(labels, axis=1)), strict=True)
+    ]
+    edges += [
+        ("v", j, i) for j, i in zip(*np.nonzero(np.diff(labels, axis=0)), strict=True)
+    ]
+    start = np.array([grid[j, i] for _, j, i in edges]).reshape(-1, 2)
+    stop = np.array(
+        [grid[j, i + 1] if kind == "h" else grid[j + 1, i] for kind, j, i in edges],
+    ).reshape(-1, 2)
+    crossing = dict(zip(edges, gap.bisect(start, stop, tol), strict=True))
+
+    # Boundary cells; the center of a saddle cell decides which corners are
+    # cut off, bottom-right and top-left if it belongs to the bottom-left one
+    cells = [
+        (j, i, _cell_edges(labels, j, i))
+        for j in range(y.size - 1)
+        for i in range(x.size - 1)
+    ]
+    saddles = [cell for cell in cells if len(cell[2]) == _SADDLE_EDGES]
+    centers = [0.5 * (grid[j, i] + grid[j + 1, i + 1]) for j, i, _ in saddles]
+    center_labels = gap(np.array(centers).reshape(-1, 2)) > 0.0 if saddles else []
+    pairs = [
+        (j, i, tuple(crossed))
+        for j, i, crossed in cells
+        if len(crossed) == _SEGMENT_EDGES
+    ]
+    for (j, i, crossed), label in zip(saddles, center_labels, strict=True):
+        bottom, right, top, left = crossed
+        if label == labels[j, i]:
+            pairs += [(j, i, (bottom, right)), (j, i, (top, left))]
+        else:
+            pairs += [(j, i, (bottom, left)), (j, i, (top, right))]
+
+    # Additional lines across the boundary cells, perpendicular to the boundary
+    size = np.array([x[1] - x[0], y[1] - y[0]])
+    fractions = np.arange(1, refine + 1) / (refine + 1)
+    lines, owners = [], []
+    for number, (j, i, (first, last)) in enumerate(pairs):
+        ends = np.array([crossing[first], crossing[last]])
+        axis = int(np.argmax(np.ptp(ends, axis=0) / size))
+        low, high = ends[:, axis].min(), ends[:, axis].max()
+        for value in low + fractions * (high - low):
+            a, b = grid[j, i].copy(), grid[j + 1, i + 1].copy()
+            a[axis] = b[axis] = value
+            lines.append((a, b))
+            owners.append(number)
+    inner = np.empty((0, 2))
+    if lines:
+        start, stop = (np.array(part) for part in zip(*lines, strict=True))
+        changed = (gap(start) > 0.0) != (gap(stop) > 0.0)
+        inner = gap.bisect(start[changed], stop[changed], tol)
+        owners = np.array(owners)[changed]
+
+    segments = []
+    for number, (_, _, (first, last)) in enumerate(pairs):
+        a, b = crossing[first], crossing[last]
+        points = inner[owners == number] if lines else inner
+        order = np.argsort((points - a) @ (b - a))
+        segments.append((first, last, np.vstack([a, points[order], b])))
+
+    return PhaseDiagram(
+        d_count,
+        gap.terms,
+        x,
+        y,
+        labels,
+        curves=_chain(segments),
+        evaluations=gap.evaluations,
+    )
@@ -0,0 +1,180 @@
+"""Progress reporting for long sweeps.
+
+Sweeps report at chunk granularity: after every solved chunk a `Progress`
+snapshot with the completed points, the throughput and the estimated time of
+arrival is passed to a callback, so the reporting costs nothing per point.
+Serial, threaded and process-parallel sweeps all report from the calling
+thread, therefore callbacks need no locking.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import TextIO
+
+    ProgressCallback = Callable[["Progress"], None]
+
+
+# Number of points of a point-by-point sweep between two progress reports
+SERIAL_CHUNK = 1024
+
+
+@dataclass(frozen=True)
+class Progress:
+    """Snapshot of a sweep after a solved chunk.
+
+    Attributes
+    ----------
+    completed : int
+        Number of solved points
+    total : int | None
+        Number of points of the sweep, None if unknown
+    chunk : int
+        Number of solved chunks
+    chunks : int | None
+        Number of chunks of the sweep, None if unknown
+    elapsed : float
+        Seconds since the start of the sweep
+
+    """
+
+    completed: int
+    total: int | None
+    chunk: int
+    chunks: int | None
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        """Solved points per second."""
+        return self.completed / self.elapsed if self.elapsed > 0.0 else 0.0
+
+    @property
+    def fraction(self) -> float | None:
+        """Solved fraction of the sweep, None if the total is unknown."""
+        if not self.total:
+            return None
+        return self.completed / self.total
+
+    @property
+    def eta(self) -> float | None:
+        """Estimated seconds until the sweep is done, None if unknown."""
+        if self.total is None or self.rate == 0.0:
+            return None
+        return max(self.total - self.completed, 0) / self.rate
+
+
+class ProgressTracker:
+    """Count the solved chunks of a sweep and report them to a callback.
+
+    Examples
+    --------
+    >>> tracker = ProgressTracker(ProgressBar("d5"), total=4096, chunks=4)
+    >>> for _ in range(4):
+    ...     tracker.advance(1024)
+
+    """
+
+    def __init__(
+        self,
+        callback: ProgressCallback | None,
+        total: int | None = None,
+        chunks: int | None = None,
+    ) -> None:
+        """Start the clock of a sweep.
+
+        Parameters
+        ----------
+        callback : ProgressCallback | None
+            Called with a `Progress` after every chunk, None to report nothing
+        total : int | None, optional
+            Number of points of the sweep, by default unknown
+        chunks : int | None, optional
+            Number of chunks of the sweep, by default unknown
+
+        """
+        self.callback = callback
+        self.total = total
+        self.chunks = chunks
+        self.completed = 0
+        self.chunk = 0
+        self.start = time.perf_counter()
+
+    def advance(self, points: int) -> None:
+        """Record a solved chunk of `points` points and report it."""
+        if self.callback is None:
+            return
+        self.completed += points
+        self.chunk += 1
+        self.callback(
+            Progress(
+                completed=self.completed,
+                total=self.total,
+                chunk=self.chunk,
+                chunks=self.chunks,
+                elapsed=time.perf_counter() - self.start,
+            ),
+        )
+
+
+def _clock(seconds: float | None) -> str:
+    """Format seconds as h:mm:ss."""
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class ProgressBar:
+    """Console progress bar, usable as progress callback of every sweep."""
+
+    def __init__(
+        self,
+        label: str = "",
+        width: int = 30,
+        stream: TextIO | None = None,
+    ) -> None:
+        """Configure the progress bar.
+
+        Parameters
+        ----------
+        label : str, optional
+            Text in front of the bar, by default ""
+        width : int, optional
+            Number of characters of the bar, by default 30
+        stream : TextIO | None, optional
+            Output stream, by default `sys.stderr`
+
+        """
+        self.label = label
+        self.width = width
+        self.stream = stream
+
+    def __call__(self, progress: Progress) -> None:
+        """Redraw the bar for a new snapshot."""
+        stream = self.stream or sys.stderr
+        fraction = progress.fraction
+        if fraction is None:
+            bar, percent = "?" * self.width, "   ?"
+        else:
+            filled = round(self.width * min(fraction, 1.0))
+            bar = "#" * filled + "." * (self.width - filled)
+            percent = f"{100.0 * fraction:5.1f}%"
+        chunks = f"{progress.chunk}/{progress.chunks or '?'}"
+        stream.write(
+            f"\r{self.label}{' ' if self.label else ''}[{bar}] {percent} "
+            f"{progress.completed}/{progress.total or '?'} "
+            f"{progress.rate:,.0f} pts/s ETA {_clock(progress.eta)} chunk {chunks}",
+        )
+        if progress.total is not None and progress.completed >= progress.total:
+            stream.write("\n")
+        stream.flush()
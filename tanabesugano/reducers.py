@@ -0,0 +1,340 @@
+"""On-the-fly aggregation of parameter sweeps.
+
+A sweep is solved chunk by chunk and every chunk is handed to a set of
+reducers, which keep only their aggregates. The memory of a reduction is
+therefore bounded by the chunk size and the size of the aggregates, not by the
+number of points:
+
+- `Envelope`: minimum and maximum of every state over one parameter
+- `GroundStateMap`: ground-state term at every (Dq, B) pair
+- `Histogram`: histogram of the excitation energies
+
+Custom reducers subclass `Reducer` and implement `update` and `result`.
+"""
+
+from __future__ import annotations
+
+from abc import ABC
+from abc import abstractmethod
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from tanabesugano.batch import ELECTRON_CONFIG_SOLVERS
+from tanabesugano.batch import solve_batch
+from tanabesugano.progress import ProgressTracker
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+
+    from numpy.typing import DTypeLike
+
+    from tanabesugano.matrices import Float64Array
+    from tanabesugano.progress import ProgressCallback
+
+
+PARAMETERS = ("Dq", "B", "C")
+
+
+def _merge_groups(
+    keys: Float64Array,
+    values: Float64Array,
+    ufunc: np.ufunc,
+    fill: float,
+) -> tuple[Float64Array, Float64Array]:
+    """Reduce the rows of `values` that share the same row of `keys`."""
+    unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+    reduced = np.full((unique.shape[0], *values.shape[1:]), fill, dtype=values.dtype)
+    ufunc.at(reduced, inverse.ravel(), values)
+    return unique, reduced
+
+
+class Reducer(ABC):
+    """Base class of the reducers applied chunk by chunk during a sweep."""
+
+    def bind(self, d_count: int, columns: list[str]) -> None:
+        """Prepare the reducer for a sweep.
+
+        Parameters
+        ----------
+        d_count : int
+            Electron configuration (d2-d8) of the sweep
+        columns : list[str]
+            Names of the energy columns, as produced by `split_states`
+
+        """
+        self.d_count = d_count
+        self.columns = columns
+
+    @abstractmethod
+    def update(self, points: Float64Array, values: Float64Array) -> None:
+        """Add a chunk of the sweep.
+
+        Parameters
+        ----------
+        points : Float64Array
+            Parameter sets of shape `(n, 3)` with the columns Dq, B and C
+        values : Float64Array
+            Energies of shape `(n, k)` relative to the ground state
+
+        """
+
+    @abstractmethod
+    def result(self) -> dict:
+        """Return the aggregates of all chunks."""
+
+
+class Envelope(Reducer):
+    """Minimum and maximum of every state over one parameter.
+
+    The other two parameters define the groups, e.g. the envelope over B holds
+    one minimum and one maximum per state for every (Dq, C) pair.
+    """
+
+    def __init__(self, over: str = "B") -> None:
+        """Initialize the envelope.
+
+        Parameters
+        ----------
+        over : str, optional
+            Parameter to reduce, one of "Dq", "B" and "C", by default "B"
+
+        """
+        if over not in PARAMETERS:
+            msg = f"Unknown parameter `{over}`, use one of {PARAMETERS}!"
+            raise ValueError(msg)
+        self.over = over
+        self.keys = [name for name in PARAMETERS if name != over]
+        self._points = np.empty((0, 2))
+        self._low = np.empty((0, 0))
+        self._high = np.empty((0, 0))
+
+    def update(self, points: Float64Array, values: Float64Array) -> None:
+        """Merge the minima and maxima of a chunk."""
+        keys = np.concatenate(
+            [self._points, np.delete(points, PARAMETERS.index(self.over), axis=1)],
+        )
+        if self._low.size == 0:
+            self._low = self._high = np.empty((0, values.shape[1]), values.dtype)
+        self._points, self._low = _merge_groups(
+            keys,
+            np.concatenate([self._low, values]),
+            np.minimum,
+            np.inf,
+        )
+        _, self._high = _merge_groups(
+            keys,
+            np.concatenate([self._high, values]),
+            np.maximum,
+            -np.inf,
+        )
+
+    def result(self) -> dict:
+        """Return the envelope.
+
+        Returns
+        -------
+        dict
+            `points` of shape `(m, 2)` with the values of `keys`, `min` and
+            `max` of shape `(m, k)`, and the names of the `columns`.
+
+        """
+        return {
+            "keys": self.keys,
+            "points": self._points,
+            "min": self._low,
+            "max": self._high,
+            "columns": self.columns,
+        }
+
+
+class GroundStateMap(Reducer):
+    """Ground-state term of every (Dq, B) pair.
+
+    The ground state is the lowest level among the possible ground terms of the
+    configuration (e.g. `5_T_2` and `1_A_1` for d6). If several points share a
+    pair, e.g. for different C, the most frequent ground term is reported.
+    """
+
+    def bind(self, d_count: int, columns: list[str]) -> None:
+        """Locate the columns of the possible ground terms."""
+        super().bind(d_count, columns)
+        self.terms = ELECTRON_CONFIG_SOLVERS[d_count].ground_terms
+        names = [f"{term}_0" if f"{term}_0" in columns else term for term in self.terms]
+        missing = [name for name in names if name not in columns]
+        if missing:
+            msg = f"The ground-state map needs the states {missing} of d{d_count}!"
+            raise ValueError(msg)
+        self._index = [columns.index(name) for name in names]
+        self._points = np.empty((0, 2))
+        self._counts = np.empty((0, len(self.terms)), dtype=np.int64)
+
+    def update(self, points: Float64Array, values: Float64Array) -> None:
+        """Count the ground term of every point of a chunk."""
+        ground = np.argmin(values[:, self._index], axis=1)
+        counts = np.zeros((ground.size, len(self.terms)), dtype=np.int64)
+        counts[np.arange(ground.size), ground] = 1
+        self._points, self._counts = _merge_groups(
+            np.concatenate([self._points, points[:, :2]]),
+            np.concatenate([self._counts, counts]),
+            np.add,
+            0,
+        )
+
+    def result(self) -> dict:
+        """Return the ground-state map.
+
+        Returns
+        -------
+        dict
+            `points` of shape `(m, 2)` with Dq and B, the `ground` term of every
+            pair, the possible ground `terms` and their `counts` of shape
+            `(m, len(terms))`.
+
+        """
+        return {
+            "points": self._points,
+            "ground": [self.terms[i] for i in np.argmax(self._counts, axis=1)],
+            "terms": self.terms,
+            "counts": self._counts,
+        }
+
+
+class Histogram(Reducer):
+    """Histogram of the excitation energies, i.e. all levels above the ground."""
+
+    def __init__(
+        self,
+        bins: int = 100,
+        energy_range: tuple[float, float] = (0.0, 50000.0),
+        per_state: bool = False,
+    ) -> None:
+        """Initialize the histogram with fixed bin edges.
+
+        Parameters
+        ----------
+        bins : int, optional
+            Number of bins, by default 100
+        energy_range : tuple[float, float], optional
+            Lower and upper edge in wavenumbers, by default (0.0, 50000.0)
+        per_state : bool, optional
+            Count every column separately, by default False
+
+        """
+        self.edges = np.linspace(*energy_range, bins + 1)
+        self.per_state = per_state
+
+    def bind(self, d_count: int, columns: list[str]) -> None:
+        """Allocate the counts of the columns."""
+        super().bind(d_count, columns)
+        rows = len(columns) if self.per_state else 1
+        self._counts = np.zeros((rows, self.edges.size - 1), dtype=np.int64)
+
+    def update(
+        self,
+        points: Float64Array,  # noqa: ARG002
+        values: Float64Array,
+    ) -> None:
+        """Count the excitation energies of a chunk."""
+        columns = values.T if self.per_state else values.reshape(1, -1)
+        for i, column in enumerate(columns):
+            self._counts[i] += np.histogram(column[column > 0.0], bins=self.edges)[0]
+
+    def result(self) -> dict:
+        """Return the histogram.
+
+        Returns
+        -------
+        dict
+            Bin `edges` and `counts`, of shape `(bins,)` or `(k, bins)` per state.
+
+        """
+        counts = self._counts if self.per_state else self._counts[0]
+        return {"edges": self.edges, "counts": counts, "columns": self.columns}
+
+
+def product_chunks(
+    Dq: Float64Array,
+    B: Float64Array,
+    C: Float64Array,
+    chunksize: int = 4096,
+) -> Iterator[Float64Array]:
+    """Yield the Cartesian product of three axes chunk by chunk.
+
+    Parameters
+    ----------
+    Dq : Float64Array
+        Values of the Oh crystal field splitting
+    B : Float64Array
+        Values of the Racah B parameter
+    C : Float64Array
+        Values of the Racah C parameter
+    chunksize : int, optional
+        Number of points per chunk, by default 4096
+
+    Yields
+    ------
+    Float64Array
+        Parameter sets of shape `(n, 3)` in the order of `np.meshgrid(...,
+        indexing="ij")`, without materializing the full product.
+
+    """
+    axes = [np.ravel(Dq), np.ravel(B), np.ravel(C)]
+    shape = tuple(axis.size for axis in axes)
+    size = int(np.prod(shape))
+    for start in range(0, size, chunksize):
+        index = np.unravel_index(np.arange(start, min(start + chunksize, size)), shape)
+        yield np.column_stack([axis[i] for axis, i in zip(axes, index, strict=True)])
+
+
+def reduce_sweep(
+    d_count: int,
+    chunks: Iterable[Float64Array],
+    reducers: Iterable[Reducer],
+    dtype: DTypeLike = np.float64,
+    *,
+    progress: ProgressCallback | None = None,
+    total: int | None = None,
+    **selection: object,
+) -> list[dict]:
+    """Solve a sweep chunk by chunk and apply the reducers to every chunk.
+
+    Parameters
+    ----------
+    d_count : int
+        Electron configuration (d2-d8)
+    chunks : Iterable[Float64Array]
+        Parameter sets of shape `(n, 3)` per chunk, e.g. of `product_chunks`
+    reducers : Iterable[Reducer]
+        Reducers that aggregate the energies
+    dtype : DTypeLike, optional
+        Precision of the energies, by default np.float64
+    progress : ProgressCallback | None, optional
+        Called with a `Progress` after every chunk, by default None
+    total : int | None, optional
+        Number of points of all chunks for the progress, by default unknown
+    **selection : object
+        `terms`, `spin` and `lowest_k` filters passed on to `solve_batch`
+
+    Returns
+    -------
+    list[dict]
+        The `result()` of every reducer.
+
+    """
+    from tanabesugano.reusable import ReusableSolver  # noqa: PLC0415
+
+    reducers = list(reducers)
+    columns = ReusableSolver(d_count, **selection).columns
+    for reducer in reducers:
+        reducer.bind(d_count, columns)
+    tracker = ProgressTracker(progress, total=total)
+    for points in chunks:
+        states = solve_batch(d_count, *points.T, dtype=dtype, **selection)
+        values = np.concatenate(list(states.values()), axis=1)
+        for reducer in reducers:
+            reducer.update(points, values)
+        tracker.advance(len(points))
+    return [reducer.result() for reducer in reducers]
@@ -0,0 +1,190 @@
+"""Headless rendering of many diagrams with matplotlib.
+
+The figures are created with the object-oriented API on the Agg canvas and
+never touch the global `pyplot` state, so that rendering does not block and can
+run in parallel worker processes. All states of a diagram are drawn as a single
+`LineCollection` instead of one artist per line.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+from tanabesugano.cmd import CMDmain
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Sequence
+
+    from matplotlib.axes import Axes
+
+    from tanabesugano.atlas import AtlasEntry
+    from tanabesugano.matrices import Float64Array
+
+
+RENDER_FORMATS = ("png", "svg", "pdf")
+
+# Title, y-label and x-label of the two diagram types
+_LABELS = {
+    "TS": ("Tanabe-Sugano-Diagram", "$E/B$", r"$\Delta/B$"),
+    "DD": (
+        "DD excitations -Diagram",
+        r"$dd-state-energy\,(1/cm)$",
+        r"$10Dq\,(1/cm)$",
+    ),
+}
+
+
+def draw_states(ax: Axes, x: Float64Array, Y: Float64Array) -> LineCollection:
+    """Draw all states of a diagram as one line collection.
+
+    Args:
+        ax (Axes): Axes to draw on.
+        x (Float64Array): 1-dimensional x-axis of length `n`.
+        Y (Float64Array): 2-dimensional array of shape `(n, states)`.
+
+    Returns:
+        LineCollection: The added collection.
+
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    segments = np.stack(
+        [np.broadcast_to(np.asarray(x, dtype=np.float64), Y.T.shape), Y.T],
+        axis=-1,
+    )
+    # Same color cycle as the per-line artists of `CMDmain.plot`
+    colors = [f"C{i % 10}" for i in range(Y.shape[1])]
+    collection = LineCollection(segments, colors=colors, linestyles="--")
+    ax.add_collection(collection)
+    ax.autoscale_view()
+    return collection
+
+
+def diagram_figure(
+    tmm: CMDmain,
+    kind: str = "TS",
+    figsize: tuple[float, float] = (6.4, 4.8),
+) -> Figure:
+    """Create the figure of a calculated diagram without using `pyplot`.
+
+    Args:
+        tmm (CMDmain): Calculated diagram.
+        kind (str): Diagram type, either "TS" or "DD". Defaults to "TS".
+        figsize (tuple[float, float]): Figure size in inches.
+
+    Returns:
+        Figure: Figure with an Agg canvas attached.
+
+    """
+    frame = tmm.ts_frame() if kind == "TS" else tmm.dd_frame()
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+    draw_states(ax, frame.iloc[:, 0].to_numpy(), frame.iloc[:, 1:].to_numpy())
+    title, ylabel, xlabel = _LABELS[kind]
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
+    ax.set_xlabel(xlabel)
+    return figure
+
+
+def render(
+    tmm: CMDmain,
+    directory: str | Path = ".",
+    formats: Sequence[str] = ("png",),
+    dpi: float = 100.0,
+) -> list[Path]:
+    """Save the TS- and DD-figure of a calculated diagram.
+
+    Args:
+        tmm (CMDmain): Calculated diagram.
+        directory (str | Path): Output directory. Defaults to the current one.
+        formats (Sequence[str]): File formats out of "png", "svg" and "pdf".
+        dpi (float): Resolution of raster formats. Defaults to 100.
+
+    Returns:
+        list[Path]: Paths of the written files.
+
+    """
+    unknown = set(formats) - set(RENDER_FORMATS)
+    if unknown:
+        msg = f"Unsupported formats {sorted(unknown)}, use {RENDER_FORMATS}!"
+        raise ValueError(msg)
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for kind, title in (("TS", tmm.title_TS), ("DD", tmm.title_DD)):
+        figure = diagram_figure(tmm, kind=kind)
+        for fmt in formats:
+            path = directory / f"{title}.{fmt}"
+            figure.savefig(path, dpi=dpi)
+            paths.append(path)
+    return paths
+
+
+def _render_entry(
+    entry: AtlasEntry,
+    directory: Path,
+    formats: Sequence[str],
+    dpi: float,
+) -> list[Path]:
+    """Compute and render a single diagram inside a worker process."""
+    tmm = CMDmain(
+        Dq=entry.Dq,
+        B=entry.B,
+        C=entry.C,
+        nroots=entry.nroots,
+        d_count=entry.d_count,
+    )
+    tmm.calculation()
+    return render(tmm, directory / f"d{entry.d_count}", formats=formats, dpi=dpi)
+
+
+def render_many(
+    entries: Iterable[AtlasEntry],
+    directory: str | Path = ".",
+    *,
+    formats: Sequence[str] = ("png",),
+    dpi: float = 100.0,
+    processes: int | None = None,
+    chunksize: int = 8,
+) -> list[Path]:
+    """Compute and render many diagrams across a process pool.
+
+    Args:
+        entries (Iterable[AtlasEntry]): Parameters of the diagrams.
+        directory (str | Path): Root output directory, the figures are written to
+            `directory/d<n>/`. Defaults to the current one.
+        formats (Sequence[str]): File formats out of "png", "svg" and "pdf".
+        dpi (float): Resolution of raster formats. Defaults to 100.
+        processes (int | None): Number of worker processes, by default the
+            number of CPUs.
+        chunksize (int): Number of diagrams sent to a worker at once.
+
+    Returns:
+        list[Path]: Paths of all written files in the order of `entries`.
+
+    """
+    worker = partial(
+        _render_entry,
+        directory=Path(directory),
+        formats=tuple(formats),
+        dpi=dpi,
+    )
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return [
+            path
+            for paths in executor.map(worker, entries, chunksize=chunksize)
+            for path in paths
+        ]
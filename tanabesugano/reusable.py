@@ -0,0 +1,385 @@
+"""Reusable solvers with preallocated workspaces for point-by-point sweeps.
+
+Every matrix element of the ligand field Hamiltonian is linear in `Dq`, `B` and
+`C`, so each block can be written as `Dq * A + B * B' + C * C'`. A
+`ReusableSolver` derives these coefficient matrices once per configuration and
+afterwards only refills its preallocated block buffers for new parameters. The
+energies of a point are written into a flat row in the column order of
+`split_states`, referenced to the ground state like `solver()`.
+
+The blocks are at most 10 x 10, where the cost of a diagonalization is mostly
+the overhead of the call. All blocks of a point are therefore zero-padded to a
+common size and diagonalized as one stack; the padding levels are placed above
+every level of the blocks and dropped afterwards.
+
+The same coefficients allow to build and diagonalize only the blocks of
+selected states (`solve_selected`), which is much cheaper when only a few
+bands are needed, e.g. in fitting loops.
+"""
+
+from __future__ import annotations
+
+from functools import cache
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from numpy.linalg import eigvalsh
+
+from tanabesugano.backends import get_backend
+from tanabesugano.batch import ELECTRON_CONFIG_SOLVERS
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from numpy.typing import DTypeLike
+
+    from tanabesugano.backends import Backend
+    from tanabesugano.matrices import Float64Array
+
+
+# Generic parameter set used to assign the recorded blocks to the states
+_PROBE = (1234.5678, 876.54321, 3987.6543)
+# Relative tolerance for the assignment
+_MATCH_TOLERANCE = 1e-9
+
+
+@cache
+def block_layout(d_count: int) -> tuple[tuple[str, Float64Array], ...]:
+    """Return the linear coefficients of every state of a configuration.
+
+    The solver of the configuration is run once for a generic parameter set
+    and for the three unit parameter sets while all blocks are recorded. The
+    blocks are then assigned to the states by their eigenvalues.
+
+    Args:
+        d_count (int): Electron configuration (d2-d8).
+
+    Raises:
+        ValueError: If `d_count` is not a valid electron configuration.
+
+    Returns:
+        tuple[tuple[str, Float64Array], ...]: Term symbol and coefficients of
+            shape `(3, k, k)` for `Dq`, `B` and `C` of every state in the order
+            of `solver()`.
+
+    """
+    solver_class = ELECTRON_CONFIG_SOLVERS.get(d_count)
+    if solver_class is None:
+        msg = "The number of unpaired electrons should be between 2 and 8."
+        raise ValueError(msg)
+
+    Dq, B, C = np.column_stack([_PROBE, np.eye(3)])
+    instance = solver_class(Dq=Dq, B=B, C=C)
+    instance.trace = []
+    states = {key: value[0] for key, value in instance.solver().items()}
+    blocks = [(eigvalsh(block[0]), block[1:]) for block in instance.trace]
+
+    # Energy of the ground state from the multi-level states, which can only
+    # coincide with their own block
+    scale = _MATCH_TOLERANCE * max(np.abs(levels).max() for levels, _ in blocks)
+    ground = next(
+        np.mean(levels - value)
+        for value in states.values()
+        if value.size > 1
+        for levels, _ in blocks
+        if levels.size == value.size and np.ptp(levels - value) <= scale
+    )
+    layout = []
+    for key, value in states.items():
+        coefficients = next(
+            coefficients
+            for levels, coefficients in blocks
+            if levels.size == value.size
+            and np.allclose(levels - ground, value, rtol=0.0, atol=scale)
+        ).copy()
+        # The cached layout is shared by all solvers and threads
+        coefficients.setflags(write=False)
+        layout.append((key, coefficients))
+    return tuple(layout)
+
+
+def select_terms(
+    d_count: int,
+    terms: Iterable[str] | None = None,
+    spin: int | Iterable[int] | None = None,
+) -> list[str]:
+    """Return the states of a configuration that pass the filters.
+
+    Args:
+        d_count (int): Electron configuration (d2-d8).
+        terms (Iterable[str] | None): Term symbols to keep, e.g. `["4_T_2"]`.
+            Defaults to all states.
+        spin (int | Iterable[int] | None): Spin multiplicities to keep, e.g. `4`
+            for the quartets. Defaults to all multiplicities.
+
+    Raises:
+        ValueError: If a term symbol does not exist for the configuration or if
+            no state is left.
+
+    Returns:
+        list[str]: Term symbols in the order of `solver()`.
+
+    """
+    keys = [key for key, _ in block_layout(d_count)]
+    if terms is not None:
+        terms = list(terms)
+        unknown = sorted(set(terms) - set(keys))
+        if unknown:
+            msg = f"Unknown terms {unknown} for d{d_count}, use any of {keys}!"
+            raise ValueError(msg)
+        keys = [key for key in keys if key in terms]
+    if spin is not None:
+        spins = {spin} if isinstance(spin, int) else set(spin)
+        keys = [key for key in keys if int(key.split("_")[0]) in spins]
+    if not keys:
+        msg = f"No states of d{d_count} are left after filtering!"
+        raise ValueError(msg)
+    return keys
+
+
+def solve_selected(
+    d_count: int,
+    Dq: float | Float64Array,
+    B: float | Float64Array,
+    C: float | Float64Array,
+    *,
+    terms: Iterable[str] | None = None,
+    spin: int | Iterable[int] | None = None,
+    lowest_k: int | None = None,
+    dtype: DTypeLike = np.float64,
+    backend: str | Backend | None = None,
+) -> dict[str, Float64Array]:
+    """Solve only the requested states for many parameter sets.
+
+    Only the blocks of the requested states and of the possible ground states
+    are built and diagonalized; the energies are referenced to the ground state
+    like `solver()`. Backends that support subsets only compute the lowest
+    `lowest_k` levels, and the lowest level of the ground states that are not
+    requested.
+
+    Args:
+        d_count (int): Electron configuration (d2-d8).
+        Dq (float | Float64Array): Oh crystal field splitting, scalar or array.
+        B (float | Float64Array): Racah B parameter, scalar or array.
+        C (float | Float64Array): Racah C parameter, scalar or array.
+        terms (Iterable[str] | None): Term symbols to keep.
+        spin (int | Iterable[int] | None): Spin multiplicities to keep.
+        lowest_k (int | None): Number of lowest levels to keep per state.
+        dtype (DTypeLike): Precision of the results. Defaults to float64.
+        backend (str | Backend | None): Compute backend, by default the one of
+            `get_backend()`.
+
+    Returns:
+        dict[str, Float64Array]: Requested states with arrays of shape
+            `(*shape, k)` like `solve_batch`.
+
+    """
+    keys = select_terms(d_count, terms=terms, spin=spin)
+    ground_terms = ELECTRON_CONFIG_SOLVERS[d_count].ground_terms
+    layout = dict(block_layout(d_count))
+    parameters = np.stack(np.broadcast_arrays(Dq, B, C), axis=-1).astype(np.float64)
+    backend = get_backend(backend)
+
+    levels = {}
+    for key in dict.fromkeys([*keys, *ground_terms]):
+        matrix = backend.assemble(parameters, layout[key])
+        if matrix.shape[-1] == 1:
+            levels[key] = matrix[..., 0]
+            continue
+        levels[key] = backend.eigvalsh(matrix, lowest_k if key in keys else 1)
+    ground = np.min([levels[key][..., :1] for key in ground_terms], axis=0)
+    return {
+        key: (levels[key][..., :lowest_k] - ground).astype(dtype, copy=False)
+        for key in keys
+    }
+
+
+class ReusableSolver:
+    """Solver of one configuration that is updated in place for every point.
+
+    A solver owns mutable buffers and must not be shared between threads;
+    create one solver per thread instead. With `terms`, `spin` or `lowest_k` only
+    the requested states (and the possible ground states) are solved.
+
+    Examples:
+        >>> solver = ReusableSolver(6)
+        >>> row = np.empty(solver.size)
+        >>> for dq in (1000.0, 2000.0):
+        ...     solver.update(dq, 1065.0, 5120.0)
+        ...     _ = solver.solve(out=row)
+
+    """
+
+    def __init__(
+        self,
+        d_count: int,
+        dtype: DTypeLike = np.float64,
+        *,
+        terms: Iterable[str] | None = None,
+        spin: int | Iterable[int] | None = None,
+        lowest_k: int | None = None,
+        backend: str | Backend | None = None,
+    ) -> None:
+        """Initialize the workspaces of a configuration.
+
+        Args:
+            d_count (int): Electron configuration (d2-d8).
+            dtype (DTypeLike): Precision of the returned rows. The blocks are
+                always solved in double precision. Defaults to float64.
+            terms (Iterable[str] | None): Term symbols to keep.
+            spin (int | Iterable[int] | None): Spin multiplicities to keep.
+            lowest_k (int | None): Number of lowest levels to keep per state.
+            backend (str | Backend | None): Compute backend of the padded
+                stack, by default the one of `get_backend()`.
+
+        """
+        self.d_count = d_count
+        self.dtype = np.dtype(dtype)
+        self.backend = get_backend(backend)
+        self.keys = select_terms(d_count, terms=terms, spin=spin)
+        self.parameters = np.zeros(3)
+
+        # Requested states first, followed by the remaining possible ground states
+        ground_terms = ELECTRON_CONFIG_SOLVERS[d_count].ground_terms
+        coefficients = dict(block_layout(d_count))
+        layout = [
+            (key, coefficients[key])
+            for key in dict.fromkeys([*self.keys, *ground_terms])
+        ]
+        sizes = [c.shape[-1] for _, c in layout]
+        starts = np.cumsum([0, *sizes[:-1]])
+        parts = {
+            key: slice(start, start + size)
+            for (key, _), start, size in zip(layout, starts, sizes, strict=True)
+        }
+
+        # All single levels are evaluated with one product of the coefficients
+        self._singles = (
+            np.array([c.ravel() for _, c in layout if c.shape[-1] == 1])
+            .reshape(-1, 3)
+            .T.copy()
+        )
+        self._single_index = starts[[c.shape[-1] == 1 for _, c in layout]]
+        # One zero-padded stack of all blocks with more than one level
+        blocks = [(key, c) for key, c in layout if c.shape[-1] > 1]
+        width = max((c.shape[-1] for _, c in blocks), default=0)
+        stack = np.zeros((3, len(blocks), width, width))
+        padding = np.ones((len(blocks), width), dtype=bool)
+        for number, (_, c) in enumerate(blocks):
+            stack[:, number, : c.shape[-1], : c.shape[-1]] = c
+            padding[number, : c.shape[-1]] = False
+        self._stack = stack.reshape(3, -1)
+        self._matrices = np.empty((len(blocks), width, width))
+        # Flat positions of the padding diagonal, filled above all levels
+        number, level = np.nonzero(padding)
+        self._padding = (number * width + level) * width + level
+        self._norms = np.abs(stack).sum(axis=-1).max(axis=(1, 2), initial=0.0)
+        self._levels = np.flatnonzero(~padding)
+        self._block_index = np.concatenate(
+            [np.arange(parts[key].start, parts[key].stop) for key, _ in blocks]
+            or [np.empty(0, dtype=int)],
+        )
+        self._ground_index = np.array([parts[key].start for key in ground_terms])
+        self._row = np.empty(sum(sizes))
+        self._single_row = np.empty(self._single_index.size)
+        # Scratch buffers and views, so that `solve` allocates no arrays but the
+        # eigenvalues; the padding value is `[|Dq|, |B|, |C|, 1] @ _weights`
+        self._flat = self._matrices.reshape(-1)
+        self._absolute = np.ones(4)
+        self._magnitudes = self._absolute[:3]
+        self._weights = np.append(2.0 * self._norms, 1.0)
+        self._bound = np.empty(())
+        self._block_row = np.empty(self._levels.size)
+        self._ground = np.empty(self._ground_index.size)
+        self._ground_levels = [
+            self._row[i : i + 1].reshape(()) for i in self._ground_index
+        ]
+        self._lowest = np.empty((), dtype=np.intp)
+        self._shift = np.empty(())
+
+        # Levels of the requested states within the internal row
+        kept = [
+            np.arange(parts[key].start, parts[key].stop)[:lowest_k] for key in self.keys
+        ]
+        self._output = np.concatenate(kept)
+        if np.array_equal(self._output, np.arange(self._row.size)):
+            self._output = None
+        self.size = sum(index.size for index in kept)
+        self._selected = np.empty(self.size)
+        ends = np.cumsum([index.size for index in kept])
+        self._slices = [
+            slice(end - index.size, end) for end, index in zip(ends, kept, strict=True)
+        ]
+
+    @property
+    def columns(self) -> list[str]:
+        """Column names of a row, as produced by `split_states`."""
+        columns = []
+        for key, part in zip(self.keys, self._slices, strict=True):
+            size = part.stop - part.start
+            columns.extend([f"{key}_{i}" for i in range(size)] if size > 1 else [key])
+        return columns
+
+    def update(self, Dq: float, B: float, C: float) -> None:
+        """Set new parameters without allocating.
+
+        Args:
+            Dq (float): Crystal field splitting in wavenumbers (cm-1).
+            B (float): Racah parameter B in wavenumbers (cm-1).
+            C (float): Racah parameter C in wavenumbers (cm-1).
+
+        """
+        self.parameters[0] = Dq
+        self.parameters[1] = B
+        self.parameters[2] = C
+
+    def solve(self, out: np.ndarray | None = None) -> np.ndarray:
+        """Solve the current parameters into a flat row.
+
+        Apart from `out`, if omitted, the only allocation is the small array of
+        eigenvalues returned by the backend: `numpy.linalg.eigvalsh` has no
+        output argument. All other steps work in preallocated buffers.
+
+        Args:
+            out (np.ndarray | None): Row of length `size` to write into, for
+                example a row of a preallocated result array. A new row is
+                allocated if omitted.
+
+        Returns:
+            np.ndarray: `out`, with the energies relative to the ground state.
+
+        """
+        if out is None:
+            out = np.empty(self.size, dtype=self.dtype)
+        row = self._row
+        np.dot(self.parameters, self._singles, out=self._single_row)
+        row.put(self._single_index, self._single_row)
+        if self._levels.size:
+            np.dot(self.parameters, self._stack, out=self._flat)
+            # Upper bound of all levels of the blocks (Gershgorin)
+            np.abs(self.parameters, out=self._magnitudes)
+            np.dot(self._absolute, self._weights, out=self._bound)
+            self._flat.put(self._padding, self._bound)
+            values = self.backend.eigvalsh(self._matrices)
+            # "clip" skips the buffered copy of `take` with bounds checks
+            values.take(self._levels, out=self._block_row, mode="clip")
+            row.put(self._block_index, self._block_row)
+        # `min` allocates a reduction iterator, `argmin` into a buffer does not
+        row.take(self._ground_index, out=self._ground, mode="clip")
+        self._ground.argmin(out=self._lowest)
+        np.copyto(self._shift, self._ground_levels[self._lowest])
+        np.subtract(row, self._shift, out=row)
+        if self._output is None:
+            np.copyto(out, row, casting="unsafe")
+        else:
+            row.take(self._output, out=self._selected, mode="clip")
+            np.copyto(out, self._selected, casting="unsafe")
+        return out
+
+    def states(self, row: np.ndarray) -> dict[str, np.ndarray]:
+        """Return the states of a row as views in the format of `solver()`."""
+        return {
+            key: row[part] for key, part in zip(self.keys, self._slices, strict=True)
+        }
@@ -0,0 +1,461 @@
+"""Local asyncio HTTP service for point solves, diagrams and cuts.
+
+The service only depends on the standard library. Concurrent requests for the
+same electron configuration that arrive within a short time window are
+coalesced into a single vectorized diagonalization, which runs in a thread pool
+(NumPy releases the GIL inside LAPACK) and is then split up again per request.
+
+Endpoints (GET with query parameters or POST with a JSON object):
+
+- `/solve?d=6&Dq=2000&B=1065&C=5120`: all states of a single point
+- `/diagram?d=6&Dq=4000&B=1065&C=5120&nroots=100`: DD energies over `0..Dq`
+- `/cut?d=6&cut=24000&B=1065&C=5120`: term symbol table at `10Dq = cut`
+- `/health`: status and coalescing statistics
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qsl
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from tanabesugano.batch import cut_table
+from tanabesugano.batch import read_d_count
+from tanabesugano.batch import read_parameter
+from tanabesugano.batch import solve_batch
+from tanabesugano.batch import split_states
+
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+    from collections.abc import Callable
+
+    from tanabesugano.matrices import Float64Array
+
+
+# Upper limit of a request body in bytes
+MAX_BODY_SIZE = 1 << 20
+
+
+class ServiceError(Exception):
+    """Error that is reported to the client with an HTTP status code."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        """Initialize the error with an HTTP status and a message."""
+        super().__init__(message)
+        self.status = status
+
+
+class Coalescer:
+    """Micro-batch concurrent solves of one electron configuration.
+
+    Requests are collected until `window` seconds have passed since the first
+    pending one, or until `max_batch` points are pending, and are then solved
+    in a single vectorized call.
+    """
+
+    def __init__(
+        self,
+        d_count: int,
+        executor: ThreadPoolExecutor,
+        window: float = 0.002,
+        max_batch: int = 4096,
+    ) -> None:
+        """Initialize the coalescer.
+
+        Args:
+            d_count (int): Electron configuration (d2-d8).
+            executor (ThreadPoolExecutor): Executor for the diagonalizations.
+            window (float): Collection window in seconds. Defaults to 2 ms.
+            max_batch (int): Number of points that triggers an immediate solve.
+
+        """
+        self.d_count = d_count
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.points = 0
+        self._pending: list[tuple[Float64Array, ...]] = []
+        self._futures: list[asyncio.Future] = []
+        self._size = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def solve(
+        self,
+        Dq: float | Float64Array,
+        B: float | Float64Array,
+        C: float | Float64Array,
+    ) -> dict[str, Float64Array]:
+        """Solve one or more points together with other pending requests.
+
+        Raises:
+            ValueError: If a parameter is not finite.
+
+        Returns:
+            dict[str, Float64Array]: States of shape `(n, k)` for the `n` points
+                of this request.
+
+        """
+        parameters = np.broadcast_arrays(
+            *(
+                np.atleast_1d(np.asarray(value, dtype=np.float64))
+                for value in (Dq, B, C)
+            ),
+        )
+        # A non-finite point would fail the whole coalesced batch
+        if not all(np.all(np.isfinite(value)) for value in parameters):
+            msg = "The parameters have to be finite numbers!"
+            raise ValueError(msg)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(tuple(value.ravel() for value in parameters))
+        self._futures.append(future)
+        self._size += parameters[0].size
+        if self._size >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Hand all pending requests over to a single solve."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, futures = self._pending, self._futures
+        self._pending, self._futures, self._size = [], [], 0
+        if not pending:
+            return
+        task = asyncio.ensure_future(self._run(pending, futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self,
+        pending: list[tuple[Float64Array, ...]],
+        futures: list[asyncio.Future],
+    ) -> None:
+        """Solve the concatenated points and distribute the results."""
+        Dq, B, C = (np.concatenate(values) for values in zip(*pending, strict=True))
+        loop = asyncio.get_running_loop()
+        try:
+            states = await loop.run_in_executor(
+                self.executor,
+                solve_batch,
+                self.d_count,
+                Dq,
+                B,
+                C,
+            )
+        except Exception:  # noqa: BLE001
+            # Solve every request on its own, so that a failing request only
+            # fails its own future
+            await self._run_separately(pending, futures)
+            return
+
+        self.batches += 1
+        self.points += Dq.size
+        start = 0
+        for (dq, *_), future in zip(pending, futures, strict=True):
+            stop = start + dq.size
+            if not future.done():
+                future.set_result(
+                    {key: value[start:stop] for key, value in states.items()},
+                )
+            start = stop
+
+    async def _run_separately(
+        self,
+        pending: list[tuple[Float64Array, ...]],
+        futures: list[asyncio.Future],
+    ) -> None:
+        """Solve the requests of a failed batch one by one."""
+        loop = asyncio.get_running_loop()
+        for parameters, future in zip(pending, futures, strict=True):
+            try:
+                states = await loop.run_in_executor(
+                    self.executor,
+                    solve_batch,
+                    self.d_count,
+                    *parameters,
+                )
+            except Exception as exc:  # noqa: BLE001
+                if not future.done():
+                    future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.points += parameters[0].size
+            if not future.done():
+                future.set_result(states)
+
+
+def _parameter(
+    params: dict,
+    name: str,
+    default: float | None = None,
+    *,
+    integer: bool = False,
+) -> float:
+    """Read a numeric request parameter and reject invalid ones as bad request."""
+    try:
+        return read_parameter(params, name, default, integer=integer)
+    except ValueError as exc:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, str(exc)) from None
+
+
+def _d_count(params: dict) -> int:
+    """Read and validate the electron configuration of a request."""
+    try:
+        return read_d_count(params)
+    except ValueError as exc:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, str(exc)) from None
+
+
+class SolverService:
+    """Local HTTP service with request coalescing into batched solves."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        *,
+        window: float = 0.002,
+        max_batch: int = 4096,
+        max_concurrency: int = 4,
+        max_pending: int = 1024,
+        timeout: float = 30.0,
+    ) -> None:
+        """Initialize the service.
+
+        Args:
+            host (str): Interface to bind to. Defaults to localhost only.
+            port (int): Port to bind to, `0` picks a free one. Defaults to 8000.
+            window (float): Coalescing window in seconds. Defaults to 2 ms.
+            max_batch (int): Number of points that triggers an immediate solve.
+            max_concurrency (int): Number of batched solves that run at the same
+                time. Defaults to 4.
+            max_pending (int): Number of requests in flight before new ones are
+                rejected with `503 Service Unavailable`. Defaults to 1024.
+            timeout (float): Timeout for reading a request in seconds.
+
+        """
+        self.host = host
+        self.port = port
+        self.window = window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.coalescers: dict[int, Coalescer] = {}
+        self.server: asyncio.AbstractServer | None = None
+        self._active = 0
+        self._routes: dict[str, Callable[[dict], Awaitable[dict]]] = {
+            "/solve": self.solve,
+            "/diagram": self.diagram,
+            "/cut": self.cut,
+            "/health": self.health,
+        }
+
+    def coalescer(self, d_count: int) -> Coalescer:
+        """Return the coalescer of an electron configuration."""
+        if d_count not in self.coalescers:
+            self.coalescers[d_count] = Coalescer(
+                d_count,
+                self.executor,
+                window=self.window,
+                max_batch=self.max_batch,
+            )
+        return self.coalescers[d_count]
+
+    async def start(self) -> int:
+        """Start listening and return the bound port."""
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self) -> None:
+        """Start the service if needed and serve until cancelled."""
+        if self.server is None:
+            await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop listening and shut down the solver threads."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    async def solve(self, params: dict) -> dict:
+        """Solve all states of a single point."""
+        d_count = _d_count(params)
+        Dq = _parameter(params, "Dq")
+        B = _parameter(params, "B")
+        C = _parameter(params, "C")
+        states = await self.coalescer(d_count).solve(Dq, B, C)
+        return {
+            "d_count": d_count,
+            "Dq": Dq,
+            "B": B,
+            "C": C,
+            "states": {key: value[0].tolist() for key, value in states.items()},
+        }
+
+    async def diagram(self, params: dict) -> dict:
+        """Solve the DD energies of a diagram from `0` to `Dq`."""
+        d_count = _d_count(params)
+        Dq = _parameter(params, "Dq")
+        B = _parameter(params, "B")
+        C = _parameter(params, "C")
+        nroots = int(_parameter(params, "nroots", 100, integer=True))
+        if not 0 < nroots <= self.max_batch:
+            msg = f"`nroots` has to be between 1 and {self.max_batch}!"
+            raise ServiceError(HTTPStatus.BAD_REQUEST, msg)
+        energy = np.linspace(0.0, Dq, nroots)
+        states = await self.coalescer(d_count).solve(energy, B, C)
+        return {
+            "d_count": d_count,
+            "B": B,
+            "C": C,
+            "10Dq": (energy * 10.0).tolist(),
+            "delta_B": (energy / B).tolist(),
+            "states": {
+                key: value.tolist() for key, value in split_states(states).items()
+            },
+        }
+
+    async def cut(self, params: dict) -> dict:
+        """Return the term symbol table at `10Dq = cut`, sorted by energy."""
+        d_count = _d_count(params)
+        cut = _parameter(params, "cut")
+        B = _parameter(params, "B")
+        C = _parameter(params, "C")
+        states = await self.coalescer(d_count).solve(cut / 10.0, B, C)
+        return {
+            "d_count": d_count,
+            "cut": cut,
+            "B": B,
+            "C": C,
+            "states": cut_table(states),
+        }
+
+    async def health(self, _params: dict) -> dict:
+        """Return the status and the coalescing statistics."""
+        return {
+            "status": "ok",
+            "pending": self._active,
+            "batches": {
+                d_count: {"batches": coalescer.batches, "points": coalescer.points}
+                for d_count, coalescer in self.coalescers.items()
+            },
+        }
+
+    async def handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """Handle a single HTTP connection."""
+        status, payload = await self._respond(reader)
+        body = json.dumps(payload).encode()
+        header = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n"
+        )
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            header += "Retry-After: 1\r\n"
+        writer.write(f"{header}\r\n".encode() + body)
+        with contextlib.suppress(ConnectionError):
+            await writer.drain()
+        writer.close()
+        with contextlib.suppress(ConnectionError):
+            await writer.wait_closed()
+
+    async def _respond(self, reader: asyncio.StreamReader) -> tuple[HTTPStatus, dict]:
+        """Read, route and answer a request."""
+        try:
+            method, path, params = await asyncio.wait_for(
+                self._read_request(reader),
+                timeout=self.timeout,
+            )
+            route = self._route(method, path)
+            self._active += 1
+            try:
+                return HTTPStatus.OK, await route(params)
+            finally:
+                self._active -= 1
+        except ServiceError as exc:
+            return exc.status, {"error": str(exc)}
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+            return HTTPStatus.BAD_REQUEST, {"error": "Incomplete request."}
+        except (ValueError, ArithmeticError, np.linalg.LinAlgError) as exc:
+            msg = f"The request cannot be solved: {exc}"
+            return HTTPStatus.UNPROCESSABLE_ENTITY, {"error": msg}
+        except Exception:  # noqa: BLE001
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal error."}
+
+    def _route(self, method: str, path: str) -> Callable[[dict], Awaitable[dict]]:
+        """Return the handler of an endpoint, unless the service is saturated."""
+        route = self._routes.get(path)
+        if route is None:
+            msg = f"Unknown endpoint `{path}`!"
+            raise ServiceError(HTTPStatus.NOT_FOUND, msg)
+        if method not in {"GET", "POST"}:
+            msg = f"Method `{method}` is not allowed!"
+            raise ServiceError(HTTPStatus.METHOD_NOT_ALLOWED, msg)
+        if self._active >= self.max_pending:
+            msg = "Too many pending requests, retry later."
+            raise ServiceError(HTTPStatus.SERVICE_UNAVAILABLE, msg)
+        return route
+
+    async def _read_request(
+        self,
+        reader: asyncio.StreamReader,
+    ) -> tuple[str, str, dict]:
+        """Parse the request line, headers and the optional JSON body."""
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:  # noqa: PLR2004
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Malformed request line.")
+        method, target, _ = request_line
+
+        length = 0
+        while (line := await reader.readline()) not in {b"\r\n", b"\n", b""}:
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                try:
+                    length = int(value)
+                except ValueError:
+                    msg = "Invalid Content-Length."
+                    raise ServiceError(HTTPStatus.BAD_REQUEST, msg) from None
+                if length < 0:
+                    msg = "Negative Content-Length."
+                    raise ServiceError(HTTPStatus.BAD_REQUEST, msg)
+        if length > MAX_BODY_SIZE:
+            raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body too large.")
+
+        url = urlsplit(target)
+        params: dict = dict(parse_qsl(url.query))
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except json.JSONDecodeError:
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "Invalid JSON.") from None
+            if not isinstance(body, dict):
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "Expected a JSON object.")
+            params.update(body)
+        return method, url.path, params
@@ -0,0 +1,223 @@
+"""Vectorized synthesis of d-d absorption spectra.
+
+The transition energies of many parameter sets are accumulated onto a shared,
+evenly spaced wavenumber grid (every line is split linearly between its two
+neighbouring grid points) and the resulting stick spectra are convolved with
+the line shape by FFT. Simulating many thousands of spectra is therefore a few
+array operations instead of a Python loop over spectra and states.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from tanabesugano.batch import solve_batch
+
+
+if TYPE_CHECKING:
+    from numpy.typing import DTypeLike
+
+    from tanabesugano.matrices import Float64Array
+
+
+LINE_SHAPES = ("gaussian", "lorentzian")
+
+# Relative tolerance for an evenly spaced wavenumber grid
+_GRID_TOLERANCE = 1e-6
+# Gaussian kernels are cut off at this many standard deviations
+_GAUSSIAN_CUTOFF = 8.0
+# Conversion from the full width at half maximum to the standard deviation
+_FWHM_TO_SIGMA = 1.0 / (2.0 * np.sqrt(2.0 * np.log(2.0)))
+
+
+def line_shape(
+    offsets: Float64Array,
+    width: float | Float64Array,
+    shape: str = "gaussian",
+) -> Float64Array:
+    """Return an area-normalized line shape.
+
+    Args:
+        offsets (Float64Array): Distances from the line center in wavenumbers.
+        width (float | Float64Array): Full width at half maximum in wavenumbers,
+            broadcast against `offsets`.
+        shape (str): "gaussian" or "lorentzian". Defaults to "gaussian".
+
+    Raises:
+        ValueError: If the line shape is unknown.
+
+    Returns:
+        Float64Array: Line shape with unit area per unit intensity.
+
+    """
+    if shape not in LINE_SHAPES:
+        msg = f"Unknown line shape `{shape}`, use one of {LINE_SHAPES}!"
+        raise ValueError(msg)
+    if shape == "gaussian":
+        sigma = width * _FWHM_TO_SIGMA
+        return np.exp(-0.5 * (offsets / sigma) ** 2) / (sigma * np.sqrt(2.0 * np.pi))
+    gamma = 0.5 * width
+    return gamma / (np.pi * (offsets**2 + gamma**2))
+
+
+def spin_allowed(states: dict[str, Float64Array]) -> dict[str, Float64Array]:
+    """Return the mask of the spin-allowed levels of every parameter set.
+
+    A transition is spin-allowed if the spin multiplicity of the state equals
+    the one of the ground state, which may differ between the parameter sets
+    (e.g. high-spin and low-spin d6).
+
+    Args:
+        states (dict[str, Float64Array]): Batched states of shape `(n, k)`.
+
+    Returns:
+        dict[str, Float64Array]: Boolean masks of shape `(n, 1)` per state.
+
+    """
+    keys = list(states)
+    spins = np.array([int(key.split("_")[0]) for key in keys])
+    lowest = np.column_stack([states[key][:, 0] for key in keys])
+    ground = spins[np.argmin(lowest, axis=1)]
+    return {
+        key: (spin == ground)[:, None] for key, spin in zip(keys, spins, strict=True)
+    }
+
+
+def simulate_spectra(
+    states: dict[str, Float64Array],
+    grid: Float64Array,
+    *,
+    width: float | Float64Array = 1000.0,
+    shape: str = "gaussian",
+    allowed_only: bool = False,
+    intensities: dict[str, float] | None = None,
+    chunksize: int = 4096,
+    dtype: DTypeLike = np.float64,
+) -> Float64Array:
+    """Render the spectra of many parameter sets onto a wavenumber grid.
+
+    Args:
+        states (dict[str, Float64Array]): States of `solve_batch`, of shape
+            `(n, k)` or `(k,)` for a single parameter set, relative to the
+            ground state in wavenumbers.
+        grid (Float64Array): Evenly spaced wavenumbers of the spectra.
+        width (float | Float64Array): Full width at half maximum, scalar or one
+            value per spectrum. Defaults to 1000.0.
+        shape (str): "gaussian" or "lorentzian". Defaults to "gaussian".
+        allowed_only (bool): Only include spin-allowed transitions. Defaults
+            to False.
+        intensities (dict[str, float] | None): Relative intensity per state,
+            missing states have unit intensity. Defaults to None.
+        chunksize (int): Number of spectra convolved at once. Defaults to 4096.
+        dtype (DTypeLike): Precision of the spectra. Defaults to float64.
+
+    Raises:
+        ValueError: If the grid is not evenly spaced or the line shape unknown.
+
+    Returns:
+        Float64Array: Spectra of shape `(n, len(grid))`. The ground level and
+            lines outside the grid are left out.
+
+    """
+    grid = np.asarray(grid, dtype=np.float64)
+    step = np.diff(grid)
+    if grid.size < 2 or np.ptp(step) > _GRID_TOLERANCE * abs(step[0]):  # noqa: PLR2004
+        msg = "The wavenumber grid has to be evenly spaced!"
+        raise ValueError(msg)
+    line_shape(np.zeros(1), 1.0, shape)
+
+    states = {key: np.atleast_2d(value) for key, value in states.items()}
+    masks = spin_allowed(states) if allowed_only else {}
+    intensities = intensities or {}
+    energies = np.concatenate(list(states.values()), axis=1)
+    weights = np.concatenate(
+        [
+            np.broadcast_to(
+                masks.get(key, True) * float(intensities.get(key, 1.0)),
+                value.shape,
+            )
+            for key, value in states.items()
+        ],
+        axis=1,
+    ).astype(np.float64)
+    weights[energies <= 0.0] = 0.0
+    count = energies.shape[0]
+    width = np.broadcast_to(np.asarray(width, dtype=np.float64), (count,))
+
+    size = grid.size
+    half = size - 1
+    if shape == "gaussian" and count:
+        reach = _GAUSSIAN_CUTOFF * _FWHM_TO_SIGMA * width.max() / abs(step[0])
+        half = min(half, int(np.ceil(reach)))
+    offsets = np.arange(-half, half + 1) * step[0]
+    # Power of two at least as long as the linear convolution
+    length = 1 << (size + 2 * half - 1).bit_length()
+    # A common width needs the transform of a single kernel only
+    common = np.ptp(width) == 0.0 if count else True
+    if common and count:
+        transform = np.fft.rfft(line_shape(offsets, width[0], shape), n=length)
+    spectra = np.empty((count, size), dtype=dtype)
+    for start in range(0, count, chunksize):
+        stop = min(start + chunksize, count)
+        rows = stop - start
+
+        # Stick spectra, every line is split between its two grid points
+        position = (energies[start:stop] - grid[0]) / step[0]
+        lower = np.floor(position).astype(np.int64)
+        fraction = position - lower
+        inside = (lower >= 0) & (lower < size - 1)
+        row = np.broadcast_to(np.arange(rows)[:, None], position.shape)[inside]
+        weight = weights[start:stop][inside]
+        index = row * size + lower[inside]
+        sticks = np.bincount(
+            index,
+            weights=weight * (1.0 - fraction[inside]),
+            minlength=rows * size,
+        )
+        sticks += np.bincount(
+            index + 1,
+            weights=weight * fraction[inside],
+            minlength=rows * size,
+        )
+
+        # Linear convolution with the kernel of all relevant offsets
+        if not common:
+            transform = np.fft.rfft(
+                line_shape(offsets, width[start:stop, None], shape),
+                n=length,
+            )
+        result = np.fft.irfft(
+            np.fft.rfft(sticks.reshape(rows, size), n=length) * transform,
+            n=length,
+        )
+        spectra[start:stop] = result[:, half : half + size]
+    return spectra
+
+
+def spectra(
+    d_count: int,
+    Dq: float | Float64Array,
+    B: float | Float64Array,
+    C: float | Float64Array,
+    grid: Float64Array,
+    **options: object,
+) -> Float64Array:
+    """Solve many parameter sets and render their spectra.
+
+    Args:
+        d_count (int): Electron configuration (d2-d8).
+        Dq (float | Float64Array): Oh crystal field splitting, scalar or array.
+        B (float | Float64Array): Racah B parameter, scalar or array.
+        C (float | Float64Array): Racah C parameter, scalar or array.
+        grid (Float64Array): Evenly spaced wavenumbers of the spectra.
+        **options (object): Keyword arguments of `simulate_spectra`.
+
+    Returns:
+        Float64Array: Spectra of shape `(n, len(grid))` for the `n` flattened,
+            broadcast parameter sets.
+
+    """
+    Dq, B, C = (np.ravel(value) for value in np.broadcast_arrays(Dq, B, C))
+    return simulate_spectra(solve_batch(d_count, Dq, B, C), grid, **options)
@@ -0,0 +1,238 @@
+"""Streaming batch processing of JSON-lines parameter records.
+
+Every input line is a JSON object describing one request:
+
+- `{"type": "point", "d": 6, "Dq": 2000, "B": 1065, "C": 5120}`: all states
+- `{"type": "cut", "d": 6, "cut": 24000, "B": 1065, "C": 5120}`: term table
+- `{"type": "diagram", "d": 6, "Dq": 4000, "B": 1065, "C": 5120, "nroots": 100}`
+
+`type` defaults to "point" and an optional `id` is copied to the result. The
+records are read in chunks of about `chunk_size` points, the points of a chunk
+are grouped by electron configuration and solved in one vectorized call per
+group. Results are written in input order, so the memory stays bounded by the
+chunk size regardless of the length of the input.
+"""
+
+from __future__ import annotations
+
+import json
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from tanabesugano.batch import cut_table
+from tanabesugano.batch import read_d_count
+from tanabesugano.batch import read_parameter
+from tanabesugano.batch import solve_batch
+from tanabesugano.batch import split_states
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+    from typing import TextIO
+
+    from tanabesugano.matrices import Float64Array
+
+
+RECORD_TYPES = ("point", "cut", "diagram")
+
+# Upper limit of the roots of a single diagram record
+MAX_ROOTS = 100_000
+
+
+@dataclass(frozen=True)
+class StreamRequest:
+    """Parsed request of a single input line."""
+
+    kind: str
+    d_count: int
+    Dq: Float64Array
+    B: float
+    C: float
+    record: dict
+
+    @property
+    def size(self) -> int:
+        """Number of points to solve for this request."""
+        return self.Dq.size
+
+
+def _load_record(line: str) -> dict:
+    """Decode a single JSON-lines record into a JSON object."""
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as exc:
+        msg = f"Invalid JSON: {exc.msg}"
+        raise ValueError(msg) from None
+    if not isinstance(record, dict):
+        msg = "Expected a JSON object!"
+        raise ValueError(msg)  # noqa: TRY004
+    return record
+
+
+def _request(record: dict) -> StreamRequest:
+    """Validate a decoded record and return its request."""
+    kind = record.get("type", "point")
+    if kind not in RECORD_TYPES:
+        msg = f"Unknown record type `{kind}`, use one of {RECORD_TYPES}!"
+        raise ValueError(msg)
+    d_count = read_d_count(record)
+    B = read_parameter(record, "B")
+    C = read_parameter(record, "C")
+
+    if kind == "point":
+        Dq = np.array([read_parameter(record, "Dq")])
+    elif kind == "cut":
+        Dq = np.array([read_parameter(record, "cut") / 10.0])
+    else:
+        nroots = int(read_parameter(record, "nroots", 100, integer=True))
+        if not 0 < nroots <= MAX_ROOTS:
+            msg = f"`nroots` has to be between 1 and {MAX_ROOTS}!"
+            raise ValueError(msg)
+        Dq = np.linspace(0.0, read_parameter(record, "Dq"), nroots)
+    return StreamRequest(kind, d_count, Dq, B, C, record)
+
+
+def parse_record(line: str) -> StreamRequest:
+    """Parse and validate a single JSON-lines record.
+
+    Args:
+        line (str): JSON object of one request.
+
+    Raises:
+        ValueError: If the record is malformed or a field is invalid.
+
+    Returns:
+        StreamRequest: Request with the `Dq` values of all points to solve.
+
+    """
+    return _request(_load_record(line))
+
+
+def format_result(
+    request: StreamRequest,
+    states: dict[str, Float64Array],
+) -> dict:
+    """Convert the states of a request into its JSON result record.
+
+    Args:
+        request (StreamRequest): Parsed request.
+        states (dict[str, Float64Array]): States of shape `(request.size, k)`.
+
+    Returns:
+        dict: Result record with the input parameters and the `states`.
+
+    """
+    result = {"type": request.kind, "d_count": request.d_count}
+    if "id" in request.record:
+        result["id"] = request.record["id"]
+    result.update(B=request.B, C=request.C)
+    if request.kind == "point":
+        result["Dq"] = float(request.Dq[0])
+        result["states"] = {key: value[0].tolist() for key, value in states.items()}
+    elif request.kind == "cut":
+        result["cut"] = float(request.Dq[0] * 10.0)
+        result["states"] = cut_table(states)
+    else:
+        result["10Dq"] = (request.Dq * 10.0).tolist()
+        result["delta_B"] = (request.Dq / request.B).tolist()
+        result["states"] = {
+            key: value.tolist() for key, value in split_states(states).items()
+        }
+    return result
+
+
+def solve_chunk(requests: list[StreamRequest | dict]) -> list[dict]:
+    """Solve a chunk of requests with one vectorized call per configuration.
+
+    Args:
+        requests (list[StreamRequest | dict]): Parsed requests; error records
+            (dict) are passed through unchanged.
+
+    Returns:
+        list[dict]: Result records in the order of `requests`.
+
+    """
+    results: list[dict] = [
+        request if isinstance(request, dict) else {} for request in requests
+    ]
+    groups: dict[int, list[tuple[int, StreamRequest]]] = {}
+    for position, request in enumerate(requests):
+        if isinstance(request, StreamRequest):
+            groups.setdefault(request.d_count, []).append((position, request))
+
+    for d_count, group in groups.items():
+        Dq = np.concatenate([request.Dq for _, request in group])
+        B = np.concatenate([np.full(request.size, request.B) for _, request in group])
+        C = np.concatenate([np.full(request.size, request.C) for _, request in group])
+        states = solve_batch(d_count, Dq, B, C)
+        start = 0
+        for position, request in group:
+            stop = start + request.size
+            results[position] = format_result(
+                request,
+                {key: value[start:stop] for key, value in states.items()},
+            )
+            start = stop
+    return results
+
+
+def stream_records(lines: Iterable[str], chunk_size: int = 4096) -> Iterator[dict]:
+    """Solve JSON-lines records chunk by chunk and yield the results in order.
+
+    Args:
+        lines (Iterable[str]): Input lines; blank lines are skipped.
+        chunk_size (int): Number of points (or records) that are collected
+            before a chunk is solved. Defaults to 4096.
+
+    Yields:
+        dict: One result record per non-blank input line. Invalid records yield
+            `{"line": n, "error": message}` instead of stopping the stream,
+            together with the `id` of the record if it has one.
+
+    """
+    chunk: list[StreamRequest | dict] = []
+    points = 0
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        record = None
+        try:
+            record = _load_record(line)
+            request = _request(record)
+        except (ValueError, OverflowError) as exc:
+            error = {"line": number}
+            if record is not None and "id" in record:
+                error["id"] = record["id"]
+            error["error"] = str(exc)
+            chunk.append(error)
+        else:
+            chunk.append(request)
+            points += request.size
+        if points >= chunk_size or len(chunk) >= chunk_size:
+            yield from solve_chunk(chunk)
+            chunk, points = [], 0
+    if chunk:
+        yield from solve_chunk(chunk)
+
+
+def run_stream(source: TextIO, target: TextIO, chunk_size: int = 4096) -> int:
+    """Process a JSON-lines input stream into a JSON-lines output stream.
+
+    Args:
+        source (TextIO): Input stream of request records.
+        target (TextIO): Output stream for the result records.
+        chunk_size (int): Number of points solved per chunk. Defaults to 4096.
+
+    Returns:
+        int: Number of written records.
+
+    """
+    count = 0
+    for result in stream_records(source, chunk_size=chunk_size):
+        target.write(json.dumps(result) + "\n")
+        count += 1
+    return count
@@ -0,0 +1,87 @@
+"""Tests for the atlas generation."""
+
+from __future__ import annotations
+
+import json
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tanabesugano.atlas import Atlas
+from tanabesugano.atlas import AtlasEntry
+from tanabesugano.atlas import default_entries
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_console_scripts import ScriptRunner
+
+
+def test_default_entries():
+    entries = default_entries(variants=[(900.0, 4000.0)], nroots=10)
+    assert len(entries) == 14
+    assert {entry.d_count for entry in entries} == set(range(2, 9))
+
+
+def test_atlas_incremental(tmp_path: Path):
+    entries = default_entries(d_counts=[2, 7], nroots=10)
+    atlas = Atlas(entries, directory=tmp_path, processes=2)
+    assert atlas.run() == entries
+    assert len(list((tmp_path / "d2").glob("*.csv"))) == 3
+    assert len(list((tmp_path / "d7").glob("*.csv"))) == 3
+
+    # Nothing changed, nothing to do
+    assert Atlas(entries, directory=tmp_path, processes=2).run() == []
+
+    # Only the changed entry is recomputed
+    changed = [entries[0], AtlasEntry(d_count=7, B=971.0, C=4499.0, nroots=20)]
+    assert Atlas(changed, directory=tmp_path, processes=2).run() == changed[1:]
+
+
+def test_atlas_missing_file(tmp_path: Path):
+    entries = default_entries(d_counts=[3], nroots=10)
+    Atlas(entries, directory=tmp_path, processes=1).run()
+    next((tmp_path / "d3").glob("DD-*.csv")).unlink()
+    assert Atlas(entries, directory=tmp_path, processes=1).run() == entries
+
+
+def test_cmd_atlas(script_runner: ScriptRunner, tmp_path: Path) -> None:
+    ret = script_runner.run(
+        ["tanabesugano", "atlas", "-d", "2", "8", "-n", "10", "-o", str(tmp_path)],
+    )
+    assert ret.success
+    assert (tmp_path / "atlas.json").is_file()
+    assert len(list((tmp_path / "d8").glob("*.csv"))) == 3
+
+
+def test_atlas_entry_key():
+    entry = AtlasEntry(d_count=5, Dq=2000.25, B=860.5, C=3850.0, nroots=10)
+    assert entry.key != AtlasEntry(d_count=5, B=860.5, C=3850.0, nroots=10).key
+    assert entry.key != AtlasEntry(d_count=5, Dq=2000.25, C=3850.0, nroots=10).key
+    keys = {AtlasEntry(d_count=5, nroots=10, cut=cut).key for cut in (1e4, 2e4)}
+    assert len(keys) == 2
+
+
+def test_atlas_failed_entry(tmp_path: Path):
+    # A file in place of the d4 folder fails that entry, but not the d2 one
+    (tmp_path / "d4").write_text("")
+    entries = default_entries(d_counts=[2, 4], nroots=10)
+    with pytest.raises(FileExistsError):
+        Atlas(entries, directory=tmp_path, processes=2).run()
+    (tmp_path / "d4").unlink()
+    assert Atlas(entries, directory=tmp_path, processes=2).run() == entries[1:]
+
+
+def test_atlas_overwritten_files(tmp_path: Path):
+    # The file names leave out nroots, so the entries share their files
+    small, large = (AtlasEntry(d_count=3, nroots=n) for n in (10, 20))
+    assert Atlas([small], directory=tmp_path, processes=1).run() == [small]
+    assert Atlas([large], directory=tmp_path, processes=1).run() == [large]
+    state = json.loads((tmp_path / "atlas.json").read_text())
+    assert list(state) == [large.key]
+
+    assert Atlas([small], directory=tmp_path, processes=1).run() == [small]
+    diagram = next((tmp_path / "d3").glob("TS-diagram_*.csv"))
+    assert len(diagram.read_text().splitlines()) == 11
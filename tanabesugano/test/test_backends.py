@@ -0,0 +1,192 @@
+"""Tests for the registry of compute backends."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tanabesugano import backends
+from tanabesugano.backends import ENVIRONMENT
+from tanabesugano.backends import Backend
+from tanabesugano.backends import NumpyBackend
+from tanabesugano.backends import benchmark_backends
+from tanabesugano.backends import get_backend
+from tanabesugano.backends import register_backend
+from tanabesugano.backends import set_backend
+from tanabesugano.matrices import d6
+from tanabesugano.microstates import solve_microstates
+from tanabesugano.reusable import ReusableSolver
+from tanabesugano.reusable import solve_selected
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Restore the registered and the selected backend after a test."""
+    registered = dict(backends._BACKENDS)  # noqa: SLF001
+    monkeypatch.setattr(backends, "_BACKENDS", registered)
+    yield registered
+    set_backend(None)
+    backends._instance.cache_clear()  # noqa: SLF001
+    backends._fastest.cache_clear()  # noqa: SLF001
+
+
+class CountingBackend(NumpyBackend):
+    """NumPy backend that counts its diagonalizations."""
+
+    name = "counting"
+    calls = 0
+
+    def eigvalsh(self, matrices, subset=None):
+        """Count the call and diagonalize with NumPy."""
+        CountingBackend.calls += 1
+        return super().eigvalsh(matrices, subset)
+
+
+class MissingBackend(NumpyBackend):
+    """Backend whose dependencies are not installed."""
+
+    name = "missing"
+
+    @classmethod
+    def available(cls) -> bool:
+        """Report the backend as not installed."""
+        return False
+
+
+@pytest.mark.usefixtures("registry")
+def test_resolution_order(monkeypatch):
+    register_backend(CountingBackend)
+    monkeypatch.setenv(ENVIRONMENT, "counting")
+    assert isinstance(get_backend(), CountingBackend)
+    set_backend("numpy")
+    assert type(get_backend()) is NumpyBackend
+    assert get_backend("counting") is get_backend("COUNTING")
+    backend = CountingBackend()
+    assert get_backend(backend) is backend
+
+
+@pytest.mark.usefixtures("registry")
+def test_benchmark_backends():
+    register_backend(MissingBackend)
+    timings = benchmark_backends()
+    assert "numpy" in timings
+    assert "missing" not in timings
+    assert all(0.0 < timing < np.inf for timing in timings.values())
+
+
+@pytest.mark.usefixtures("registry")
+def test_auto_benchmark(monkeypatch):
+    # Fixed timings keep the choice independent of the load of the machine
+    runs = []
+
+    def timings() -> dict[str, float]:
+        runs.append(1)
+        return {"numpy": 2.0, "counting": 1.0}
+
+    monkeypatch.delenv(ENVIRONMENT, raising=False)
+    register_backend(CountingBackend)
+    monkeypatch.setattr(backends, "benchmark_backends", timings)
+    # The default does not benchmark, "auto" is opt-in
+    assert type(get_backend()) is NumpyBackend
+    assert not runs
+    set_backend("auto")
+    assert isinstance(get_backend(), CountingBackend)
+    assert get_backend() is get_backend("auto")
+    assert len(runs) == 1
+
+
+class FailingBackend(NumpyBackend):
+    """Backend whose kernel fails."""
+
+    name = "failing"
+
+    def eigvalsh(self, matrices, subset=None):  # noqa: ARG002
+        """Fail like a broken installation."""
+        msg = "broken kernel"
+        raise RuntimeError(msg)
+
+
+@pytest.mark.usefixtures("registry")
+def test_benchmark_failures():
+    register_backend(FailingBackend)
+    with pytest.warns(RuntimeWarning, match="'failing'.*broken kernel"):
+        timings = benchmark_backends(["numpy", "failing"])
+    assert list(timings) == ["numpy"]
+
+
+def test_abstract_backend():
+    with pytest.raises(TypeError, match="abstract"):
+        Backend()
+
+    class Incomplete(Backend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="eigvalsh"):
+        Incomplete()
+
+
+@pytest.mark.usefixtures("registry")
+def test_invalid_backends():
+    register_backend(MissingBackend)
+    with pytest.raises(ValueError, match="Unknown backend"):
+        get_backend("cupy")
+    with pytest.raises(ValueError, match="does not take the option"):
+        get_backend("numpy:evr")
+    with pytest.raises(ImportError, match="not installed"):
+        set_backend("missing")
+
+    class Unnamed(NumpyBackend):
+        name = "auto"
+
+    with pytest.raises(ValueError, match="needs a name"):
+        register_backend(Unnamed)
+
+
+@pytest.mark.usefixtures("registry")
+def test_solvers_use_the_backend():
+    register_backend(CountingBackend)
+    set_backend("counting")
+    CountingBackend.calls = 0
+    d6(Dq=1000.0, B=1065.0, C=5120.0).solver()
+    solve_selected(6, 1000.0, 1065.0, 5120.0, terms=["5_T_2"])
+    ReusableSolver(6).solve()
+    solve_microstates(2, 1000.0, 800.0, 3200.0)
+    assert CountingBackend.calls > 4
+
+
+@pytest.mark.parametrize("spec", ["scipy", "scipy:evr", "scipy:evx", "scipy:evd"])
+def test_scipy_backend(spec):
+    pytest.importorskip("scipy")
+    Dq = np.linspace(0.0, 3000.0, 25)
+    expected = solve_selected(5, Dq, 860.0, 3850.0, lowest_k=2, backend="numpy")
+    states = solve_selected(5, Dq, 860.0, 3850.0, lowest_k=2, backend=spec)
+    for key, value in expected.items():
+        np.testing.assert_allclose(states[key], value, atol=1e-8)
+
+    solver, reference = ReusableSolver(5, backend=spec), ReusableSolver(5)
+    for instance in (solver, reference):
+        instance.update(2000.0, 860.0, 3850.0)
+    np.testing.assert_allclose(solver.solve(), reference.solve(), atol=1e-8)
+    np.testing.assert_allclose(
+        solve_microstates(3, 1500.0, 918.0, 4133.0, 200.0, backend=spec),
+        solve_microstates(3, 1500.0, 918.0, 4133.0, 200.0, backend="numpy"),
+        atol=1e-8,
+    )
+
+
+def test_numba_backend():
+    pytest.importorskip("numba")
+    backend = get_backend("numba")
+    coefficients = np.random.default_rng(1).standard_normal((3, 6, 6))
+    coefficients += coefficients.swapaxes(-1, -2)
+    parameters = np.random.default_rng(2).standard_normal((4, 5, 3))
+    matrices = backend.assemble(parameters, coefficients)
+    np.testing.assert_allclose(
+        matrices,
+        np.tensordot(parameters, coefficients, axes=1),
+    )
+    np.testing.assert_allclose(
+        backend.eigvalsh(matrices, 2),
+        np.linalg.eigvalsh(matrices)[..., :2],
+        atol=1e-10,
+    )
@@ -0,0 +1,51 @@
+"""Tests for the band ratio assignment."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tanabesugano.bandratio import band_ratio_table
+from tanabesugano.batch import solve_batch
+from tanabesugano.batch import split_states
+
+
+@pytest.mark.parametrize("d_count", [2, 3, 7, 8])
+def test_assign_recovers_parameters(d_count: int):
+    table = band_ratio_table(d_count, 4.5)
+    rng = np.random.default_rng(d_count)
+    dq_b = rng.uniform(0.6, 4.0, 200)
+    B = rng.uniform(600.0, 1100.0, 200)
+    columns = split_states(solve_batch(d_count, dq_b * B, B, 4.5 * B))
+    assignment = table.assign(columns[table.bands[0]], columns[table.bands[1]])
+
+    assert assignment.dq_b.shape == (200, len(table.segments))
+    assert np.all(assignment.count >= 1)
+    # The true parameters are among the solutions of every band pair
+    error = np.nanmin(np.abs(assignment.dq_b - dq_b[:, None]), axis=1)
+    np.testing.assert_array_less(error, 1e-3)
+    np.testing.assert_allclose(
+        np.nanmin(np.abs(assignment.Dq - (dq_b * B)[:, None]), axis=1),
+        0.0,
+        atol=1.0,
+    )
+
+
+def test_segments_are_monotone():
+    table = band_ratio_table(6, 4.8)
+    assert len(table.segments) > 1
+    for segment in table.segments:
+        assert np.all(np.diff(segment.ratio) > 0.0)
+
+
+def test_assign_out_of_range():
+    assignment = band_ratio_table(3).assign([10000.0, 10000.0], [5000.0, 15000.0])
+    assert assignment.count.tolist() == [0, 1]
+    assert np.isnan(assignment.B[0]).all()
+
+
+def test_band_ratio_table_invalid():
+    with pytest.raises(ValueError, match="No default bands"):
+        band_ratio_table(5)
+    with pytest.raises(ValueError, match="Unknown bands"):
+        band_ratio_table(3, bands=("4_T_2", "3_T_1"))
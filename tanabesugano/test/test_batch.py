@@ -2,7 +2,17 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from tanabesugano.batch import ELECTRON_CONFIG_SOLVERS
 from tanabesugano.batch import Batch
+from tanabesugano.batch import solve_batch
+from tanabesugano.batch import solve_shared
+from tanabesugano.batch import solve_threaded
+from tanabesugano.batch import split_states
 
 
 def test_batch_small():
@@ -51,3 +61,155 @@ def test_batch_d8():
     res = Batch(d_count=8)
     res.calculation()
     assert isinstance(res.result, list)
+
+
+@pytest.mark.parametrize("d_count", range(2, 9))
+def test_solve_batch_matches_solver(d_count):
+    Dq = np.linspace(0.0, 4000.0, 7)
+    states = solve_batch(d_count, Dq, 860.0, 3850.0)
+    solver_class = ELECTRON_CONFIG_SOLVERS[d_count]
+    for i, dq in enumerate(Dq):
+        expected = solver_class(Dq=dq, B=860.0, C=3850.0).solver()
+        assert states.keys() == expected.keys()
+        for key, value in expected.items():
+            np.testing.assert_allclose(states[key][i], value, atol=1e-8)
+
+
+def test_solve_batch_invalid():
+    with pytest.raises(ValueError, match="between 2 and 8"):
+        solve_batch(9, 1000.0, 860.0, 3850.0)
+
+
+def test_split_states():
+    columns = split_states(solve_batch(6, np.zeros(3), 860.0, 3850.0))
+    assert len(columns) == 43
+    assert all(value.shape == (3,) for value in columns.values())
+
+
+def test_batch_float32():
+    res = Batch(d_count=4, dtype=np.float32)
+    res.calculation()
+    assert all(
+        value.dtype == np.float32
+        for result in res.result
+        for value in result["states"].values()
+    )
+
+
+def test_solve_threaded_matches_solve_batch():
+    Dq = np.linspace(0.0, 4000.0, 101)
+    expected = solve_batch(5, Dq, 860.0, 3850.0)
+    states = solve_threaded(5, Dq, 860.0, 3850.0, workers=4, chunksize=16)
+    for key, value in expected.items():
+        np.testing.assert_allclose(states[key], value, atol=1e-8)
+
+
+def test_batch_threads():
+    serial = Batch(d_count=6)
+    serial.calculation()
+    threaded = Batch(d_count=6, workers=4)
+    threaded.calculation()
+    np.testing.assert_allclose(threaded.values, serial.values, atol=1e-6)
+    assert [result["C"] for result in threaded.result] == [
+        result["C"] for result in serial.result
+    ]
+
+
+def test_solve_shared_matches_solve_batch(tmp_path):
+    Dq = np.linspace(0.0, 4000.0, 101)
+    expected = np.concatenate(
+        list(solve_batch(3, Dq, 918.0, 4133.0, lowest_k=2).values()),
+        axis=1,
+    )
+    values = solve_shared(3, Dq, 918.0, 4133.0, processes=2, chunksize=16, lowest_k=2)
+    np.testing.assert_allclose(values, expected, atol=1e-8)
+
+    path = tmp_path / "energies.npy"
+    solve_shared(3, Dq, 918.0, 4133.0, processes=2, chunksize=16, path=path)
+    assert np.load(path).shape == (101, 20)
+
+
+def test_batch_processes():
+    serial = Batch(d_count=4)
+    serial.calculation()
+    shared = Batch(d_count=4, processes=2)
+    shared.calculation()
+    np.testing.assert_allclose(shared.values, serial.values, atol=1e-6)
+    # The states of every point are views into the shared energy matrix
+    assert np.shares_memory(shared.result[-1]["states"]["5_E_1"], shared.values)
+
+
+def test_solver_concurrent_threads():
+    # The same instance is solved from several threads at once
+    instance = ELECTRON_CONFIG_SOLVERS[7](Dq=np.linspace(0.0, 4000.0, 200))
+    expected = instance.solver()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: instance.solver(), range(32)))
+    for states in results:
+        for key, value in expected.items():
+            np.testing.assert_array_equal(states[key], value)
+
+
+def test_batch_points():
+    points = [[2000.0, 1065.0, 5120.0], [1500.0, 918.0, 4133.0]]
+    res = Batch(d_count=6, points=points)
+    res.calculation()
+    assert [result["Dq"] for result in res.result] == [2000.0, 1500.0]
+    expected = solve_batch(6, 1500.0, 918.0, 4133.0)
+    for key, value in expected.items():
+        states = res.result[1]["states"][key]
+        np.testing.assert_allclose(states, np.ravel(value), atol=1e-6)
+
+
+def test_batch_log_spacing_and_ratio():
+    res = Batch(
+        Dq=[100.0, 10000.0, 3],
+        B=[800.0, 1000.0, 2],
+        d_count=3,
+        spacing={"Dq": "log"},
+        ratio=4.5,
+    )
+    assert res.points.shape == (6, 3)
+    np.testing.assert_allclose(np.unique(res.Dq), [100.0, 1000.0, 10000.0])
+    np.testing.assert_allclose(res.C, 4.5 * res.B)
+    with pytest.raises(ValueError, match="positive"):
+        Batch(Dq=[0.0, 1000.0, 3], spacing={"Dq": "log"})
+
+
+def test_batch_axes():
+    res = Batch(d_count=3)
+    np.testing.assert_array_equal(res.Dq, np.linspace(4000.0, 4500.0, 10))
+    np.testing.assert_array_equal(res.B, np.linspace(400.0, 4500.0, 10))
+    np.testing.assert_array_equal(res.C, np.linspace(3600.0, 4000, 10))
+    assert res.points.shape == (1000, 3)
+
+
+@pytest.mark.parametrize(
+    ("spacing", "ratio", "match"),
+    [({"dq": "log"}, None, "Unknown parameters"), ({"C": "log"}, 4.5, "ratio")],
+)
+def test_batch_invalid_spacing(spacing: dict, ratio: float | None, match: str):
+    with pytest.raises(ValueError, match=match):
+        Batch(d_count=3, spacing=spacing, ratio=ratio)
+
+
+@pytest.mark.parametrize("sampling", ["sobol", "lhs"])
+def test_batch_sampling(sampling: str):
+    res = Batch(
+        Dq=[0.0, 4000.0, 0],
+        B=[800.0, 1000.0, 0],
+        C=[3000.0, 4000.0, 0],
+        d_count=2,
+        sampling=sampling,
+        samples=64,
+        seed=1,
+    )
+    assert res.points.shape == (64, 3)
+    Dq, B, _ = res.points.T
+    assert Dq.min() >= 0.0
+    assert B.max() <= 1000.0
+    # Every eighth of the Dq range holds the same number of points
+    counts = np.bincount((Dq // 500.0).astype(int), minlength=8)
+    np.testing.assert_array_equal(counts, np.full(8, 8))
+    res.calculation()
+    assert len(res.result) == 64
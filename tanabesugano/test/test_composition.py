@@ -0,0 +1,44 @@
+"""Tests for the configuration composition of the states."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tanabesugano.batch import solve_batch
+from tanabesugano.batch import split_states
+from tanabesugano.composition import configuration_weights
+
+
+@pytest.mark.parametrize("d_count", [2, 3, 4, 5, 6, 7, 8])
+def test_configuration_weights(d_count: int):
+    Dq = np.linspace(0.0, 4000.0, 21)
+    composition = configuration_weights(d_count, Dq, 900.0, 4000.0)
+    columns = split_states(solve_batch(d_count, Dq, 900.0, 4000.0))
+
+    assert composition.columns == list(columns)
+    np.testing.assert_allclose(
+        composition.energies,
+        np.column_stack(list(columns.values())),
+        atol=1e-6,
+    )
+    assert composition.weights.dtype == np.float32
+    assert composition.weights.shape == (21, len(columns), len(composition.basis))
+    np.testing.assert_allclose(composition.weights.sum(axis=-1), 1.0, atol=1e-5)
+
+
+def test_configuration_weights_strong_field():
+    composition = configuration_weights(6, [500.0, 30000.0], 1065.0, 5120.0)
+    assert composition.basis[:3] == ["t2g^6", "t2g^5 eg^1", "t2g^4 eg^2"]
+    # High-spin 5T2 is t2g^4 eg^2, low-spin 1A1 becomes pure t2g^6
+    high = composition.columns.index("5_T_2")
+    low = composition.columns.index("1_A_1_0")
+    assert composition.basis[composition.leading[0, high]] == "t2g^4 eg^2"
+    assert composition.weights[1, low, 0] > 0.99
+    assert composition.energies[1, low] == 0.0
+
+
+def test_configuration_weights_selection():
+    composition = configuration_weights(3, 1500.0, 918.0, 4133.0, terms=["4_T_1"])
+    assert composition.columns == ["4_T_1_0", "4_T_1_1"]
+    assert composition.basis == ["t2g^2 eg^1", "t2g^1 eg^2"]
@@ -0,0 +1,56 @@
+"""Tests for the level-of-detail downsampling."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tanabesugano.cmd import CMDmain
+from tanabesugano.downsample import crossing_mask
+from tanabesugano.downsample import downsample_frame
+from tanabesugano.downsample import lttb_indices
+
+
+@pytest.fixture
+def tmm():
+    tmm = CMDmain(Dq=4000.0, B=860.0, C=3850.0, nroots=501, d_count=6)
+    tmm.calculation()
+    return tmm
+
+
+def test_lttb_keeps_peak():
+    x = np.linspace(0.0, 1.0, 1001)
+    y = np.where(np.arange(1001) == 437, 10.0, 0.0)
+    selected = lttb_indices(x, y, 20)
+    assert selected.shape == (20, 1)
+    assert 437 in selected
+    assert selected[0, 0] == 0
+    assert selected[-1, 0] == 1000
+
+
+def test_lttb_small_budget():
+    x = np.linspace(0.0, 1.0, 10)
+    assert lttb_indices(x, x, 50).shape == (10, 1)
+
+
+def test_crossing_mask():
+    x = np.linspace(-1.0, 1.0, 10)
+    Y = np.column_stack([x, -x, np.full_like(x, 5.0)])
+    mask = crossing_mask(Y)
+    assert mask[:, 0].sum() == 2
+    assert mask[:, 1].sum() == 2
+    assert not mask[:, 2].any()
+
+
+def test_downsample_frame(tmm):
+    columns = tmm.df.drop(["Energy", "delta_B", "10Dq"], axis=1).columns
+    frame = downsample_frame(tmm.df, x="10Dq", columns=columns, points=50)
+
+    assert list(frame["variable"].unique()) == list(columns)
+    assert len(frame) < len(tmm.df) * len(columns) / 4
+    # The downsampled traces stay close to the full ones
+    for column in columns:
+        part = frame[frame["variable"] == column]
+        interpolated = np.interp(tmm.df["10Dq"], part["10Dq"], part["value"])
+        span = np.ptp(tmm.df[column])
+        assert np.max(np.abs(interpolated - tmm.df[column])) <= 0.05 * span + 1e-6
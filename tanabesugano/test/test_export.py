@@ -0,0 +1,103 @@
+"""Tests for the binary diagram export."""
+
+from __future__ import annotations
+
+import json
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from tanabesugano.cmd import CMDmain
+from tanabesugano.export import BinaryExporter
+from tanabesugano.export import export_directory
+from tanabesugano.export import read_binary
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def tmm():
+    tmm = CMDmain(Dq=4000.0, B=860.0, C=3850.0, nroots=51, d_count=5)
+    tmm.calculation()
+    return tmm
+
+
+def test_export_float32(tmm, tmp_path: Path):
+    exporter = BinaryExporter(tmp_path)
+    exporter.add_cmd(tmm)
+    manifest = exporter.write()
+
+    content = json.loads(manifest.read_text())
+    (ts, dd) = content["configurations"]["d5"]
+    assert ts["type"] == "TS"
+    assert dd["x"]["name"] == "10Dq"
+    assert all(column["offset"] % 4 == 0 for column in ts["columns"])
+    assert ts["bytes"] == (len(ts["columns"]) + 1) * 51 * 4
+
+    frame = read_binary(manifest, tmm.title_DD)
+    np.testing.assert_allclose(frame.to_numpy(), tmm.dd_frame().to_numpy(), rtol=1e-6)
+
+
+def test_export_quantized(tmm, tmp_path: Path):
+    exporter = BinaryExporter(tmp_path, quantize=True)
+    exporter.add_cmd(tmm)
+    manifest = exporter.write()
+
+    expected = tmm.dd_frame().to_numpy()
+    frame = read_binary(manifest, tmm.title_DD)
+    span = np.ptp(expected, axis=0)
+    assert np.all(np.abs(frame.to_numpy() - expected) <= span / 65535 + 1e-9)
+
+
+def test_export_directory(tmm, tmp_path: Path):
+    (tmp_path / "d5").mkdir()
+    tmm.savetxt(directory=tmp_path / "d5")
+    tmm.ci_cut(dq_ci=24000.0, directory=tmp_path / "d5")
+
+    # The manifest of the CSV files in the same directory must survive
+    (tmp_path / "manifest.json").write_text("{}")
+    manifest = export_directory(tmp_path, tmp_path)
+    assert manifest.name == "binary-manifest.json"
+    assert (tmp_path / "manifest.json").read_text() == "{}"
+    content = json.loads(manifest.read_text())
+    assert sorted(d["type"] for d in content["configurations"]["d5"]) == ["DD", "TS"]
+
+
+def test_read_binary_unknown(tmm, tmp_path: Path):
+    exporter = BinaryExporter(tmp_path)
+    exporter.add_cmd(tmm)
+    with pytest.raises(KeyError, match="is not part of"):
+        read_binary(exporter.write(), "unknown")
+
+
+def test_export_points(tmp_path: Path):
+    tmm = CMDmain(nroots=1000, d_count=6)
+    tmm.calculation()
+    exporter = BinaryExporter(tmp_path, points=50)
+    exporter.add_cmd(tmm)
+    manifest = exporter.write()
+
+    content = json.loads(manifest.read_text())
+    (_, dd) = content["configurations"]["d6"]
+    assert dd["rows"] == 1000
+    rows = [column["rows"] for column in dd["columns"]]
+    assert all(column["index"] % 4 == 0 for column in dd["columns"])
+    assert np.median(rows) < 100
+    assert sum(rows) < 0.25 * 1000 * len(rows)
+
+    expected = tmm.dd_frame()
+    frame = read_binary(manifest, tmm.title_DD)
+    x_axis = expected["10Dq"].to_numpy()
+    for column, count in zip(expected.columns[1:], rows, strict=True):
+        kept = frame[["10Dq", column]].dropna()
+        assert len(kept) == count
+        nearest = np.abs(x_axis[:, np.newaxis] - kept["10Dq"].to_numpy()).argmin(axis=0)
+        np.testing.assert_allclose(
+            kept[column],
+            expected[column].iloc[nearest],
+            rtol=1e-5,
+        )
@@ -24,3 +24,19 @@ def test_frontapp():
 def test_cmd(script_runner: ScriptRunner) -> None:
     ret = script_runner.run("tanabesugano", "--help")
     assert ret.success
+
+
+def test_frontapp_threads():
+    serial = frontapp.CMDmain(Dq=4000.0, B=400.0, C=3600.0, nroots=100, d_count=4)
+    serial.calculation()
+    threaded = frontapp.CMDmain(
+        Dq=4000.0,
+        B=400.0,
+        C=3600.0,
+        nroots=100,
+        d_count=4,
+        workers=3,
+    )
+    threaded.calculation()
+    assert list(threaded.df.columns) == list(serial.df.columns)
+    assert abs(threaded.df - serial.df).to_numpy().max() < 1e-6
@@ -0,0 +1,55 @@
+"""Tests for the parameter grids and samples."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tanabesugano.grids import latin_hypercube
+from tanabesugano.grids import parameter_axis
+from tanabesugano.grids import sample_box
+from tanabesugano.grids import sobol
+
+
+def test_sobol_reference():
+    # First points of the unscrambled sequence in three dimensions
+    np.testing.assert_array_equal(
+        sobol(4),
+        [[0.0, 0.0, 0.0], [0.5, 0.5, 0.5], [0.75, 0.25, 0.25], [0.25, 0.75, 0.75]],
+    )
+
+
+def test_sobol_scipy():
+    qmc = pytest.importorskip("scipy.stats.qmc")
+    np.testing.assert_array_equal(
+        sobol(128, 6),
+        qmc.Sobol(6, scramble=False).random(128),
+    )
+
+
+def test_sobol_balance():
+    points = sobol(64, 5)
+    for column in points.T:
+        np.testing.assert_array_equal(np.sort(column), np.arange(64) / 64)
+    with pytest.raises(ValueError, match="dimensions"):
+        sobol(8, 7)
+
+
+def test_latin_hypercube():
+    points = latin_hypercube(50, 3, seed=0)
+    for column in points.T:
+        np.testing.assert_array_equal(np.sort((column * 50).astype(int)), range(50))
+    np.testing.assert_array_equal(points, latin_hypercube(50, 3, seed=0))
+
+
+def test_parameter_axis():
+    np.testing.assert_allclose(parameter_axis(1.0, 100.0, 3, "log"), [1, 10, 100])
+    with pytest.raises(ValueError, match="Unknown spacing"):
+        parameter_axis(1.0, 2.0, 3, "cubic")
+
+
+def test_sample_box_log():
+    points = sample_box([(10.0, 1000.0)], 4, spacing=["log"])
+    np.testing.assert_allclose(points[:, 0], [10.0, 100.0, 10.0**2.5, 10.0**1.5])
+    with pytest.raises(ValueError, match="Unknown sampling"):
+        sample_box([(0.0, 1.0)], 4, method="grid")
@@ -0,0 +1,40 @@
+"""Tests for the electron-hole correspondence."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tanabesugano.batch import solve_batch
+from tanabesugano.holes import solve_holes
+from tanabesugano.holes import solve_pair
+
+
+Dq = np.linspace(0.0, 4000.0, 41)
+
+
+@pytest.mark.parametrize(
+    ("d_count", "B", "C"),
+    [(6, 1065.0, 5120.0), (7, 971.0, 4499.0), (8, 1030.0, 4850.0)],
+)
+def test_solve_holes(d_count: int, B: float, C: float):
+    reference = solve_batch(d_count, Dq, B, C)
+    states = solve_holes(d_count, Dq, B, C)
+    assert list(states) == list(reference)
+    for key, value in reference.items():
+        np.testing.assert_allclose(states[key], value, atol=1e-6)
+
+
+def test_solve_pair():
+    electrons, holes = solve_pair(2, (Dq, 918.0, 4133.0), (Dq[::-1], 1030.0, 4850.0))
+    for key, value in solve_batch(2, Dq, 918.0, 4133.0).items():
+        np.testing.assert_allclose(electrons[key], value, atol=1e-6)
+    for key, value in solve_batch(8, Dq[::-1], 1030.0, 4850.0).items():
+        np.testing.assert_allclose(holes[key], value, atol=1e-6)
+
+
+def test_solve_holes_invalid():
+    with pytest.raises(ValueError, match="hole"):
+        solve_holes(4, Dq, 1000.0, 4000.0)
+    with pytest.raises(ValueError, match="hole"):
+        solve_pair(6, (Dq, 1000.0, 4000.0), (Dq, 1000.0, 4000.0))
@@ -5,6 +5,7 @@ from __future__ import annotations
 import numpy as np
 import pytest
 
+from tanabesugano.batch import solve_batch
 from tanabesugano.matrices import LigandFieldTheory
 
 
@@ -93,3 +94,38 @@ def test_eigensolver_invalid_input(ligand_field_theory, matrix):
     # Act & Assert
     with pytest.raises(ValueError, match="Input matrix must be"):
         ligand_field_theory.eigensolver(matrix)
+
+
+@pytest.mark.parametrize("d_count", range(2, 9))
+def test_float32_accuracy(d_count):
+    # Single precision has to stay within 0.1 cm-1 of double precision across
+    # the physically relevant parameter range
+    rng = np.random.default_rng(d_count)
+    Dq = rng.uniform(0.0, 5000.0, 500)
+    B = rng.uniform(500.0, 1200.0, 500)
+    C = B * rng.uniform(3.5, 5.0, 500)
+    reference = solve_batch(d_count, Dq, B, C)
+    single = solve_batch(d_count, Dq, B, C, dtype=np.float32)
+    for key, value in reference.items():
+        assert single[key].dtype == np.float32
+        np.testing.assert_allclose(single[key], value, atol=0.1)
+
+
+def test_float32_degenerate_fallback():
+    lft = LigandFieldTheory(Dq=1000.0, B=800.0, C=4000.0, dtype=np.float32)
+    matrix = np.array(
+        [
+            [[2.0, 1.0], [1.0, 2.0]],
+            [[1.0e5, 1.0e-3], [1.0e-3, 1.0e5 + 1.0e-2]],
+        ],
+    )
+    values = lft.eigensolver(matrix)
+    assert values.dtype == np.float32
+    # The nearly degenerate block is solved in double precision
+    expected = np.linalg.eigh(matrix)[0].astype(np.float32)
+    np.testing.assert_allclose(values, expected)
+
+
+def test_invalid_dtype():
+    with pytest.raises(ValueError, match="Unsupported dtype"):
+        LigandFieldTheory(Dq=1000.0, B=800.0, C=4000.0, dtype=np.int32)
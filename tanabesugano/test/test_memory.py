@@ -0,0 +1,108 @@
+"""Tests for the memory estimates, budgets and peak reports of sweeps."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tanabesugano.batch import Batch
+from tanabesugano.batch import solve_batch
+from tanabesugano.batch import solve_threaded
+from tanabesugano.memory import MAX_CHUNKSIZE
+from tanabesugano.memory import MemoryMonitor
+from tanabesugano.memory import estimate_memory
+from tanabesugano.memory import parse_size
+from tanabesugano.memory import plan_sweep
+
+
+GRID = {"Dq": [1000.0, 3000.0, 20], "B": [600.0, 900.0, 20], "C": [3000.0, 4000.0, 5]}
+
+
+@pytest.mark.parametrize(
+    ("size", "expected"),
+    [(1024, 1024), ("512MB", 512 * 10**6), ("2 GiB", 2 * 1024**3), ("1.5kb", 1500)],
+)
+def test_parse_size(size, expected):
+    assert parse_size(size) == expected
+
+
+@pytest.mark.parametrize("size", ["lots", "1 PB", -1])
+def test_parse_size_invalid(size):
+    with pytest.raises(ValueError, match="memory size"):
+        parse_size(size)
+
+
+def test_estimate_matches_traced_memory():
+    estimate = estimate_memory(5, 2000, dtype=np.float32, terms=["6_A_1", "4_T_1"])
+    assert estimate.columns == 4
+    assert estimate.values == 2000 * 4 * 4
+
+    batch = Batch(**GRID, d_count=5, track_memory=True)
+    batch.calculation()
+    estimate = batch.memory.estimate
+    assert estimate.values == batch.values.nbytes
+    # The result dictionaries cost several times the energies themselves
+    assert estimate.results > 3 * estimate.values
+    assert 0.9 * estimate.total < batch.memory.traced < 1.1 * estimate.total
+
+
+def test_plan_sweep():
+    estimate = estimate_memory(4, 10**6, chunksize=1)
+    generous = plan_sweep(4, 10**6, 2 * estimate.total + 10**9)
+    assert generous.storage == "memory"
+    assert generous.chunksize == MAX_CHUNKSIZE
+
+    tight = plan_sweep(4, 10**6, estimate.results + 100 * estimate.workspace, workers=4)
+    assert tight.storage == "memmap"
+    assert tight.chunksize == 25
+    assert tight.resident <= tight.budget
+
+    with pytest.raises(MemoryError, match=r"Batch\.reduce"):
+        plan_sweep(4, 10**6, "1MB")
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"workers": 2}, {"processes": 2}],
+    ids=["serial", "threads", "processes"],
+)
+def test_batch_memory_budget(options):
+    reference = Batch(**GRID, d_count=6)
+    reference.calculation()
+
+    estimate = reference.estimate_memory()
+    budget = estimate.results + estimate.values // 2
+    batch = Batch(**GRID, d_count=6, memory_budget=budget, **options)
+    batch.calculation()
+    assert batch.plan.storage == "memmap"
+    assert isinstance(batch.values, np.memmap)
+    np.testing.assert_allclose(batch.values, reference.values)
+    assert type(batch.result[0]["states"]["5_T_2"]) is np.ndarray
+    assert batch.memory.traced is None
+    assert batch.memory.estimate.total - batch.memory.estimate.values <= budget
+
+    with pytest.raises(MemoryError):
+        Batch(**GRID, d_count=6, memory_budget="100kB").calculation()
+
+
+def test_solve_threaded_into_output():
+    Dq = np.linspace(0.0, 3000.0, 100)
+    expected = solve_batch(3, Dq, 918.0, 4133.0)
+    out = np.empty((100, 20))
+    states = solve_threaded(3, Dq, 918.0, 4133.0, workers=2, chunksize=16, out=out)
+    assert list(states) == list(expected)
+    for key, value in expected.items():
+        np.testing.assert_allclose(states[key], value)
+        assert np.shares_memory(states[key], out)
+
+
+def test_memory_monitor():
+    with MemoryMonitor(interval=0.001) as monitor:
+        data = np.ones(2**20)
+    del data
+    assert monitor.report.traced >= 8 * 2**20
+    assert monitor.report.rss >= monitor.report.rss_start
+
+    with MemoryMonitor(trace=False) as monitor:
+        pass
+    assert monitor.report.traced is None
@@ -0,0 +1,65 @@
+"""Tests for the determinant basis engine with spin-orbit coupling."""
+
+from __future__ import annotations
+
+from math import comb
+
+import numpy as np
+import pytest
+
+from tanabesugano.batch import solve_batch
+from tanabesugano.microstates import determinants
+from tanabesugano.microstates import hamiltonian
+from tanabesugano.microstates import solve_microstates
+from tanabesugano.microstates import symmetry_blocks
+
+
+def degenerate_levels(states: dict[str, np.ndarray]) -> np.ndarray:
+    """Repeat the term energies by their degeneracy (2S + 1) * dim(Gamma)."""
+    dimension = {"A": 1, "E": 2, "T": 3}
+    levels = []
+    for key, value in states.items():
+        spin, irrep = key.split("_")[:2]
+        levels.append(np.repeat(value, int(spin) * dimension[irrep], axis=-1))
+    return np.sort(np.concatenate(levels, axis=-1), axis=-1)
+
+
+@pytest.mark.parametrize("d_count", [2, 3, 4, 5, 6, 7, 8])
+def test_reproduces_solver_without_spin_orbit(d_count: int):
+    Dq = np.linspace(0.0, 4000.0, 9)
+    energies = solve_microstates(d_count, Dq, 860.0, 3850.0)
+    expected = degenerate_levels(solve_batch(d_count, Dq, 860.0, 3850.0))
+
+    assert energies.shape == (9, comb(10, d_count))
+    np.testing.assert_allclose(energies, expected - expected[:, :1], atol=1e-6)
+
+
+def test_blocks_match_full_hamiltonian():
+    Dq, zeta = np.array([300.0, 1500.0, 2500.0]), np.array([0.0, 400.0, 800.0])
+    full = np.linalg.eigvalsh(hamiltonian(5, Dq, 800.0, 3200.0, zeta))
+    np.testing.assert_allclose(
+        solve_microstates(5, Dq, 800.0, 3200.0, zeta),
+        full - full[:, :1],
+        atol=1e-6,
+    )
+    assert sum(len(indices) * count for _, indices, count in symmetry_blocks(5)) == 252
+    assert max(len(indices) for _, indices, _ in symmetry_blocks(5)) < 252 // 3
+
+
+def test_free_ion_spin_orbit_splitting():
+    # 2D splits into J = 3/2 and J = 5/2, 5 zeta / 2 apart, inverted for d9
+    np.testing.assert_allclose(
+        solve_microstates(1, 0.0, 800.0, 3200.0, 100.0),
+        [0.0] * 4 + [250.0] * 6,
+        atol=1e-9,
+    )
+    np.testing.assert_allclose(
+        solve_microstates(9, 0.0, 800.0, 3200.0, 100.0),
+        [0.0] * 6 + [250.0] * 4,
+        atol=1e-9,
+    )
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError, match="between 1 and 9"):
+        determinants(10)
@@ -0,0 +1,39 @@
+"""Tests for the ground-state phase diagrams."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tanabesugano.batch import solve_batch
+from tanabesugano.phase import phase_diagram
+
+
+@pytest.mark.parametrize("d_count", [4, 5, 6, 7])
+def test_phase_diagram(d_count: int):
+    diagram = phase_diagram(d_count, shape=(11, 7), refine=2, tol=1e-10)
+    high_spin, low_spin = diagram.terms
+
+    # The labels agree with the ground state of the regular solver
+    Dq, C = np.meshgrid(diagram.dq_b * 1000.0, diagram.c_b * 1000.0)
+    states = solve_batch(d_count, Dq, 1000.0, C)
+    np.testing.assert_array_equal(diagram.labels, states[low_spin][..., 0] == 0.0)
+
+    # One crossover curve from the lower to the upper C/B border, on which
+    # both terms are degenerate
+    (curve,) = diagram.curves
+    np.testing.assert_allclose(sorted(curve[[0, -1], 1]), [3.0, 6.0])
+    states = solve_batch(d_count, curve[:, 0] * 1000.0, 1000.0, curve[:, 1] * 1000.0)
+    np.testing.assert_allclose(states[high_spin][:, 0], 0.0, atol=1e-5)
+    np.testing.assert_allclose(states[low_spin][:, 0], 0.0, atol=1e-5)
+    assert diagram.evaluations < 2000
+
+
+def test_phase_diagram_single_ground_term():
+    diagram = phase_diagram(3, shape=(5, 4))
+    assert diagram.terms == ("4_A_2",)
+    assert diagram.curves == []
+    assert diagram.labels.shape == (4, 5)
+    assert not diagram.labels.any()
+    with pytest.raises(ValueError, match="between 2 and 8"):
+        phase_diagram(9)
@@ -0,0 +1,87 @@
+"""Tests for the progress reporting of sweeps."""
+
+from __future__ import annotations
+
+import io
+
+import numpy as np
+import pytest
+
+from tanabesugano.batch import Batch
+from tanabesugano.batch import solve_shared
+from tanabesugano.batch import solve_threaded
+from tanabesugano.cmd import CMDmain
+from tanabesugano.progress import Progress
+from tanabesugano.progress import ProgressBar
+from tanabesugano.progress import ProgressTracker
+from tanabesugano.reducers import Envelope
+
+
+def test_progress_estimates():
+    progress = Progress(completed=250, total=1000, chunk=1, chunks=4, elapsed=2.0)
+    assert progress.rate == 125.0
+    assert progress.fraction == 0.25
+    assert progress.eta == 6.0
+    assert Progress(0, None, 0, None, 0.0).eta is None
+
+
+def test_tracker_without_callback():
+    tracker = ProgressTracker(None, total=10)
+    tracker.advance(10)
+    assert tracker.completed == 0
+
+
+def test_progress_bar():
+    stream = io.StringIO()
+    bar = ProgressBar("d5", width=10, stream=stream)
+    tracker = ProgressTracker(bar, total=4, chunks=2)
+    tracker.advance(2)
+    tracker.advance(2)
+    lines = stream.getvalue().split("\r")
+    assert "[#####.....]  50.0% 2/4" in lines[1]
+    assert lines[2].startswith("d5 [##########] 100.0% 4/4")
+    assert lines[2].endswith("chunk 2/2\n")
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"workers": 2}, {"processes": 2}],
+    ids=["serial", "threads", "processes"],
+)
+def test_batch_progress(options):
+    reports = []
+    batch = Batch(
+        Dq=[1000.0, 3000.0, 40],
+        B=[600.0, 900.0, 30],
+        C=[3000.0, 4000.0, 2],
+        d_count=3,
+        progress=reports.append,
+        **options,
+    )
+    batch.calculation()
+    assert reports
+    assert [report.chunk for report in reports] == list(range(1, len(reports) + 1))
+    assert np.all(np.diff([report.completed for report in reports]) > 0)
+    assert reports[-1].completed == reports[-1].total == 2400
+    assert reports[-1].chunks == len(reports)
+
+
+def test_shared_and_threaded_progress():
+    Dq = np.linspace(0.0, 3000.0, 100)
+    for solve in (solve_shared, solve_threaded):
+        reports = []
+        options = {"processes": 2} if solve is solve_shared else {"workers": 2}
+        solve(3, Dq, 918.0, 4133.0, chunksize=16, progress=reports.append, **options)
+        assert len(reports) == 7
+        assert reports[-1].completed == 100
+
+
+def test_reduce_and_cmd_progress():
+    reports = []
+    batch = Batch(d_count=3, progress=reports.append)
+    batch.reduce([Envelope("Dq")], chunksize=300)
+    assert [report.completed for report in reports] == [300, 600, 900, 1000]
+
+    reports.clear()
+    CMDmain(d_count=3, nroots=50, progress=reports.append).calculation()
+    assert [(report.completed, report.total) for report in reports] == [(50, 50)]
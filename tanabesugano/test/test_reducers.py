@@ -0,0 +1,99 @@
+"""Tests for the on-the-fly reducers."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tanabesugano.batch import Batch
+from tanabesugano.batch import solve_batch
+from tanabesugano.batch import split_states
+from tanabesugano.reducers import Envelope
+from tanabesugano.reducers import GroundStateMap
+from tanabesugano.reducers import Histogram
+from tanabesugano.reducers import Reducer
+from tanabesugano.reducers import product_chunks
+from tanabesugano.reducers import reduce_sweep
+
+
+Dq = np.linspace(0.0, 4000.0, 9)
+B = np.linspace(800.0, 1100.0, 4)
+C = np.array([4000.0, 4500.0])
+
+
+def dense(d_count: int) -> tuple[np.ndarray, np.ndarray]:
+    points = np.stack(
+        [grid.ravel() for grid in np.meshgrid(Dq, B, C, indexing="ij")],
+        axis=-1,
+    )
+    states = split_states(solve_batch(d_count, *points.T))
+    return points, np.column_stack(list(states.values()))
+
+
+def test_product_chunks():
+    points, _ = dense(2)
+    chunks = list(product_chunks(Dq, B, C, chunksize=7))
+    assert max(chunk.shape[0] for chunk in chunks) == 7
+    np.testing.assert_array_equal(np.concatenate(chunks), points)
+
+
+def test_reduce_sweep():
+    points, values = dense(6)
+    envelope, ground, histogram = reduce_sweep(
+        6,
+        product_chunks(Dq, B, C, chunksize=5),
+        [Envelope("B"), GroundStateMap(), Histogram(bins=50)],
+    )
+
+    assert envelope["keys"] == ["Dq", "C"]
+    assert envelope["points"].shape == (Dq.size * C.size, 2)
+    first = (points[:, 0] == Dq[3]) & (points[:, 2] == C[1])
+    row = np.flatnonzero(
+        (envelope["points"][:, 0] == Dq[3]) & (envelope["points"][:, 1] == C[1]),
+    )[0]
+    np.testing.assert_allclose(envelope["min"][row], values[first].min(axis=0))
+    np.testing.assert_allclose(envelope["max"][row], values[first].max(axis=0))
+
+    # d6 turns from high spin into low spin with increasing Dq
+    assert ground["points"].shape == (Dq.size * B.size, 2)
+    assert ground["ground"][0] == "5_T_2"
+    assert ground["ground"][-1] == "1_A_1"
+    assert ground["counts"].sum() == points.shape[0]
+
+    expected, _ = np.histogram(values[values > 0.0], bins=histogram["edges"])
+    np.testing.assert_array_equal(histogram["counts"], expected)
+
+
+def test_batch_reduce():
+    res = Batch(Dq=[0.0, 4000.0, 9], B=[800.0, 1100.0, 4], C=[4000.0, 4500, 2])
+    res.d_count = 4
+    (histogram,) = res.reduce([Histogram(per_state=True)], chunksize=10)
+    assert histogram["counts"].shape == (43, 100)
+    assert res.result == []
+
+
+def test_reducer_errors():
+    with pytest.raises(ValueError, match="Unknown parameter"):
+        Envelope("D")
+    with pytest.raises(ValueError, match="ground-state map"):
+        reduce_sweep(6, [], [GroundStateMap()], spin=3)
+
+
+def test_custom_reducer():
+    with pytest.raises(TypeError, match="abstract"):
+        Reducer()
+
+    class Incomplete(Reducer):
+        def update(self, points, values) -> None:
+            """Ignore the chunk."""
+
+    with pytest.raises(TypeError, match="result"):
+        Incomplete()
+
+    class Count(Incomplete):
+        def result(self) -> dict:
+            """Return the number of columns."""
+            return {"columns": len(self.columns)}
+
+    (count,) = reduce_sweep(3, [np.array([[1000.0, 918.0, 4133.0]])], [Count()])
+    assert count["columns"] == len(split_states(solve_batch(3, 0.0, 1.0, 4.0)))
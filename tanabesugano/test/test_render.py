@@ -0,0 +1,54 @@
+"""Tests for the headless rendering."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from matplotlib.collections import LineCollection
+
+from tanabesugano.atlas import default_entries
+from tanabesugano.cmd import CMDmain
+from tanabesugano.render import diagram_figure
+from tanabesugano.render import render
+from tanabesugano.render import render_many
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def tmm():
+    tmm = CMDmain(Dq=4000.0, B=860.0, C=3850.0, nroots=50, d_count=4)
+    tmm.calculation()
+    return tmm
+
+
+def test_diagram_figure(tmm):
+    figure = diagram_figure(tmm, kind="DD")
+    (ax,) = figure.axes
+    (collection,) = ax.collections
+    assert isinstance(collection, LineCollection)
+    assert len(collection.get_segments()) == 43
+    assert not ax.lines
+
+
+def test_render(tmm, tmp_path: Path):
+    paths = render(tmm, tmp_path, formats=("png", "svg"))
+    assert len(paths) == 4
+    assert all(path.stat().st_size > 0 for path in paths)
+
+
+def test_render_unknown_format(tmm, tmp_path: Path):
+    with pytest.raises(ValueError, match="Unsupported formats"):
+        render(tmm, tmp_path, formats=("bmp",))
+
+
+def test_render_many(tmp_path: Path):
+    entries = default_entries(d_counts=[2, 3, 8], nroots=20)
+    paths = render_many(entries, tmp_path, formats=("pdf",), processes=2)
+    assert len(paths) == 6
+    assert all(path.is_file() for path in paths)
+    assert paths[0].parent.name == "d2"
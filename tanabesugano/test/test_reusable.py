@@ -0,0 +1,151 @@
+"""Tests for the reusable solvers."""
+
+from __future__ import annotations
+
+import sys
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from tanabesugano.backends import NumpyBackend
+from tanabesugano.batch import ELECTRON_CONFIG_SOLVERS
+from tanabesugano.batch import solve_batch
+from tanabesugano.batch import split_states
+from tanabesugano.reusable import ReusableSolver
+from tanabesugano.reusable import select_terms
+
+
+@pytest.mark.parametrize("d_count", range(2, 9))
+def test_reusable_solver_matches_solver(d_count):
+    solver = ReusableSolver(d_count)
+    row = np.empty(solver.size)
+    rng = np.random.default_rng(d_count)
+    for Dq, B, ratio in rng.uniform((0.0, 500.0, 3.5), (5000.0, 1200.0, 5.0), (20, 3)):
+        solver.update(Dq, B, B * ratio)
+        assert solver.solve(out=row) is row
+
+        expected = ELECTRON_CONFIG_SOLVERS[d_count](Dq=Dq, B=B, C=B * ratio).solver()
+        states = solver.states(row)
+        assert list(states) == list(expected)
+        for key, value in expected.items():
+            np.testing.assert_allclose(states[key], value, atol=1e-6)
+    assert solver.columns == list(split_states(expected))
+
+
+def test_reusable_solver_strided_out():
+    solver = ReusableSolver(4, dtype=np.float32)
+    result = np.zeros((solver.size, 3), dtype=np.float32)
+    for dq, column in zip((0.0, 1000.0, 2000.0), result.T, strict=True):
+        solver.update(dq, 965.0, 4449.0)
+        solver.solve(out=column)
+    assert np.all(result.min(axis=0) == 0.0)
+    assert result[:, 0].tolist() != result[:, 2].tolist()
+
+
+@pytest.mark.parametrize("terms", [None, ["4_A_2", "4_T_2"]])
+def test_reusable_solver_padded_blocks(terms):
+    # Negative Dq and only single-level blocks must not mix in the padding
+    solver = ReusableSolver(3, terms=terms)
+    Dq = np.array([-3000.0, 0.0, 2500.0])
+    expected = solve_batch(3, Dq, 918.0, 4133.0, terms=terms)
+    for index, dq in enumerate(Dq):
+        solver.update(dq, 918.0, 4133.0)
+        states = solver.states(solver.solve())
+        for key, value in expected.items():
+            np.testing.assert_allclose(states[key], value[index], atol=1e-6)
+
+
+class StoredBackend(NumpyBackend):
+    """Backend that returns stored eigenvalues, which allocates nothing."""
+
+    def eigvalsh(self, matrices, subset=None):
+        """Return the eigenvalues of the first call again."""
+        if not hasattr(self, "values"):
+            self.values = super().eigvalsh(matrices, subset)
+        return self.values
+
+
+@pytest.mark.parametrize("d_count", range(2, 9))
+@pytest.mark.parametrize("lowest_k", [None, 1])
+def test_reusable_solver_allocations(d_count, lowest_k):
+    solver = ReusableSolver(d_count, lowest_k=lowest_k, backend=StoredBackend())
+    row = np.empty(solver.size, dtype=np.float32)
+    for _ in range(2):
+        solver.update(1000.0, 900.0, 4000.0)
+        solver.solve(out=row)
+
+    # Line tracing, e.g. of coverage, allocates on its own
+    trace = sys.gettrace()
+    sys.settrace(None)
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        solver.update(2000.0, 900.0, 4000.0)
+        solver.solve(out=row)
+        peak = tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+        sys.settrace(trace)
+    # Only the header of a flat view of the eigenvalues, no data buffers
+    assert peak < 256
+
+
+def test_reusable_solver_invalid():
+    with pytest.raises(ValueError, match="between 2 and 8"):
+        ReusableSolver(1)
+
+
+@pytest.mark.parametrize("d_count", range(2, 9))
+def test_ground_terms(d_count):
+    # The ground state is always the lowest level of one of the ground terms
+    rng = np.random.default_rng(d_count)
+    B = rng.uniform(300.0, 1500.0, 2000)
+    solver_class = ELECTRON_CONFIG_SOLVERS[d_count]
+    states = solver_class(
+        Dq=rng.uniform(0.0, 8000.0, 2000),
+        B=B,
+        C=B * rng.uniform(2.5, 7.0, 2000),
+    ).solver()
+    ground = np.min([states[key][:, 0] for key in solver_class.ground_terms], axis=0)
+    np.testing.assert_array_equal(ground, 0.0)
+
+
+@pytest.mark.parametrize(
+    ("d_count", "selection", "keys"),
+    [
+        (3, {"spin": 4}, ["4_T_1", "4_A_2", "4_T_2"]),
+        (6, {"terms": ["1_T_1", "3_T_1"]}, ["3_T_1", "1_T_1"]),
+        (5, {"spin": [4, 6], "terms": ["4_T_1", "6_A_1", "2_E"]}, ["4_T_1", "6_A_1"]),
+    ],
+)
+def test_solve_batch_selection(d_count, selection, keys):
+    Dq = np.linspace(0.0, 4000.0, 50)
+    expected = solve_batch(d_count, Dq, 900.0, 4000.0)
+    states = solve_batch(d_count, Dq, 900.0, 4000.0, **selection)
+    assert list(states) == keys
+    for key in keys:
+        np.testing.assert_allclose(states[key], expected[key], atol=1e-8)
+
+    solver = ReusableSolver(d_count, **selection)
+    solver.update(Dq[25], 900.0, 4000.0)
+    row = solver.solve()
+    for key, value in solver.states(row).items():
+        np.testing.assert_allclose(value, expected[key][25], atol=1e-6)
+
+
+def test_lowest_k():
+    states = solve_batch(4, 2000.0, 965.0, 4449.0, lowest_k=1)
+    assert all(value.shape == (1,) for value in states.values())
+    solver = ReusableSolver(4, lowest_k=2)
+    assert solver.size == sum(
+        min(2, value.size) for value in solve_batch(4, 0, 1, 4).values()
+    )
+    assert solver.columns[:2] == ["3_T_1_0", "3_T_1_1"]
+
+
+def test_select_terms_invalid():
+    with pytest.raises(ValueError, match="Unknown terms"):
+        select_terms(3, terms=["3_T_1"])
+    with pytest.raises(ValueError, match="No states"):
+        select_terms(3, spin=6)
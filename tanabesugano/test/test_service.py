@@ -0,0 +1,174 @@
+"""Tests for the local solver service."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from tanabesugano import service as service_module
+from tanabesugano.batch import solve_batch
+from tanabesugano.matrices import d6
+from tanabesugano.service import Coalescer
+from tanabesugano.service import SolverService
+
+
+async def _request(port: int, target: str, body: dict | None = None) -> tuple:
+    """Send a raw HTTP request and return the status code and the JSON body."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    if body is None:
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    else:
+        data = json.dumps(body).encode()
+        header = (
+            f"POST {target} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n"
+        )
+        writer.write(header.encode() + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    header, _, payload = response.partition(b"\r\n\r\n")
+    return int(header.split()[1]), json.loads(payload)
+
+
+def _run(coroutine_function, **kwargs: float) -> object:
+    """Run a test coroutine against a service on a free port."""
+
+    async def main() -> object:
+        service = SolverService(port=0, **kwargs)
+        port = await service.start()
+        try:
+            return await coroutine_function(service, port)
+        finally:
+            await service.close()
+
+    return asyncio.run(main())
+
+
+def test_coalesced_solves():
+    Dq = np.linspace(0.0, 3000.0, 40)
+
+    async def main(service, port) -> tuple:
+        responses = await asyncio.gather(
+            *(
+                _request(port, f"/solve?d=6&Dq={dq}&B=1065&C=5120")
+                for dq in Dq.tolist()
+            ),
+        )
+        return responses, service.coalescer(6)
+
+    responses, coalescer = _run(main, window=0.05)
+    assert coalescer.points == len(Dq)
+    assert coalescer.batches < len(Dq)
+    for dq, (status, payload) in zip(Dq, responses, strict=True):
+        assert status == 200
+        expected = d6(Dq=dq, B=1065.0, C=5120.0).solver()
+        for key, value in expected.items():
+            np.testing.assert_allclose(payload["states"][key], value, atol=1e-8)
+
+
+def test_diagram_and_cut():
+    async def main(_service, port) -> tuple:
+        diagram = await _request(
+            port,
+            "/diagram",
+            {"d": 4, "Dq": 4000, "B": 860, "C": 3850, "nroots": 25},
+        )
+        cut = await _request(port, "/cut?d=4&cut=24000&B=860&C=3850")
+        return diagram, cut
+
+    (status, diagram), (status_cut, cut) = _run(main)
+    assert status == status_cut == 200
+    assert len(diagram["10Dq"]) == 25
+    assert len(diagram["states"]) == 43
+    energies = [row["eV"] for row in cut["states"]]
+    assert energies == sorted(energies)
+
+
+@pytest.mark.parametrize(
+    ("target", "status"),
+    [
+        ("/unknown", 404),
+        ("/solve?d=9&Dq=1&B=1&C=1", 400),
+        ("/solve?d=6&Dq=1&B=1", 400),
+        ("/solve?d=6&Dq=x&B=1&C=1", 400),
+        ("/solve?d=6&Dq=nan&B=1065&C=5120", 400),
+        ("/solve?d=6&Dq=inf&B=1065&C=5120", 400),
+        ("/solve?d=nan&Dq=1&B=1&C=1", 400),
+        ("/solve?d=6.5&Dq=1&B=1&C=1", 400),
+        ("/diagram?d=6&Dq=4000&B=1065&C=5120&nroots=nan", 400),
+        ("/diagram?d=6&Dq=4000&B=1065&C=5120&nroots=2.5", 400),
+    ],
+)
+def test_errors(target, status):
+    async def main(_service, port) -> tuple:
+        return await _request(port, target)
+
+    code, payload = _run(main)
+    assert code == status
+    assert "error" in payload
+
+
+def test_backpressure():
+    async def main(service, port) -> tuple:
+        service._active = service.max_pending  # noqa: SLF001
+        return await _request(port, "/health")
+
+    status, _ = _run(main, max_pending=1)
+    assert status == 503
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_invalid_content_length(length):
+    async def main(_service, port) -> bytes:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(
+            f"POST /solve HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}".encode(),
+        )
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+        return response
+
+    header, _, payload = _run(main).partition(b"\r\n\r\n")
+    assert int(header.split()[1]) == 400
+    assert "Content-Length" in json.loads(payload)["error"]
+
+
+def _failing_solve(d_count, Dq, B, C) -> dict:
+    """Solve like `solve_batch`, but fail for every batch with a huge Dq."""
+    if np.any(np.asarray(Dq) > 1e6):
+        msg = "Eigenvalues did not converge"
+        raise np.linalg.LinAlgError(msg)
+    return solve_batch(d_count, Dq, B, C)
+
+
+def test_poisoned_point_fails_alone(monkeypatch):
+    monkeypatch.setattr(service_module, "solve_batch", _failing_solve)
+
+    async def main(service, port) -> tuple:
+        coalescer = Coalescer(6, service.executor, window=0.05)
+        results = await asyncio.gather(
+            coalescer.solve(1000.0, 1065.0, 5120.0),
+            coalescer.solve(float("nan"), 1065.0, 5120.0),
+            coalescer.solve(2e6, 1065.0, 5120.0),
+            coalescer.solve(2000.0, 1065.0, 5120.0),
+            return_exceptions=True,
+        )
+        response = await _request(port, "/solve?d=6&Dq=2e6&B=1065&C=5120")
+        return results, response
+
+    results, (status, payload) = _run(main)
+    assert isinstance(results[1], ValueError)
+    assert isinstance(results[2], np.linalg.LinAlgError)
+    for result, dq in ((results[0], 1000.0), (results[3], 2000.0)):
+        expected = d6(Dq=dq, B=1065.0, C=5120.0).solver()
+        for key, value in expected.items():
+            np.testing.assert_allclose(result[key][0], value, atol=1e-8)
+    assert status == 422
+    assert "cannot be solved" in payload["error"]
@@ -0,0 +1,75 @@
+"""Tests for the spectrum synthesis."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tanabesugano.batch import solve_batch
+from tanabesugano.spectrum import line_shape
+from tanabesugano.spectrum import simulate_spectra
+from tanabesugano.spectrum import spectra
+from tanabesugano.spectrum import spin_allowed
+
+
+grid = np.linspace(5000.0, 40000.0, 1401)
+
+
+def reference(states: dict, width: float, shape: str, allowed: bool) -> np.ndarray:
+    """Sum the line shapes of every spectrum in a plain Python loop."""
+    rows = []
+    for i in range(next(iter(states.values())).shape[0]):
+        point = {key: value[i : i + 1] for key, value in states.items()}
+        masks = spin_allowed(point)
+        spectrum = np.zeros_like(grid)
+        for key, value in point.items():
+            if allowed and not masks[key][0, 0]:
+                continue
+            for energy in value[0]:
+                if grid[0] <= energy < grid[-1] and energy > 0.0:
+                    spectrum += line_shape(grid - energy, width, shape)
+        rows.append(spectrum)
+    return np.array(rows)
+
+
+@pytest.mark.parametrize("shape", ["gaussian", "lorentzian"])
+@pytest.mark.parametrize("allowed", [False, True])
+def test_simulate_spectra(shape: str, allowed: bool):
+    # d6 switches from high spin to low spin along the Dq axis
+    states = solve_batch(6, np.linspace(500.0, 3000.0, 7), 1065.0, 5120.0)
+    result = simulate_spectra(
+        states,
+        grid,
+        width=1500.0,
+        shape=shape,
+        allowed_only=allowed,
+    )
+    expected = reference(states, 1500.0, shape, allowed)
+    assert result.shape == (7, grid.size)
+    np.testing.assert_allclose(result, expected, atol=2e-3 * expected.max())
+
+
+def test_spectra_widths_and_chunks():
+    Dq = np.linspace(1000.0, 2000.0, 10)
+    widths = np.linspace(500.0, 2000.0, 10)
+    chunked = spectra(3, Dq, 918.0, 4133.0, grid, width=widths, chunksize=3)
+    single = spectra(3, Dq[-1], 918.0, 4133.0, grid, width=2000.0)
+    np.testing.assert_allclose(chunked[-1], single[0], atol=1e-12)
+    # Narrow lines are higher than broad ones
+    assert chunked[0].max() > chunked[-1].max()
+
+
+def test_simulate_spectra_intensities():
+    states = solve_batch(3, 1500.0, 918.0, 4133.0)
+    only = {key: 0.0 for key in states if key != "4_T_2"}
+    result = simulate_spectra(states, grid, intensities=only, dtype=np.float32)
+    assert result.dtype == np.float32
+    assert grid[np.argmax(result[0])] == pytest.approx(15000.0, abs=25.0)
+
+
+def test_simulate_spectra_errors():
+    states = solve_batch(3, 1500.0, 918.0, 4133.0)
+    with pytest.raises(ValueError, match="evenly spaced"):
+        simulate_spectra(states, np.geomspace(1000.0, 10000.0, 10))
+    with pytest.raises(ValueError, match="Unknown line shape"):
+        simulate_spectra(states, grid, shape="voigt")
@@ -0,0 +1,123 @@
+"""Tests for the JSON-lines streaming."""
+
+from __future__ import annotations
+
+import io
+import json
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from tanabesugano.matrices import d3
+from tanabesugano.matrices import d6
+from tanabesugano.stream import parse_record
+from tanabesugano.stream import run_stream
+from tanabesugano.stream import stream_records
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_console_scripts import ScriptRunner
+
+
+RECORDS = [
+    {"id": "a", "d": 6, "Dq": 2000, "B": 1065, "C": 5120},
+    {"type": "cut", "d": 3, "cut": 24000, "B": 918, "C": 4133},
+    {"type": "diagram", "d": 6, "Dq": 4000, "B": 1065, "C": 5120, "nroots": 20},
+    {"d": 3, "Dq": 1500, "B": 918, "C": 4133},
+]
+
+
+def test_stream_records_in_order():
+    lines = [json.dumps(record) for record in RECORDS]
+    results = list(stream_records(lines, chunk_size=3))
+
+    assert [result["type"] for result in results] == [
+        "point",
+        "cut",
+        "diagram",
+        "point",
+    ]
+    assert results[0]["id"] == "a"
+    expected = d6(Dq=2000.0, B=1065.0, C=5120.0).solver()
+    for key, value in expected.items():
+        np.testing.assert_allclose(results[0]["states"][key], value, atol=1e-8)
+    expected = d3(Dq=1500.0, B=918.0, C=4133.0).solver()
+    for key, value in expected.items():
+        np.testing.assert_allclose(results[3]["states"][key], value, atol=1e-8)
+    assert len(results[1]["states"]) == 20
+    assert len(results[2]["10Dq"]) == 20
+
+
+def test_stream_errors_keep_position():
+    lines = ["not json", "", json.dumps({"d": 9, "Dq": 1, "B": 1, "C": 1}), "[]"]
+    lines.append(json.dumps(RECORDS[0]))
+    results = list(stream_records(lines))
+    assert [result.get("line") for result in results] == [1, 3, 4, None]
+    assert "between 2 and 8" in results[1]["error"]
+    assert "states" in results[3]
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        '{"d": Infinity, "Dq": 1000, "B": 1065, "C": 5120}',
+        '{"d": 6, "Dq": NaN, "B": 1065, "C": 5120}',
+        '{"type": "diagram", "d": 6, "Dq": 4000, "B": 1065, "C": 5120, "nroots": NaN}',
+    ],
+)
+def test_stream_non_finite_records(line):
+    results = list(stream_records([line, json.dumps(RECORDS[0])]))
+    assert results[0]["line"] == 1
+    assert "finite" in results[0]["error"]
+    assert "states" in results[1]
+
+
+@pytest.mark.parametrize(
+    ("record", "name"),
+    [
+        ({"d": 6.5, "Dq": 1000, "B": 1065, "C": 5120}, "d"),
+        (
+            {"type": "diagram", "d": 6, "Dq": 4000, "B": 1, "C": 1, "nroots": 2.5},
+            "nroots",
+        ),
+    ],
+)
+def test_parse_record_integers(record, name):
+    with pytest.raises(ValueError, match=f"`{name}` has to be an integer"):
+        parse_record(json.dumps(record))
+
+
+def test_stream_errors_keep_id():
+    lines = [json.dumps({"id": "a", "d": 6.5}), "[]", json.dumps(RECORDS[0])]
+    results = list(stream_records(lines))
+    assert results[0]["id"] == "a"
+    assert "integer" in results[0]["error"]
+    assert "id" not in results[1]
+
+
+def test_parse_record_diagram():
+    request = parse_record(json.dumps(RECORDS[2]))
+    assert request.size == 20
+    assert request.Dq[-1] == 4000.0
+
+
+def test_run_stream():
+    source = io.StringIO("\n".join(json.dumps(record) for record in RECORDS * 50))
+    target = io.StringIO()
+    assert run_stream(source, target, chunk_size=64) == 200
+    assert len(target.getvalue().splitlines()) == 200
+
+
+def test_cmd_stream(script_runner: ScriptRunner, tmp_path: Path) -> None:
+    source = tmp_path / "input.jsonl"
+    source.write_text("\n".join(json.dumps(record) for record in RECORDS))
+    output = tmp_path / "output.jsonl"
+    ret = script_runner.run(
+        ["tanabesugano", "stream", str(source), "-o", str(output)],
+    )
+    assert ret.success
+    assert len(output.read_text().splitlines()) == len(RECORDS)
@@ -0,0 +1,55 @@
+"""Tests for the thermal populations and magnetic moments."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tanabesugano.batch import ELECTRON_CONFIG_SOLVERS
+from tanabesugano.thermodynamics import BOLTZMANN
+from tanabesugano.thermodynamics import degeneracy
+from tanabesugano.thermodynamics import thermal
+from tanabesugano.thermodynamics import thermal_properties
+
+
+def test_degeneracy():
+    assert degeneracy("5_T_2") == (5, 3)
+    assert degeneracy("2_E") == (2, 2)
+    assert degeneracy("1_A_1") == (1, 1)
+
+
+def test_thermal_matches_point_by_point():
+    Dq = np.linspace(500.0, 3000.0, 6)
+    temperature = np.array([10.0, 300.0, 1500.0])
+    result = thermal(6, Dq, 1065.0, 5120.0, temperature, populations=True)
+
+    assert result.partition.shape == (6, 3)
+    assert result.populations.shape == (6, 3, len(result.columns))
+    np.testing.assert_allclose(result.populations.sum(axis=-1), 1.0)
+    np.testing.assert_allclose(result.spin_populations.sum(axis=-1), 1.0)
+    for i, dq in enumerate(Dq):
+        states = ELECTRON_CONFIG_SOLVERS[6](Dq=dq, B=1065.0, C=5120.0).solver()
+        for j, t in enumerate(temperature):
+            z = s2 = 0.0
+            for key, value in states.items():
+                spin, orbital = degeneracy(key)
+                for energy in value:
+                    weight = spin * orbital * np.exp(-energy / (BOLTZMANN * t))
+                    z += weight
+                    s2 += weight * (spin**2 - 1) / 4.0
+            np.testing.assert_allclose(result.partition[i, j], z)
+            np.testing.assert_allclose(result.moment[i, j], 2.0 * np.sqrt(s2 / z))
+
+
+def test_spin_crossover_limits():
+    # High-spin 5T2 and low-spin 1A1 d6 ground states at low temperature
+    result = thermal(6, [1000.0, 3000.0], 1065.0, 5120.0, 5.0)
+    np.testing.assert_allclose(result.moment[:, 0], [2.0 * np.sqrt(6.0), 0.0])
+    high = result.spins.index(5)
+    np.testing.assert_allclose(result.spin_populations[:, 0, high], [1.0, 0.0])
+
+
+def test_thermal_invalid_temperature():
+    states = {"1_A_1": np.zeros(1)}
+    with pytest.raises(ValueError, match="positive"):
+        thermal_properties(states, [0.0, 300.0])
@@ -0,0 +1,68 @@
+"""Tests for the Monte Carlo uncertainty propagation."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from tanabesugano.batch import solve_batch
+from tanabesugano.batch import split_states
+from tanabesugano.uncertainty import propagate
+
+
+def test_propagate_samples():
+    rng = np.random.default_rng(0)
+    Dq = rng.normal(1500.0, 50.0, 1000)
+    B = rng.normal(918.0, 20.0, 1000)
+    result = propagate(3, Dq, B, 4133.0, chunksize=128)
+
+    values = np.column_stack(list(split_states(solve_batch(3, Dq, B, 4133.0)).values()))
+    assert result.count == 1000
+    np.testing.assert_allclose(result.mean, values.mean(axis=0), rtol=1e-10)
+    np.testing.assert_allclose(result.std, values.std(axis=0, ddof=1), rtol=1e-8)
+    # The reservoir holds all samples, so the quantiles are exact
+    np.testing.assert_allclose(
+        result.quantiles,
+        np.quantile(values, (0.025, 0.5, 0.975), axis=0),
+    )
+    frame = result.to_frame()
+    assert list(frame.columns) == ["mean", "std", "q0.025", "q0.5", "q0.975"]
+    assert frame.loc["4_T_2", "mean"] == pytest.approx(
+        result.mean[result.columns.index("4_T_2")],
+    )
+
+
+def test_propagate_distributions():
+    kwargs = {
+        "samples": 20_000,
+        "chunksize": 3000,
+        "reservoir": 5000,
+        "terms": ["4_T_2"],
+    }
+    first = propagate(3, (1500.0, 50.0), 918.0, 4133.0, seed=1, **kwargs)
+    second = propagate(3, (1500.0, 50.0), 918.0, 4133.0, seed=1, **kwargs)
+    np.testing.assert_array_equal(first.quantiles, second.quantiles)
+
+    # The 4T2 band of d3 is 10 Dq
+    assert first.columns == ["4_T_2"]
+    assert first.mean[0] == pytest.approx(15000.0, rel=1e-2)
+    assert first.std[0] == pytest.approx(500.0, rel=5e-2)
+    assert first.quantiles[:, 0] == pytest.approx(
+        [15000.0 - 1.96 * 500.0, 15000.0, 15000.0 + 1.96 * 500.0],
+        rel=1e-2,
+    )
+
+    uniform = propagate(
+        3,
+        lambda rng, size: rng.uniform(1400.0, 1600.0, size),
+        918.0,
+        4133.0,
+        samples=100,
+        terms=["4_T_2"],
+    )
+    assert 14000.0 <= uniform.quantiles[0, 0] <= uniform.quantiles[-1, 0] <= 16000.0
+
+
+def test_propagate_without_samples():
+    with pytest.raises(ValueError, match="samples"):
+        propagate(3, (1500.0, 50.0), 918.0, 4133.0)
@@ -0,0 +1,167 @@
+"""Boltzmann populations and spin-only magnetic moments over temperature grids.
+
+The levels of a state `5_T_2` are `(2S + 1) * dim(Gamma)`-fold degenerate with
+`2S + 1 = 5` and `dim(T) = 3`. With the energies relative to the ground state,
+the Boltzmann factors of all levels, parameter sets and temperatures are one
+broadcast exponential, from which the partition function, the populations and
+the thermal average of `S(S + 1)` follow by reductions over the levels. The
+spin-only moment is `mu_eff = g * sqrt(<S(S + 1)>)` in Bohr magnetons.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from tanabesugano.batch import solve_batch
+from tanabesugano.batch import split_states
+
+
+if TYPE_CHECKING:
+    from tanabesugano.matrices import Float64Array
+
+
+# Boltzmann constant in wavenumbers per Kelvin (cm-1 K-1)
+BOLTZMANN = 0.695034800
+# Orbital degeneracy of the irreducible representations of Oh
+_ORBITAL = {"A": 1, "E": 2, "T": 3}
+
+
+@dataclass(frozen=True)
+class Thermal:
+    """Thermal properties of many parameter sets and temperatures.
+
+    Attributes:
+        columns (list[str]): Level names, as produced by `split_states`.
+        temperature (Float64Array): Temperatures in Kelvin of shape `(m,)`.
+        partition (Float64Array): Partition functions of shape `(*shape, m)`,
+            with the ground state as zero of energy.
+        spin_squared (Float64Array): Thermal average of `S(S + 1)`, shape
+            `(*shape, m)`.
+        moment (Float64Array): Spin-only effective moment in Bohr magnetons,
+            shape `(*shape, m)`.
+        spins (tuple[int, ...]): Spin multiplicities `2S + 1` of the states.
+        spin_populations (Float64Array): Population of every spin multiplicity
+            of shape `(*shape, m, len(spins))`, e.g. the high-spin fraction.
+        populations (Float64Array | None): Population of every level including
+            its degeneracy, shape `(*shape, m, len(columns))`, or None if not
+            requested.
+
+    """
+
+    columns: list[str]
+    temperature: Float64Array
+    partition: Float64Array
+    spin_squared: Float64Array
+    moment: Float64Array
+    spins: tuple[int, ...]
+    spin_populations: Float64Array
+    populations: Float64Array | None = None
+
+
+def degeneracy(key: str) -> tuple[int, int]:
+    """Return the spin multiplicity and the orbital degeneracy of a term.
+
+    Args:
+        key (str): Term symbol, e.g. "5_T_2" or "2_E".
+
+    Returns:
+        tuple[int, int]: `2S + 1` and `dim(Gamma)`.
+
+    """
+    spin, irrep = key.split("_")[:2]
+    return int(spin), _ORBITAL[irrep[0]]
+
+
+def thermal_properties(
+    states: dict[str, Float64Array],
+    temperature: float | Float64Array,
+    *,
+    g: float = 2.0,
+    populations: bool = False,
+) -> Thermal:
+    """Evaluate populations and magnetic moments on a temperature grid.
+
+    Args:
+        states (dict[str, Float64Array]): States of `solver()` or `solve_batch`
+            of shape `(*shape, k)`, relative to the ground state in wavenumbers.
+        temperature (float | Float64Array): Temperatures in Kelvin.
+        g (float): Electron g-factor of the spin-only moment. Defaults to 2.0.
+        populations (bool): Also return the population of every level, which
+            holds `len(columns)` values per parameter set and temperature.
+            Defaults to False.
+
+    Raises:
+        ValueError: If a temperature is not positive.
+
+    Returns:
+        Thermal: Thermal properties broadcast over the parameter sets and the
+            temperatures.
+
+    """
+    temperature = np.atleast_1d(np.asarray(temperature, dtype=np.float64))
+    if np.any(temperature <= 0.0):
+        msg = "The temperatures have to be positive!"
+        raise ValueError(msg)
+
+    columns = split_states(states)
+    spin, orbital = np.array(
+        [
+            degeneracy(key)
+            for key, value in states.items()
+            for _ in range(np.shape(value)[-1])
+        ],
+    ).T
+    energies = np.stack(
+        [np.asarray(value, dtype=np.float64) for value in columns.values()],
+        axis=-1,
+    )
+
+    # Boltzmann factors of shape (*shape, m, levels), at most one for E >= 0
+    weights = np.exp(
+        -energies[..., None, :] / (BOLTZMANN * temperature[:, None]),
+    ) * (spin * orbital)
+    partition = weights.sum(axis=-1)
+    spins = tuple(sorted(set(spin.tolist())))
+    indicator = spin[:, None] == np.array(spins)[None, :]
+    spin_populations = weights @ indicator / partition[..., None]
+    # S(S + 1) of a multiplicity 2S + 1
+    spin_squared = spin_populations @ ((np.array(spins) ** 2 - 1) / 4.0)
+    return Thermal(
+        columns=list(columns),
+        temperature=temperature,
+        partition=partition,
+        spin_squared=spin_squared,
+        moment=g * np.sqrt(spin_squared),
+        spins=spins,
+        spin_populations=spin_populations,
+        populations=weights / partition[..., None] if populations else None,
+    )
+
+
+def thermal(
+    d_count: int,
+    Dq: float | Float64Array,
+    B: float | Float64Array,
+    C: float | Float64Array,
+    temperature: float | Float64Array,
+    **options: object,
+) -> Thermal:
+    """Solve many parameter sets and evaluate their thermal properties.
+
+    Args:
+        d_count (int): Electron configuration (d2-d8).
+        Dq (float | Float64Array): Oh crystal field splitting, scalar or array.
+        B (float | Float64Array): Racah B parameter, scalar or array.
+        C (float | Float64Array): Racah C parameter, scalar or array.
+        temperature (float | Float64Array): Temperatures in Kelvin.
+        **options (object): Keyword arguments of `thermal_properties`.
+
+    Returns:
+        Thermal: Thermal properties of shape `(*shape, len(temperature))` for
+            the broadcast parameter sets.
+
+    """
+    return thermal_properties(solve_batch(d_count, Dq, B, C), temperature, **options)
@@ -0,0 +1,214 @@
+"""Monte Carlo propagation of parameter uncertainties to the energies.
+
+Samples of Dq, B and C are drawn chunk by chunk, solved with the batched solver
+and merged into running statistics, so the memory does not grow with the
+number of samples:
+
+- mean and standard deviation are merged exactly per chunk (Chan et al.)
+- quantiles are evaluated on a uniform reservoir sample of the energies, which
+  holds all samples (exact quantiles) up to its size
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from tanabesugano.batch import solve_batch
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from numpy.typing import DTypeLike
+
+    from tanabesugano.matrices import Float64Array
+
+    # A parameter is fixed, normal (mean, std), an object with `rvs` (e.g. a
+    # frozen scipy distribution), a callable `(rng, size) -> samples` or samples
+    Parameter = float | tuple[float, float] | Callable | Float64Array
+
+
+@dataclass(frozen=True)
+class Uncertainty:
+    """Statistics of the energies of every state.
+
+    Attributes
+    ----------
+    columns : list[str]
+        Names of the energy columns, as produced by `split_states`
+    count : int
+        Number of samples
+    mean : Float64Array
+        Mean energy per column
+    std : Float64Array
+        Sample standard deviation per column
+    probabilities : tuple[float, ...]
+        Probabilities of the quantiles
+    quantiles : Float64Array
+        Quantiles of shape `(len(probabilities), len(columns))`
+
+    """
+
+    columns: list[str]
+    count: int
+    mean: Float64Array
+    std: Float64Array
+    probabilities: tuple[float, ...]
+    quantiles: Float64Array
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the statistics as a table with one row per column."""
+        frame = pd.DataFrame({"mean": self.mean, "std": self.std}, index=self.columns)
+        for probability, values in zip(self.probabilities, self.quantiles, strict=True):
+            frame[f"q{probability:g}"] = values
+        return frame
+
+
+def _draw(
+    parameter: Parameter,
+    rng: np.random.Generator,
+    start: int,
+    size: int,
+) -> Float64Array:
+    """Draw the samples of a chunk of one parameter."""
+    if hasattr(parameter, "rvs"):
+        return np.asarray(parameter.rvs(size=size, random_state=rng), dtype=float)
+    if callable(parameter):
+        return np.asarray(parameter(rng, size), dtype=float)
+    if isinstance(parameter, tuple):
+        mean, std = parameter
+        return rng.normal(mean, std, size)
+    values = np.asarray(parameter, dtype=float)
+    if values.ndim == 0:
+        return np.full(size, float(values))
+    return values[start : start + size]
+
+
+class _Reservoir:
+    """Uniform random subset of the rows seen so far (algorithm R)."""
+
+    def __init__(self, size: int, rng: np.random.Generator) -> None:
+        self.size = size
+        self.rng = rng
+        self.seen = 0
+        self.rows: Float64Array | None = None
+
+    def add(self, rows: Float64Array) -> None:
+        if self.rows is None:
+            self.rows = np.empty((self.size, rows.shape[1]), dtype=rows.dtype)
+        free = min(max(self.size - self.seen, 0), rows.shape[0])
+        self.rows[self.seen : self.seen + free] = rows[:free]
+        rest = rows[free:]
+        # Every further row replaces a random slot with probability size / seen
+        index = np.arange(self.seen + free, self.seen + rows.shape[0]) + 1
+        slots = (self.rng.random(rest.shape[0]) * index).astype(np.int64)
+        kept = slots < self.size
+        self.rows[slots[kept]] = rest[kept]
+        self.seen += rows.shape[0]
+
+    def sample(self) -> Float64Array:
+        return self.rows[: min(self.seen, self.size)]
+
+
+def propagate(
+    d_count: int,
+    Dq: Parameter,
+    B: Parameter,
+    C: Parameter,
+    *,
+    samples: int | None = None,
+    chunksize: int = 8192,
+    seed: int | np.random.Generator | None = None,
+    probabilities: tuple[float, ...] = (0.025, 0.5, 0.975),
+    reservoir: int = 100_000,
+    dtype: DTypeLike = np.float64,
+    **selection: object,
+) -> Uncertainty:
+    """Propagate the uncertainties of Dq, B and C to the energies of the states.
+
+    Parameters
+    ----------
+    d_count : int
+        Electron configuration (d2-d8)
+    Dq : Parameter
+        Oh crystal field splitting: a fixed value, `(mean, std)` of a normal
+        distribution, a frozen distribution with `rvs`, a callable
+        `(rng, size) -> samples` or an array of samples
+    B : Parameter
+        Racah B parameter, like `Dq`
+    C : Parameter
+        Racah C parameter, like `Dq`
+    samples : int | None, optional
+        Number of samples, by default the length of the given sample arrays
+    chunksize : int, optional
+        Number of samples solved at once, by default 8192
+    seed : int | np.random.Generator | None, optional
+        Seed or generator of the random numbers, by default None
+    probabilities : tuple[float, ...], optional
+        Probabilities of the quantiles, by default (0.025, 0.5, 0.975)
+    reservoir : int, optional
+        Number of samples kept for the quantiles, by default 100_000
+    dtype : DTypeLike, optional
+        Precision of the energies, by default np.float64
+    **selection : object
+        `terms`, `spin` and `lowest_k` filters passed on to `solve_batch`
+
+    Returns
+    -------
+    Uncertainty
+        Mean, standard deviation and quantiles of every energy column.
+
+    Raises
+    ------
+    ValueError
+        If the number of samples is unknown or not positive
+
+    """
+    from tanabesugano.reusable import ReusableSolver  # noqa: PLC0415
+
+    parameters = (Dq, B, C)
+    if samples is None:
+        sizes = {
+            np.size(parameter)
+            for parameter in parameters
+            if isinstance(parameter, np.ndarray | list) and np.ndim(parameter) == 1
+        }
+        samples = sizes.pop() if len(sizes) == 1 else 0
+    if samples <= 0:
+        msg = "The number of samples has to be given and positive!"
+        raise ValueError(msg)
+
+    rng = np.random.default_rng(seed)
+    columns = ReusableSolver(d_count, **selection).columns
+    pool = _Reservoir(reservoir, rng)
+    count, mean, m2 = 0, np.zeros(len(columns)), np.zeros(len(columns))
+    for start in range(0, samples, chunksize):
+        size = min(chunksize, samples - start)
+        draws = [_draw(parameter, rng, start, size) for parameter in parameters]
+        states = solve_batch(d_count, *draws, dtype=dtype, **selection)
+        values = np.concatenate(list(states.values()), axis=1)
+
+        # Merge the statistics of the chunk into the running statistics
+        chunk_mean = values.mean(axis=0, dtype=np.float64)
+        chunk_m2 = ((values - chunk_mean) ** 2).sum(axis=0, dtype=np.float64)
+        delta = chunk_mean - mean
+        total = count + size
+        mean = mean + delta * size / total
+        m2 = m2 + chunk_m2 + delta**2 * count * size / total
+        count = total
+        pool.add(values)
+
+    std = np.sqrt(m2 / (count - 1)) if count > 1 else np.zeros_like(mean)
+    quantiles = np.quantile(pool.sample(), probabilities, axis=0)
+    return Uncertainty(
+        columns=columns,
+        count=count,
+        mean=mean,
+        std=std,
+        probabilities=tuple(probabilities),
+        quantiles=np.atleast_2d(quantiles),
+    )